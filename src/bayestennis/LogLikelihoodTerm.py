@@ -1,7 +1,230 @@
 import torch
-from .utils import as_torch_tensor, as_2dim_tensor
-from typing import Union, Sequence
-from .scoring_systems.base import ScoringSystem
+import warnings
+from .utils import as_torch_tensor, as_2dim_tensor, CompiledFunction
+from typing import Callable, Optional, Union, Sequence
+from .scoring_systems.base import BasicScoreBlock, ScoringSystem, get_unit_probability, log_prob_from_unit_probabilities
+
+REPRESENTATIONS = ('dense', 'sparse')
+
+# Precision modes: dtype of the computations, and storage dtypes of the tensors of the matches
+PRECISIONS = {
+    'float64': {'compute': torch.float64, 'score': torch.long, 'player_indices': torch.long, 'weights': torch.float64, 'score_coefficients': torch.float64},
+    'float32': {'compute': torch.float32, 'score': torch.long, 'player_indices': torch.long, 'weights': torch.float32, 'score_coefficients': torch.float32},
+    'compact': {'compute': torch.float32, 'score': torch.int8, 'player_indices': torch.int32, 'weights': torch.float16, 'score_coefficients': torch.float16},
+}
+
+# Utility vector of the point model, per column of player_indices_tensor (see base.prob_teamA_wins_point)
+INCIDENCE_VALUES = (0.5, 0.5, -0.5, -0.5)
+
+# Compiled closed forms of the fused scoring systems, shared by those with the same units (see get_fused_closed_form)
+_FUSED_CLOSED_FORMS: dict[tuple, CompiledFunction] = {}
+
+
+class IncidenceMatVec (torch.autograd.Function):
+    """
+    Product of the sparse incidence matrix U with the abilities, U @ abilities. The backward pass is
+    the product of the transposed matrix with the incoming gradient, U.T @ grad.
+    """
+
+    @staticmethod
+    def forward (ctx, incidence_matrix: torch.Tensor, incidence_matrix_T: torch.Tensor, abilities_tensor: torch.Tensor) -> torch.Tensor:
+        ctx.incidence_matrix_T = incidence_matrix_T
+        return incidence_matrix @ abilities_tensor
+
+    @staticmethod
+    def backward (ctx, grad_output: torch.Tensor):
+        return None, None, ctx.incidence_matrix_T @ grad_output
+
+
+class FusedScoringSystem (ScoringSystem):
+    """
+    Scoring system of the merged matches of several log-likelihood terms (see LogLikelihoodTerm.fuse):
+    the matches of scoring_systems[i] are the rows n_matches[0] + ... + n_matches[i-1] onwards.
+
+    Description:
+        The units of the scoring systems (see ScoringSystem.get_unit_blocks) are merged by position:
+        the j-th unit of the merged scoring system is the j-th unit of each scoring system, over its
+        rows. Consecutive scoring systems whose j-th units have the same parameters (score_end,
+        n_max_advantages) form a single run of rows, computed at once: e.g. for MrDodo then Toringo,
+        the set tie-break and the point are computed once over all the rows, and only the game (with
+        and without advantages) is computed over two runs, then concatenated. Scoring systems with
+        fewer units are padded with points of exponents 0.
+
+    Attributes:
+        scoring_systems : list[ScoringSystem]
+            The merged scoring systems.
+        n_matches : int
+            Total number of matches (rows).
+        units : list[list[tuple[BasicScoreBlock | None, int, int]]]
+            For each merged unit, its runs: block (None for a point), first row and end row.
+        unit_keys : tuple[tuple[tuple | None, ...], ...]
+            For each merged unit, the distinct parameters of the blocks of its runs (see
+            get_block_key), in row order.
+        block_indices : torch.Tensor[torch.uint8] (n_matches, n_units) | None
+            block_indices[i, j] is the index in unit_keys[j] of the block of the j-th unit of the
+            i-th match, the input of the compiled closed form (see compile). None if not compiled.
+    """
+
+    def __init__ (self, scoring_systems: Sequence[ScoringSystem], n_matches: Sequence[int], device: torch.device = torch.device("cpu")) -> None:
+        """
+        Merge the units of scoring systems.
+
+        Args:
+            scoring_systems : Sequence[ScoringSystem]
+                The scoring systems, in row order.
+            n_matches : Sequence[int]
+                Number of matches (rows) of each scoring system.
+            device : torch.device = torch.device("cpu")
+                Device to store tensors on.
+        """
+
+        super().__init__(device)
+        self.n_score_elements = 0
+        self.scoring_systems = list(scoring_systems)
+
+        unit_blocks = [scoring_system.get_unit_blocks() for scoring_system in self.scoring_systems]
+        n_units = max(len(blocks) for blocks in unit_blocks)
+        self.units: list[list[tuple[Optional[BasicScoreBlock], int, int]]] = [[] for _ in range(n_units)]
+        start = 0
+        for blocks, n_matches_system in zip(unit_blocks, n_matches):
+            stop = start + n_matches_system
+            for runs, block in zip(self.units, blocks + [None] * (n_units - len(blocks))):
+                if runs and get_block_key(runs[-1][0]) == get_block_key(block):  # Same unit: extend the last run
+                    runs[-1] = (runs[-1][0], runs[-1][1], stop)
+                else:
+                    runs.append((block, start, stop))
+            start = stop
+        self.n_matches = start
+        self.unit_keys = tuple(tuple(dict.fromkeys(get_block_key(block) for block, _, _ in runs)) for runs in self.units)
+        self.block_indices = None
+
+
+    def to (self, device: torch.device) -> None:
+
+        if self.device != device:
+            self.device = device
+            for scoring_system in self.scoring_systems:
+                scoring_system.to(device)
+            if self.block_indices is not None:
+                self.compile()
+
+
+    def compile (self) -> None:
+        """
+        Compile the closed form of the log-probabilities, see ScoringSystem.compile.
+
+        Description:
+            The compiled function is shared by the fused scoring systems with the same unit_keys
+            (see get_fused_closed_form), e.g. all the chunks or the mini-batches of a fused loss:
+            the rows of the runs are an input (block_indices), not constants, and the number of
+            matches is dynamic, so that new fused scoring systems do not trigger recompilations.
+            Each distinct block of a unit is computed over all the rows, and selected row by row.
+        """
+
+        block_indices = torch.zeros((self.n_matches, len(self.units)), dtype=torch.uint8)
+        for j, (runs, keys) in enumerate(zip(self.units, self.unit_keys)):
+            for block, start, stop in runs:
+                block_indices[start:stop, j] = keys.index(get_block_key(block))
+        self.block_indices = block_indices.to(self.device)
+        self._compiled_log_prob_closed_form = get_fused_closed_form(self.unit_keys, self.device)
+
+
+    def get_log_prob_closed_form (self) -> Callable:
+        """
+        Get the function computing the log-probabilities in closed form, see
+        ScoringSystem.get_log_prob_closed_form. After compile, the shared compiled function applied
+        to block_indices.
+        """
+
+        if self._compiled_log_prob_closed_form is None:
+            return self.log_prob_from_score_coefficients_closed_form
+        compiled_closed_form, block_indices = self._compiled_log_prob_closed_form, self.block_indices
+
+        return lambda score_coefficients, abilities_difference, derivatives=False: compiled_closed_form(score_coefficients, abilities_difference, block_indices, derivatives)
+
+
+    def get_unit_blocks (self) -> list[Optional[BasicScoreBlock]]:
+        """
+        Get the blocks of the first run of each merged unit. See ScoringSystem.get_unit_blocks.
+        """
+
+        return [runs[0][0] for runs in self.units]
+
+
+    def get_unit_probabilities (self, p_teamA_wins_point: torch.Tensor, derivatives: bool = False) -> list[tuple[torch.Tensor, Union[torch.Tensor, float, None]]]:
+        """
+        Get the probabilities of team A winning the merged units, computed run by run. See
+        ScoringSystem.get_unit_probabilities.
+        """
+
+        unit_probabilities = []
+        for runs in self.units:
+            if len(runs) == 1:
+                unit_probabilities.append(get_unit_probability(runs[0][0], p_teamA_wins_point, derivatives))
+                continue
+            runs_probabilities = [get_unit_probability(block, p_teamA_wins_point[start:stop], derivatives) for block, start, stop in runs]
+            p_teamA_wins_unit = torch.cat([p_teamA_wins_run for p_teamA_wins_run, _ in runs_probabilities])
+            derivative = None
+            if derivatives:
+                derivative = torch.cat([
+                    derivative_run if isinstance(derivative_run, torch.Tensor) else torch.full_like(p_teamA_wins_run, derivative_run)
+                    for p_teamA_wins_run, derivative_run in runs_probabilities
+                ])
+            unit_probabilities.append((p_teamA_wins_unit, derivative))
+
+        return unit_probabilities
+
+
+def get_block_key (block: Optional[BasicScoreBlock]) -> Optional[tuple]:
+    """
+    Parameters identifying a unit block (see ScoringSystem.get_unit_blocks): (score_end,
+    n_max_advantages), or None for a point.
+    """
+
+    return None if block is None else (block.score_end, block.n_max_advantages)
+
+
+def get_fused_closed_form (unit_keys: tuple, device: torch.device) -> CompiledFunction:
+    """
+    Get the compiled closed form of the log-probabilities of the fused scoring systems with the
+    given units (see FusedScoringSystem.unit_keys), created on the first call and then shared.
+
+    Args:
+        unit_keys : tuple[tuple[tuple | None, ...], ...]
+            For each unit, the distinct parameters of its blocks (see get_block_key).
+        device : torch.device
+            Device of the tensors of the blocks.
+
+    Returns:
+        fused_closed_form : CompiledFunction
+            Function of (score_coefficients, abilities_difference, block_indices, derivatives=False),
+            with the returns of ScoringSystem.log_prob_from_score_coefficients_closed_form, where
+            block_indices (n_matches, n_units) selects the block of each unit of each match.
+    """
+
+    key = (unit_keys, device)
+    if key not in _FUSED_CLOSED_FORMS:
+        unit_blocks = [[None if block_key is None else BasicScoreBlock(*block_key, device=device) for block_key in keys] for keys in unit_keys]
+
+        def get_unit_probabilities (p_teamA_wins_point: torch.Tensor, block_indices: torch.Tensor, derivatives: bool) -> list[tuple[torch.Tensor, Union[torch.Tensor, float, None]]]:
+            unit_probabilities = []
+            for j, blocks in enumerate(unit_blocks):
+                p_teamA_wins_unit, derivative = get_unit_probability(blocks[0], p_teamA_wins_point, derivatives)
+                for k, block in enumerate(blocks[1:], start=1):
+                    is_block = block_indices[:, j] == k
+                    p_teamA_wins_block, derivative_block = get_unit_probability(block, p_teamA_wins_point, derivatives)
+                    p_teamA_wins_unit = torch.where(is_block, p_teamA_wins_block, p_teamA_wins_unit)
+                    if derivatives:
+                        derivative = torch.where(is_block, torch.as_tensor(derivative_block, dtype=p_teamA_wins_point.dtype), derivative)
+                unit_probabilities.append((p_teamA_wins_unit, derivative))
+            return unit_probabilities
+
+        def fused_closed_form (score_coefficients: torch.Tensor, abilities_difference: torch.Tensor, block_indices: torch.Tensor, derivatives: bool = False):
+            return log_prob_from_unit_probabilities(score_coefficients, abilities_difference, lambda p_teamA_wins_point, derivatives: get_unit_probabilities(p_teamA_wins_point, block_indices, derivatives), derivatives)
+
+        _FUSED_CLOSED_FORMS[key] = CompiledFunction(fused_closed_form)
+
+    return _FUSED_CLOSED_FORMS[key]
 
 
 class LogLikelihoodTerm:
@@ -13,8 +236,12 @@ class LogLikelihoodTerm:
             The scoring system used to compute probabilities.
         device : torch.device
             The device where tensors are stored.
-        score_tensor : torch.Tensor (n_matches, n_score_elements)
-            Stores scores for each match.
+        score_tensor : torch.Tensor (n_matches, n_score_elements) | None
+            Stores scores for each match. None if keep_scores is False.
+        score_coefficients_tensor : torch.Tensor (n_matches, n_score_coefficients)
+            Coefficients of the log-probabilities of the scores, computed once in add with
+            ScoringSystem.get_score_coefficients. The forward pass only evaluates the terms
+            depending on the abilities.
         player_indices_tensor : torch.Tensor (n_matches, 4)
             Stores player indices for each match. 4 players per match.
             Single matches are represented by
@@ -25,15 +252,41 @@ class LogLikelihoodTerm:
             Weights for each match, used in log-likelihood computation.
         n_matches : int
             Number of matches stored.
+        representation : str
+            How the abilities of the players of each match are combined, 'dense' or 'sparse':
+                - 'dense': gather abilities_tensor[player_indices_tensor] (n_matches, 4)
+                - 'sparse': product with the sparse incidence matrix U (n_matches, n_players) in CSR
+                  format, U[i, j] = +-0.5 (+-1 in single matches) if player j plays match i. The
+                  backward pass is a product with U.T instead of a scatter-add.
+        keep_scores : bool
+            Whether score_tensor is kept after computing score_coefficients_tensor.
+        compile : bool
+            Whether the log-probabilities are computed by a function compiled with torch.compile
+            (see ScoringSystem.compile).
+        precision : str
+            Precision mode, a key of PRECISIONS:
+                - 'float64': computations and storage in float64, for reference results
+                - 'float32': computations and storage in float32
+                - 'compact': computations in float32, storage in reduced precision (int8 scores,
+                  int32 player indices, float16 weights and score coefficients), upcast inside the
+                  computations. The exponents of the score coefficients are small integers, exact in
+                  float16; the log-constants are rounded (relative error 5e-4), which shifts the
+                  log-likelihood by a constant, independent of the abilities.
+        dtype : torch.dtype
+            dtype of the computations, PRECISIONS[precision]['compute'].
 
     Methods:
         __call__(abilities_tensor)
         add(score, player_indices, weight)
+        get_incidence_matrices(n_players, dtype=torch.float)
+        get_n_bytes()
+        get_chunk(start, stop)
         to(device)
+        fuse(logLikelihoodTerms, compile=False)
     """
 
 
-    def __init__ (self, scoring_system: ScoringSystem, device: Union[str, torch.device] = 'cpu') -> None:
+    def __init__ (self, scoring_system: ScoringSystem, device: Union[str, torch.device] = 'cpu', representation: str = 'dense', keep_scores: bool = True, compile: bool = False, precision: str = 'float32') -> None:
         """
         Initialize the LogLikelihoodTerm with a scoring system and device.
 
@@ -42,13 +295,38 @@ class LogLikelihoodTerm:
                 The scoring system to use for probability calculations.
             device : str or torch.device = 'cpu'
                 The device to store tensors on.
+            representation : str = 'dense'
+                'dense' or 'sparse'. See the class docstring.
+            keep_scores : bool = True
+                Keep the scores after computing their coefficients. Without scores (score_tensor is
+                None), the log-likelihood can be computed, but not saved (see TennisUniverse.save).
+            compile : bool = False
+                Compile the computation of the log-probabilities and of their derivatives with
+                torch.compile, with fallback to eager mode (see ScoringSystem.compile).
+            precision : str = 'float32'
+                'float64', 'float32' or 'compact'. See the class docstring.
         """
 
+        if representation not in REPRESENTATIONS:
+            raise ValueError(f"representation must be in {REPRESENTATIONS}, got {representation!r}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be in {tuple(PRECISIONS)}, got {precision!r}")
+
         self.scoring_system = scoring_system
         self.device = torch.device(device)
-        self.score_tensor = torch.empty((0, self.scoring_system.n_score_elements), dtype=torch.long, device=self.device)
-        self.player_indices_tensor = torch.empty((0, 4), dtype=torch.long, device=self.device)  # 4 players per match
-        self.weights_tensor = torch.empty((0,), dtype=torch.float, device=self.device)
+        self.representation = representation
+        self.keep_scores = keep_scores
+        self.compile = compile
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]['compute']
+        self._storage_dtypes = PRECISIONS[precision]
+        if compile:
+            self.scoring_system.compile()
+        self._incidence_matrices = None  # Cache of get_incidence_matrices
+        self.score_tensor = torch.empty((0, self.scoring_system.n_score_elements), dtype=self._storage_dtypes['score'], device=self.device) if keep_scores else None
+        self.score_coefficients_tensor = torch.empty((0, 1 + 2*len(self.scoring_system.get_unit_blocks())), dtype=self._storage_dtypes['score_coefficients'], device=self.device)
+        self.player_indices_tensor = torch.empty((0, 4), dtype=self._storage_dtypes['player_indices'], device=self.device)  # 4 players per match
+        self.weights_tensor = torch.empty((0,), dtype=self._storage_dtypes['weights'], device=self.device)
         self.n_matches = 0
 
 
@@ -68,24 +346,29 @@ class LogLikelihoodTerm:
         """
 
         if self.n_matches == 0:
-            return torch.tensor(0.0, device=self.device)
+            return torch.tensor(0.0, dtype=self.dtype, device=self.device)
             
-        # As torch tensor
-        abilities_tensor = as_torch_tensor(abilities_tensor, torch.float, device=self.device)
+        # As torch tensor, in the dtype of the computations
+        abilities_tensor = as_torch_tensor(abilities_tensor, self.dtype, device=self.device)
         assert abilities_tensor.ndim == 1, "abilities_tensor.shape must be (n_players,)"
 
-        # Compute log-probabilities
-        player_abilities = abilities_tensor[self.player_indices_tensor]
-        probabilities = self.scoring_system.prob_this_score(self.score_tensor, player_abilities)
-        log_probabilities = torch.log(probabilities + 1e-40)
+        # Ability differences between team A and team B, d = U @ abilities
+        if self.representation == 'sparse':
+            abilities_difference = IncidenceMatVec.apply(*self.get_incidence_matrices(abilities_tensor.shape[0], abilities_tensor.dtype), abilities_tensor)
+        else:
+            incidence_values = torch.tensor(INCIDENCE_VALUES, dtype=abilities_tensor.dtype, device=self.device)
+            abilities_difference = abilities_tensor[self.player_indices_tensor] @ incidence_values
+
+        # Compute log-probabilities, fused with their derivatives (see ScoringSystem.log_prob_from_score_coefficients)
+        log_probabilities = self.scoring_system.log_prob_from_score_coefficients(self.score_coefficients_tensor, abilities_difference)
 
         # Compute log-likelihood term
-        log_likelihood_term = torch.sum(log_probabilities * self.weights_tensor)
+        log_likelihood_term = torch.sum(log_probabilities * self.weights_tensor.to(self.dtype))
 
         return log_likelihood_term
 
 
-    def add (self, score: Union[torch.Tensor, Sequence], player_indices: Union[torch.Tensor, Sequence], weight: Union[torch.Tensor, Sequence]) -> None:
+    def add (self, score: Union[torch.Tensor, Sequence], player_indices: Union[torch.Tensor, Sequence], weight: Union[torch.Tensor, Sequence], copy: bool = True) -> None:
         """
         Add new match data to the internal tensors.
 
@@ -96,21 +379,149 @@ class LogLikelihoodTerm:
                 The player indices for the new matches.
             weight : torch.Tensor or array-like (n_matches,) or scalar
                 The weights for the new matches.
+            copy : bool = True
+                Copy the tensors, so that later in-place changes by the caller do not change the
+                term. With copy=False, the tensors of the first addition are used as they are when
+                they have the storage dtypes (e.g. memory-mapped arrays, see TennisUniverse.load).
         """
 
-        # As torch tensors
-        score = as_2dim_tensor(as_torch_tensor(score, torch_dtype=torch.long, device=self.device))
-        player_indices = as_2dim_tensor(as_torch_tensor(player_indices, torch_dtype=torch.long, device=self.device))
-        weight = as_torch_tensor(weight, torch_dtype=torch.float, device=self.device).reshape(-1)  # Reshape to 1D
+        # As torch tensors, in the storage dtypes of the precision mode
+        score = as_2dim_tensor(as_torch_tensor(score, torch_dtype=self._storage_dtypes['score'], device=self.device))
+        player_indices = as_2dim_tensor(as_torch_tensor(player_indices, torch_dtype=self._storage_dtypes['player_indices'], device=self.device))
+        weight = as_torch_tensor(weight, torch_dtype=self._storage_dtypes['weights'], device=self.device).reshape(-1)  # Reshape to 1D
 
         if score.shape[0] != player_indices.shape[0] or score.shape[0] != weight.shape[0]:
             raise ValueError("All inputs must have the same number of matches.")
 
-        # Concatenate to internal tensors
-        self.score_tensor = torch.cat([self.score_tensor, score], dim=0)
-        self.player_indices_tensor = torch.cat([self.player_indices_tensor, player_indices], dim=0)
-        self.weights_tensor = torch.cat([self.weights_tensor, weight], dim=0)
-        self.n_matches = self.score_tensor.shape[0]
+        # Coefficients of the log-probabilities, which depend on the scores only
+        score_coefficients = self.scoring_system.get_score_coefficients(score.long()).to(self._storage_dtypes['score_coefficients'])
+
+        # Concatenate to internal tensors (a copy). Without copy, the first tensors are used as they are
+        if self.n_matches == 0 and not copy:
+            self.score_tensor = score if self.keep_scores else None
+            self.score_coefficients_tensor = score_coefficients
+            self.player_indices_tensor = player_indices
+            self.weights_tensor = weight
+        else:
+            if self.keep_scores:
+                self.score_tensor = torch.cat([self.score_tensor, score], dim=0)
+            self.score_coefficients_tensor = torch.cat([self.score_coefficients_tensor, score_coefficients], dim=0)
+            self.player_indices_tensor = torch.cat([self.player_indices_tensor, player_indices], dim=0)
+            self.weights_tensor = torch.cat([self.weights_tensor, weight], dim=0)
+        self.n_matches = self.player_indices_tensor.shape[0]
+        self._incidence_matrices = None
+
+
+    def get_incidence_matrices (self, n_players: int, dtype: torch.dtype = torch.float) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get the sparse incidence matrix U of the matches, and its transpose, both in CSR format.
+
+        Description:
+            U[i, j] is the coefficient of the ability of player j in the ability difference of match
+            i: 0.5 for the players of team A, -0.5 for the players of team B. In single matches, the
+            two entries of each player are summed: +-1, 2 non-zeros instead of 4. The matrices are
+            cached until the matches, the number of players, the dtype or the device change.
+
+        Args:
+            n_players : int
+                Number of players (columns of U).
+            dtype : torch.dtype = torch.float
+                dtype of the values.
+
+        Returns:
+            incidence_matrix : torch.Tensor (n_matches, n_players)
+                U, sparse CSR tensor.
+            incidence_matrix_T : torch.Tensor (n_players, n_matches)
+                U.T, sparse CSR tensor.
+        """
+
+        key = (n_players, dtype, self.device)
+        if self._incidence_matrices is not None and self._incidence_matrices[0] == key:
+            return self._incidence_matrices[1]
+
+        rows = torch.arange(self.n_matches, device=self.device).repeat_interleave(4)
+        columns = self.player_indices_tensor.reshape(-1).long()
+        values = torch.tensor(INCIDENCE_VALUES, dtype=dtype, device=self.device).repeat(self.n_matches)
+
+        with warnings.catch_warnings():
+            # Sparse CSR support is in beta state
+            warnings.filterwarnings('ignore', message=".*[Ss]parse CSR.*")
+            incidence_matrix_coo = torch.sparse_coo_tensor(torch.stack([rows, columns]), values, (self.n_matches, n_players), check_invariants=False).coalesce()
+            incidence_matrices = (incidence_matrix_coo.to_sparse_csr(), incidence_matrix_coo.t().coalesce().to_sparse_csr())
+        self._incidence_matrices = (key, incidence_matrices)
+
+        return incidence_matrices
+
+
+    def get_n_bytes (self) -> int:
+        """
+        Get the memory used by the tensors of the matches (scores, score coefficients, player indices
+        and weights), without the cached incidence matrices.
+
+        Returns:
+            n_bytes : int
+                Number of bytes.
+        """
+
+        tensors = [self.score_tensor, self.score_coefficients_tensor, self.player_indices_tensor, self.weights_tensor]
+        return sum(tensor.element_size() * tensor.numel() for tensor in tensors if tensor is not None)
+
+
+    def get_chunk (self, start: int, stop: int) -> 'LogLikelihoodTerm':
+        """
+        Get the matches start:stop as a LogLikelihoodTerm, e.g. to evaluate chunks of matches
+        concurrently (see Loss).
+
+        Args:
+            start : int
+                First match.
+            stop : int
+                End match (excluded).
+
+        Returns:
+            chunk : LogLikelihoodTerm
+                The matches start:stop. The tensors are views of the tensors of this term (no copy),
+                and the scoring system is shared.
+        """
+
+        chunk = LogLikelihoodTerm(self.scoring_system, device=self.device, representation=self.representation, keep_scores=self.keep_scores, precision=self.precision)
+        chunk.compile = self.compile  # The scoring system is already compiled
+        if self.score_tensor is not None:
+            chunk.score_tensor = self.score_tensor[start:stop]
+        chunk.score_coefficients_tensor = self.score_coefficients_tensor[start:stop]
+        chunk.player_indices_tensor = self.player_indices_tensor[start:stop]
+        chunk.weights_tensor = self.weights_tensor[start:stop]
+        chunk.n_matches = chunk.player_indices_tensor.shape[0]
+
+        return chunk
+
+
+    def get_sample (self, indices: torch.Tensor, weights: torch.Tensor) -> 'LogLikelihoodTerm':
+        """
+        Get a sample of the matches as a LogLikelihoodTerm, with new weights, e.g. a mini-batch
+        (see Loss.get_minibatch).
+
+        Args:
+            indices : torch.Tensor (n_samples,)
+                Indices of the sampled matches. Repetitions are allowed.
+            weights : torch.Tensor (n_samples,)
+                Weights of the sampled matches. Kept in their dtype (e.g. float32 in compact
+                precision, as rescaled weights may exceed the range of float16).
+
+        Returns:
+            sample : LogLikelihoodTerm
+                The sampled matches (copies), without their scores. The scoring system is shared.
+        """
+
+        sample = LogLikelihoodTerm(self.scoring_system, device=self.device, representation=self.representation, keep_scores=False, precision=self.precision)
+        sample.compile = self.compile  # The scoring system is already compiled
+        indices = indices.to(self.device)
+        sample.score_coefficients_tensor = self.score_coefficients_tensor[indices]
+        sample.player_indices_tensor = self.player_indices_tensor[indices]
+        sample.weights_tensor = weights.to(self.device)
+        sample.n_matches = sample.player_indices_tensor.shape[0]
+
+        return sample
 
 
     def to (self, device: torch.device) -> None:
@@ -125,14 +536,67 @@ class LogLikelihoodTerm:
         if self.device != device:
             self.device = device
             self.scoring_system.to(device)
-            self.score_tensor = self.score_tensor.to(device)
+            if self.score_tensor is not None:
+                self.score_tensor = self.score_tensor.to(device)
+            self.score_coefficients_tensor = self.score_coefficients_tensor.to(device)
             self.player_indices_tensor = self.player_indices_tensor.to(device)
             self.weights_tensor = self.weights_tensor.to(device)
+            self._incidence_matrices = None
+
+
+    @classmethod
+    def fuse (cls, logLikelihoodTerms: Sequence['LogLikelihoodTerm'], compile: bool = False) -> 'LogLikelihoodTerm':
+        """
+        Merge log-likelihood terms of different scoring systems into a single term, evaluated in a
+        single pass over all their matches.
+
+        Description:
+            The tensors of the matches are concatenated in term order, and the units of the scoring
+            systems are merged by a FusedScoringSystem. The ability differences, the point
+            probabilities and the units shared by consecutive scoring systems are then computed once
+            for all their matches, and the whole log-likelihood is a single autograd node. The
+            merged tensors are copies: the terms are left unchanged, and the memory of the matches
+            is doubled.
+
+        Args:
+            logLikelihoodTerms : Sequence[LogLikelihoodTerm]
+                The terms to merge, with the same device, representation and precision. Terms without
+                matches are skipped.
+            compile : bool = False
+                Compile the merged term with torch.compile (see ScoringSystem.compile).
+
+        Returns:
+            fused_logLikelihoodTerm : LogLikelihoodTerm
+                The merged term, with a FusedScoringSystem and without scores (keep_scores=False).
+                Same value as the sum of the terms.
+        """
+
+        logLikelihoodTerms = [logLikelihoodTerm for logLikelihoodTerm in logLikelihoodTerms if logLikelihoodTerm.n_matches > 0]
+        if not logLikelihoodTerms:
+            raise ValueError("At least one log-likelihood term with matches is required")
+        device, representation, precision = logLikelihoodTerms[0].device, logLikelihoodTerms[0].representation, logLikelihoodTerms[0].precision
+        if any((logLikelihoodTerm.device, logLikelihoodTerm.representation, logLikelihoodTerm.precision) != (device, representation, precision) for logLikelihoodTerm in logLikelihoodTerms):
+            raise ValueError("All the log-likelihood terms must have the same device, representation and precision")
+
+        scoring_system = FusedScoringSystem([logLikelihoodTerm.scoring_system for logLikelihoodTerm in logLikelihoodTerms], [logLikelihoodTerm.n_matches for logLikelihoodTerm in logLikelihoodTerms], device=device)
+        fused_logLikelihoodTerm = cls(scoring_system, device=device, representation=representation, keep_scores=False, compile=compile, precision=precision)
+
+        # Score coefficients of the merged units, padded with exponents 0 for missing units
+        n_coefficients = 1 + 2*len(scoring_system.units)
+        fused_logLikelihoodTerm.score_coefficients_tensor = torch.cat([
+            torch.nn.functional.pad(logLikelihoodTerm.score_coefficients_tensor, (0, n_coefficients - logLikelihoodTerm.score_coefficients_tensor.shape[1]))
+            for logLikelihoodTerm in logLikelihoodTerms
+        ]).to(fused_logLikelihoodTerm._storage_dtypes['score_coefficients'])
+        fused_logLikelihoodTerm.player_indices_tensor = torch.cat([logLikelihoodTerm.player_indices_tensor for logLikelihoodTerm in logLikelihoodTerms])
+        fused_logLikelihoodTerm.weights_tensor = torch.cat([logLikelihoodTerm.weights_tensor for logLikelihoodTerm in logLikelihoodTerms])
+        fused_logLikelihoodTerm.n_matches = scoring_system.n_matches
+
+        return fused_logLikelihoodTerm
 
 
     def __repr__ (self):
 
-        return f"{self.__class__.__name__}(scoring_system={self.scoring_system.__class__.__name__}, n_matches={self.n_matches})"
+        return f"{self.__class__.__name__}(scoring_system={self.scoring_system.__class__.__name__}, n_matches={self.n_matches}, representation={self.representation!r}, precision={self.precision!r})"
 
 
     def __str__ (self):
@@ -1,9 +1,66 @@
 import torch
-from .LogLikelihoodTerm import LogLikelihoodTerm
-from .utils import as_torch_tensor
+from concurrent.futures import ThreadPoolExecutor
+from torch.autograd.function import once_differentiable
+from .LogLikelihoodTerm import LogLikelihoodTerm, REPRESENTATIONS, PRECISIONS
+from .utils import as_float_tensor
 from . import scoring_systems
-from math import pi
-from typing import Union, Sequence
+from math import ceil, pi
+from typing import Optional, Union, Sequence
+
+
+def evaluate_logLikelihoodTerm (logLikelihoodTerm: LogLikelihoodTerm, abilities_tensor: torch.Tensor, gradient: bool) -> tuple[torch.Tensor, Optional[torch.Tensor]]:
+    """
+    Evaluate a log-likelihood term, and optionally its gradient with respect to the abilities, out of
+    the autograd graph of the caller (e.g. in a worker thread, see ParallelLogLikelihood).
+
+    Returns:
+        value : torch.Tensor (scalar)
+            The log-likelihood term, detached.
+        gradient : torch.Tensor (n_players,) | None
+            Its gradient with respect to abilities_tensor. None if gradient is False.
+    """
+
+    if not gradient:
+        with torch.no_grad():
+            return logLikelihoodTerm(abilities_tensor), None
+
+    with torch.enable_grad():
+        abilities_tensor = abilities_tensor.detach().requires_grad_(True)
+        value = logLikelihoodTerm(abilities_tensor)
+        gradient, = torch.autograd.grad(value, abilities_tensor)
+
+    return value.detach(), gradient
+
+
+class ParallelLogLikelihood (torch.autograd.Function):
+    """
+    Sum of log-likelihood terms evaluated concurrently on a thread pool (see Loss). PyTorch kernels
+    release the GIL, so that the terms run in parallel. Each worker computes the value of its term
+    and, if gradient is True, its gradient with respect to the abilities; values and gradients are
+    then reduced in term order, so that the results do not depend on the scheduling of the threads.
+    The reduced gradient is the only tensor saved for backward.
+    """
+
+    @staticmethod
+    def forward (ctx, abilities_tensor: torch.Tensor, logLikelihoodTerms: Sequence[LogLikelihoodTerm], executor: ThreadPoolExecutor, gradient: bool) -> torch.Tensor:
+        results = list(executor.map(lambda logLikelihoodTerm: evaluate_logLikelihoodTerm(logLikelihoodTerm, abilities_tensor, gradient), logLikelihoodTerms))
+
+        # Deterministic reduction, in term order
+        log_likelihood, total_gradient = results[0]
+        for value, gradient_term in results[1:]:
+            log_likelihood = log_likelihood + value
+            if gradient:
+                total_gradient = total_gradient + gradient_term
+        if gradient:
+            ctx.save_for_backward(total_gradient)
+
+        return log_likelihood
+
+    @staticmethod
+    @once_differentiable
+    def backward (ctx, grad_output: torch.Tensor):
+        total_gradient, = ctx.saved_tensors
+        return grad_output * total_gradient, None, None, None
 
 
 class Loss:
@@ -17,14 +74,39 @@ class Loss:
             Dictionary to store log-likelihood terms.
         regularizationTerm : callable
             Regularization term to be applied.
+        representation : str
+            Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+        keep_scores : bool
+            Whether the log-likelihood terms keep the scores (see LogLikelihoodTerm).
+        compile : bool
+            Whether the log-likelihood terms are compiled with torch.compile (see LogLikelihoodTerm).
+        precision : str
+            Precision mode of the log-likelihood terms, 'float64', 'float32' or 'compact' (see
+            LogLikelihoodTerm).
+        dtype : torch.dtype
+            dtype of the computations, float64 for 'float64', float32 otherwise.
+        fused : bool
+            Whether the log-likelihood terms are evaluated in a single pass over all their matches
+            (see LogLikelihoodTerm.fuse).
+        n_workers : int
+            Number of threads evaluating the log-likelihood terms. 1 for sequential evaluation.
+        chunk_size : int | None
+            Number of matches of the chunks the log-likelihood terms are split into. None for
+            n_workers chunks of equal size (no split if n_workers is 1).
+        n_threads_per_worker : int | None
+            Number of intra-op threads of each worker (torch.set_num_threads). None for
+            torch.get_num_threads() // n_workers, at least 1.
 
     Methods:
         __call__(abilities_tensor)
+        close()
+        get_evaluated_terms()
+        get_minibatch(batch_size, weighted, generator)
         to(device)
         add(scoring_system_name, score, player_indices, weight)
     """
 
-    def __init__ (self, Regularization: str = 'L2', coupling_const: float = 1/(2*pi), device: Union[str, torch.device] = 'cpu') -> None:
+    def __init__ (self, Regularization: str = 'L2', coupling_const: float = 1/(2*pi), device: Union[str, torch.device] = 'cpu', representation: str = 'dense', keep_scores: bool = True, compile: bool = False, precision: str = 'float32', fused: bool = False, n_workers: int = 1, chunk_size: Optional[int] = None, n_threads_per_worker: Optional[int] = None) -> None:
         """
         Initialize the Loss class with regularization and device.
 
@@ -35,11 +117,57 @@ class Loss:
                 Coupling constant for regularization.
             device : str or torch.device = 'cpu'
                 Device to store tensors on.
+            representation : str = 'dense'
+                Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+            keep_scores : bool = True
+                Whether the log-likelihood terms keep the scores after computing their coefficients
+                (see LogLikelihoodTerm).
+            compile : bool = False
+                Compile the log-likelihood terms with torch.compile, with fallback to eager mode (see
+                LogLikelihoodTerm).
+            precision : str = 'float32'
+                Precision mode of the log-likelihood terms, 'float64', 'float32' or 'compact' (see
+                LogLikelihoodTerm).
+            fused : bool = False
+                Evaluate the log-likelihood terms of all the scoring systems in a single pass: a term
+                merging them all is built on the first evaluation after adding matches (see
+                LogLikelihoodTerm.fuse). Faster with several scoring systems, at the cost of a copy
+                of the matches.
+            n_workers : int = 1
+                Evaluate the log-likelihood terms on a pool of n_workers threads: the matches are
+                split into chunks (see LogLikelihoodTerm.get_chunk, fused chunks if fused), which are
+                evaluated concurrently, forward and backward (see ParallelLogLikelihood). The results
+                do not depend on the scheduling of the threads.
+            chunk_size : int | None = None
+                Number of matches of the chunks. Defaults to None, n_workers chunks of equal size.
+            n_threads_per_worker : int | None = None
+                Number of intra-op threads of each worker. Defaults to None, the number of threads of
+                torch (torch.get_num_threads(), see cli --threads) divided among the workers.
         """
 
+        if representation not in REPRESENTATIONS:
+            raise ValueError(f"representation must be in {REPRESENTATIONS}, got {representation!r}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be in {tuple(PRECISIONS)}, got {precision!r}")
+        if n_workers < 1 or (chunk_size is not None and chunk_size < 1):
+            raise ValueError("n_workers and chunk_size must be at least 1")
+
         self.device = torch.device(device)
+        self.representation = representation
+        self.keep_scores = keep_scores
+        self.compile = compile
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]['compute']
+        self.fused = fused
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.n_threads_per_worker = n_threads_per_worker
         
         self.logLikelihoodTerms: dict[str, LogLikelihoodTerm] = {}
+        self._evaluated_terms = None  # Cache of get_evaluated_terms
+        self._executor = None  # Thread pool, if n_workers > 1
+        self._owns_executor = True  # False for the thread pool of another loss (see get_minibatch)
+        self._cumulative_weights = {}  # Cache of the cumulative weights of the terms, for get_minibatch
 
         if Regularization == 'L1':
             self.regularizationTerm = L1_Regularization(coupling_const, device=self.device)
@@ -64,11 +192,17 @@ class Loss:
         """
 
         # Init loss
-        loss = torch.tensor(0., dtype=torch.float, device=self.device)
-
-        # Sum (negative) log-likelihood terms
-        for _, logLikelihoodTerm in self.logLikelihoodTerms.items():
-            loss = loss - logLikelihoodTerm(abilities_tensor)
+        loss = torch.tensor(0., dtype=self.dtype, device=self.device)
+
+        # Sum (negative) log-likelihood terms, sequentially or on the thread pool
+        logLikelihoodTerms = self.get_evaluated_terms()
+        if self.n_workers > 1 and logLikelihoodTerms:
+            abilities_tensor = as_float_tensor(abilities_tensor, device=self.device)
+            gradient = torch.is_grad_enabled() and abilities_tensor.requires_grad
+            loss = loss - ParallelLogLikelihood.apply(abilities_tensor, logLikelihoodTerms, self._get_executor(), gradient)
+        else:
+            for logLikelihoodTerm in logLikelihoodTerms:
+                loss = loss - logLikelihoodTerm(abilities_tensor)
 
         # Add regularization term  
         loss = loss + self.regularizationTerm(abilities_tensor)
@@ -90,9 +224,164 @@ class Loss:
             for _, logLikelihoodTerm in self.logLikelihoodTerms.items():
                 logLikelihoodTerm.to(device)
             self.regularizationTerm.to(device)
+            self._evaluated_terms = None
+            self._cumulative_weights = {}
+
+
+    def _get_executor (self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool evaluating the log-likelihood terms, created on the first call.
+        """
+
+        if self._executor is None:
+            n_threads_per_worker = self.n_threads_per_worker or max(1, torch.get_num_threads() // self.n_workers)
+            self._executor = ThreadPoolExecutor(max_workers=self.n_workers, initializer=torch.set_num_threads, initargs=(n_threads_per_worker,))
+
+        return self._executor
+
+
+    def close (self) -> None:
+        """
+        Shut down the thread pool evaluating the log-likelihood terms, if this loss created it. The
+        thread pool of the loss a mini-batch comes from (see get_minibatch) is left to that loss. A
+        new thread pool is created if the loss is evaluated again. Also called on deletion, and on
+        exit of a with statement:
+
+            with Loss(n_workers=4) as loss:
+                ...
+        """
+
+        executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=True)
+        self._owns_executor = True
+
+
+    def __enter__ (self) -> 'Loss':
+
+        return self
+
+
+    def __exit__ (self, *exc_info) -> None:
+
+        self.close()
+
+
+    def __del__ (self) -> None:
+
+        if getattr(self, '_executor', None) is not None:
+            self.close()
+
+
+    def get_minibatch (self, batch_size: int, weighted: bool = False, generator: Optional[torch.Generator] = None) -> 'Loss':
+        """
+        Get the loss of a random mini-batch of matches, an unbiased estimate of this loss.
+
+        Description:
+            batch_size matches are sampled with replacement, split among the log-likelihood terms
+            in proportion to their number of matches (or to their total weight if weighted):
+                - uniformly, with weights rescaled by n_matches / n_samples of their term;
+                - or, if weighted, with probabilities proportional to their weights
+                  (log_likelihood_weight), all with weight total_weight / n_samples of their term.
+            The expectation of the log-likelihood of the mini-batch is then the log-likelihood of
+            all the matches, whose scale with respect to the regularization term is kept: the
+            regularization term is not sampled.
+
+        Args:
+            batch_size : int
+                Number of sampled matches.
+            weighted : bool = False
+                Sample the matches with probabilities proportional to their weights (lower variance
+                when the weights vary, e.g. with the age of the matches).
+            generator : torch.Generator | None = None
+                Generator of the random samples (on the CPU).
+
+        Returns:
+            minibatch : Loss
+                The loss of the mini-batch, with the options and the regularization term of this loss,
+                and its thread pool (if n_workers > 1): closing the mini-batch does not shut it down.
+        """
+
+        minibatch = Loss(representation=self.representation, keep_scores=False, compile=self.compile, precision=self.precision, fused=self.fused, n_workers=self.n_workers, chunk_size=self.chunk_size, n_threads_per_worker=self.n_threads_per_worker)
+        minibatch.device = self.device
+        minibatch.regularizationTerm = self.regularizationTerm
+        if self.n_workers > 1:
+            minibatch._executor, minibatch._owns_executor = self._get_executor(), False
+
+        # Cumulative weights of the terms, computed once (in float64, for the sampling)
+        logLikelihoodTerms = {name: term for name, term in self.logLikelihoodTerms.items() if term.n_matches > 0}
+        if weighted:
+            for name, logLikelihoodTerm in logLikelihoodTerms.items():
+                if name not in self._cumulative_weights:
+                    self._cumulative_weights[name] = torch.cumsum(logLikelihoodTerm.weights_tensor.cpu().double(), 0)
+            sizes = {name: self._cumulative_weights[name][-1].item() for name in logLikelihoodTerms}
+        else:
+            sizes = {name: logLikelihoodTerm.n_matches for name, logLikelihoodTerm in logLikelihoodTerms.items()}
+        total_size = sum(sizes.values())
+
+        for name, logLikelihoodTerm in logLikelihoodTerms.items():
+            if sizes[name] <= 0:
+                continue
+            n_samples = max(1, round(batch_size * sizes[name] / total_size))
+            if weighted:
+                total_weight = sizes[name]
+                uniform = torch.rand(n_samples, dtype=torch.float64, generator=generator) * total_weight
+                indices = torch.searchsorted(self._cumulative_weights[name], uniform, right=True).clamp_(max=logLikelihoodTerm.n_matches - 1)
+                weights = torch.full((n_samples,), total_weight / n_samples, dtype=self.dtype)
+            else:
+                indices = torch.randint(logLikelihoodTerm.n_matches, (n_samples,), generator=generator)
+                weights = logLikelihoodTerm.weights_tensor[indices.to(self.device)].to(self.dtype) * (logLikelihoodTerm.n_matches / n_samples)
+            minibatch.logLikelihoodTerms[name] = logLikelihoodTerm.get_sample(indices, weights)
+
+        return minibatch
+
+
+    def get_evaluated_terms (self) -> list[LogLikelihoodTerm]:
+        """
+        Get the log-likelihood terms evaluated by __call__, built on the first call after adding
+        matches: the log-likelihood terms with matches, or their merge if fused (see
+        LogLikelihoodTerm.fuse), split into chunks if n_workers > 1 or chunk_size is set. Chunks of
+        fused terms span the matches of consecutive scoring systems.
+
+        Returns:
+            logLikelihoodTerms : list[LogLikelihoodTerm]
+                The terms whose sum is the log-likelihood.
+        """
+
+        if self._evaluated_terms is not None:
+            return self._evaluated_terms
+
+        logLikelihoodTerms = [logLikelihoodTerm for logLikelihoodTerm in self.logLikelihoodTerms.values() if logLikelihoodTerm.n_matches > 0]
+        n_matches = sum(logLikelihoodTerm.n_matches for logLikelihoodTerm in logLikelihoodTerms)
+        chunk_size = self.chunk_size if self.chunk_size is not None else ceil(n_matches / self.n_workers)
+        if not logLikelihoodTerms or (self.chunk_size is None and self.n_workers == 1):
+            # No split
+            chunk_size = max(n_matches, 1)
+
+        if self.fused:
+            # Chunks of the concatenated matches of all the terms
+            evaluated_terms = []
+            for start in range(0, n_matches, chunk_size):
+                stop, chunks, offset = start + chunk_size, [], 0
+                for logLikelihoodTerm in logLikelihoodTerms:
+                    if start < offset + logLikelihoodTerm.n_matches and offset < stop:
+                        chunks.append(logLikelihoodTerm.get_chunk(max(start - offset, 0), min(stop - offset, logLikelihoodTerm.n_matches)))
+                    offset += logLikelihoodTerm.n_matches
+                evaluated_terms.append(LogLikelihoodTerm.fuse(chunks, compile=self.compile))
+        elif chunk_size >= max((logLikelihoodTerm.n_matches for logLikelihoodTerm in logLikelihoodTerms), default=0):
+            evaluated_terms = logLikelihoodTerms
+        else:
+            evaluated_terms = [
+                logLikelihoodTerm.get_chunk(start, start + chunk_size)
+                for logLikelihoodTerm in logLikelihoodTerms
+                for start in range(0, logLikelihoodTerm.n_matches, chunk_size)
+            ]
+        self._evaluated_terms = evaluated_terms
+
+        return evaluated_terms
 
     
-    def add (self, scoring_system_name: str, score: Union[torch.Tensor, Sequence], player_indices: Union[torch.Tensor, Sequence], weight: Union[torch.Tensor, Sequence]) -> None:
+    def add (self, scoring_system_name: str, score: Union[torch.Tensor, Sequence], player_indices: Union[torch.Tensor, Sequence], weight: Union[torch.Tensor, Sequence], copy: bool = True) -> None:
         """
         Add new match data to the log-likelihood term specified by scoring_system_name.
 
@@ -105,15 +394,19 @@ class Loss:
                 Player indices for the new matches.
             weight : torch.Tensor or array-like (n_matches,) or scalar
                 Weights for the new matches.
+            copy : bool = True
+                Copy the tensors (see LogLikelihoodTerm.add).
         """
 
         # Init the log-likelihood term if it does not already exist in self.logLikelihoodTerms
         if scoring_system_name not in self.logLikelihoodTerms:
             ScoringSystemClass = getattr(scoring_systems, scoring_system_name)
-            self.logLikelihoodTerms[scoring_system_name] = LogLikelihoodTerm(ScoringSystemClass(), device=self.device)
+            self.logLikelihoodTerms[scoring_system_name] = LogLikelihoodTerm(ScoringSystemClass(), device=self.device, representation=self.representation, keep_scores=self.keep_scores, compile=self.compile, precision=self.precision)
 
         # Add new match data to the log-likelihood term
-        self.logLikelihoodTerms[scoring_system_name].add(score, player_indices, weight)
+        self.logLikelihoodTerms[scoring_system_name].add(score, player_indices, weight, copy=copy)
+        self._evaluated_terms = None
+        self._cumulative_weights = {}
 
     
     def __repr__ (self):
@@ -178,7 +471,7 @@ class L1_Regularization:
                 L1 regularization term.
         """
         # As torch tensor
-        abilities_tensor = as_torch_tensor(abilities_tensor, torch_dtype=torch.float, device=self.device)
+        abilities_tensor = as_float_tensor(abilities_tensor, device=self.device)
         assert abilities_tensor.ndim == 1, "abilities_tensor.shape must be (n_players,)"
 
         # Compute regularization term
@@ -255,7 +548,7 @@ class L2_Regularization:
         """
 
         # As torch tensor
-        abilities_tensor = as_torch_tensor(abilities_tensor, torch_dtype=torch.float, device=self.device)
+        abilities_tensor = as_float_tensor(abilities_tensor, device=self.device)
         assert abilities_tensor.ndim == 1, "abilities_tensor.shape must be (n_players,)"
 
         # Compute regularization term
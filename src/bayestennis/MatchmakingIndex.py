@@ -0,0 +1,260 @@
+import pandas as pd
+import numpy as np
+import torch
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional, Union, Sequence
+from .structures import PlayersDataFrame, MatchmakingDataFrame
+from . import scoring_systems
+
+
+class MatchmakingIndex:
+    """
+    MatchmakingIndex answers "who are the most evenly matched opponents of a player?" queries.
+
+    Description:
+        The probability of winning a single match is monotone in the ability difference, so the most
+        evenly matched opponents of a player are its nearest neighbours in ability. Abilities are kept
+        in a sorted list: a query bisects the player's ability and expands outward, skipping the
+        candidates rejected by the filters, until k opponents are found.
+
+    Attributes:
+        scoring_system : ScoringSystem
+            The scoring system used to compute win probabilities.
+        device : torch.device
+            The device to compute win probabilities on.
+        n_players : int
+            Number of players in the index.
+
+    Methods:
+        query(id_player, k=10, active_since=None, min_singles=0, min_doubles=0, exclude=())
+        update(id_player, ability, name=None, last_date=None, n_singles=None, n_doubles=None)
+        update_abilities(player_ids, abilities)
+        remove(id_player)
+    """
+
+    def __init__ (self, playersDataFrame: PlayersDataFrame, scoring_system_name: str = 'MrDodo', device: Union[str, torch.device] = 'cpu') -> None:
+        """
+        Build the index from a PlayersDataFrame with optimized abilities.
+
+        Args:
+            playersDataFrame : PlayersDataFrame
+                The PlayersDataFrame containing the player information. See TennisUniverse.optimize.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system used to compute win probabilities.
+            device : str or torch.device = 'cpu'
+                The device to compute win probabilities on.
+        """
+
+        if playersDataFrame['ability'].isna().any():
+            raise ValueError("Abilities are not available: run TennisUniverse.optimize() first")
+
+        self.device = torch.device(device)
+        self.scoring_system = getattr(scoring_systems, scoring_system_name)(device=self.device)
+
+        # Player information, by id_player
+        self._ability = dict(zip(playersDataFrame['id_player'], playersDataFrame['ability'].astype(float)))
+        self._name = dict(zip(playersDataFrame['id_player'], playersDataFrame['name']))
+        self._last_date = dict(zip(playersDataFrame['id_player'], playersDataFrame['last_date']))
+        self._n_singles = dict(zip(playersDataFrame['id_player'], playersDataFrame['n_singles']))
+        self._n_doubles = dict(zip(playersDataFrame['id_player'], playersDataFrame['n_doubles']))
+
+        # Sorted abilities, and corresponding player ids
+        order = np.argsort(playersDataFrame['ability'].to_numpy(dtype=float), kind='stable')
+        self._sorted_abilities = playersDataFrame['ability'].to_numpy(dtype=float)[order].tolist()
+        self._sorted_ids = playersDataFrame['id_player'].to_numpy()[order].tolist()
+
+
+    @property
+    def n_players (self) -> int:
+
+        return len(self._sorted_ids)
+
+
+    def query (self,
+               id_player: int,
+               k: int = 10,
+               active_since: Optional[datetime] = None,
+               min_singles: int = 0,
+               min_doubles: int = 0,
+               exclude: Sequence[int] = ()) -> MatchmakingDataFrame:
+        """
+        Find the k most evenly matched opponents of a player.
+
+        Args:
+            id_player : int
+                Identifier of the player.
+            k : int = 10
+                Number of opponents to find.
+            active_since : datetime | None = None
+                If given, only players whose last match is not older than active_since are considered.
+            min_singles : int = 0
+                Minimum number of single matches played by the opponents.
+            min_doubles : int = 0
+                Minimum number of double matches played by the opponents.
+            exclude : Sequence[int] = ()
+                Identifiers of players not to consider (e.g. not available).
+
+        Returns:
+            matchmakingDataFrame : MatchmakingDataFrame
+                The opponents, from the most to the least evenly matched.
+        """
+
+        if id_player not in self._ability:
+            raise KeyError(f"Player not in the index: {id_player}")
+        ability = self._ability[id_player]
+        exclude = set(exclude) | {id_player}
+
+        def is_admittable (id_candidate: int) -> bool:
+            if id_candidate in exclude: return False
+            if active_since is not None and not self._last_date[id_candidate] >= active_since: return False
+            if self._n_singles[id_candidate] < min_singles: return False
+            if self._n_doubles[id_candidate] < min_doubles: return False
+            return True
+
+        # Expand outward from the player's position, taking the closest admittable candidate each time
+        opponents = []
+        idx_right = bisect_left(self._sorted_abilities, ability)
+        idx_left = idx_right - 1
+        n_sorted = len(self._sorted_abilities)
+        while len(opponents) < k and (idx_left >= 0 or idx_right < n_sorted):
+            if idx_right >= n_sorted or (idx_left >= 0 and ability - self._sorted_abilities[idx_left] <= self._sorted_abilities[idx_right] - ability):
+                id_candidate = self._sorted_ids[idx_left]
+                idx_left -= 1
+            else:
+                id_candidate = self._sorted_ids[idx_right]
+                idx_right += 1
+            if is_admittable(id_candidate):
+                opponents.append(id_candidate)
+
+        # Predicted probabilities, in a single batch
+        opponent_abilities = np.array([self._ability[id_opponent] for id_opponent in opponents], dtype=float)
+        if opponents:
+            abilities = torch.tensor(np.stack([np.full_like(opponent_abilities, ability), opponent_abilities], axis=-1), dtype=torch.float, device=self.device)
+            p_teamA_wins = self.scoring_system.prob_teamA_wins(abilities).cpu().numpy()
+        else:
+            p_teamA_wins = np.empty(0)
+
+        matchmakingDataFrame = pd.DataFrame({
+            'id_player': np.array(opponents, dtype=int),
+            'name': [self._name[id_opponent] for id_opponent in opponents],
+            'ability': opponent_abilities,
+            'ability_difference': ability - opponent_abilities,
+            'prob_teamA_wins': p_teamA_wins,
+        })
+
+        return matchmakingDataFrame
+
+
+    def update (self,
+                id_player: int,
+                ability: float,
+                name: Optional[str] = None,
+                last_date: Optional[datetime] = None,
+                n_singles: Optional[int] = None,
+                n_doubles: Optional[int] = None) -> None:
+        """
+        Update (or insert) a player, keeping the index sorted.
+
+        Args:
+            id_player : int
+                Identifier of the player.
+            ability : float
+                New ability of the player.
+            name : str | None = None
+                Name of the player. Required for new players.
+            last_date : datetime | None = None
+                Date of the last match of the player. Set to None to keep the current value.
+            n_singles : int | None = None
+                Number of single matches of the player. Set to None to keep the current value.
+            n_doubles : int | None = None
+                Number of double matches of the player. Set to None to keep the current value.
+        """
+
+        if id_player in self._ability:
+            self._remove_from_sorted(id_player)
+        else:
+            if name is None:
+                raise ValueError(f"name is required to insert a new player: {id_player}")
+            self._last_date[id_player] = pd.NaT
+            self._n_singles[id_player] = 0
+            self._n_doubles[id_player] = 0
+
+        self._ability[id_player] = float(ability)
+        if name is not None: self._name[id_player] = name
+        if last_date is not None: self._last_date[id_player] = last_date
+        if n_singles is not None: self._n_singles[id_player] = n_singles
+        if n_doubles is not None: self._n_doubles[id_player] = n_doubles
+
+        idx = bisect_left(self._sorted_abilities, float(ability))
+        self._sorted_abilities.insert(idx, float(ability))
+        self._sorted_ids.insert(idx, id_player)
+
+
+    def update_abilities (self, player_ids: Sequence[int], abilities: Sequence[float]) -> None:
+        """
+        Update the abilities of players already in the index.
+
+        Description:
+            Few changes are applied incrementally. When many abilities change (e.g. after a new
+            optimization), the sorted list is rebuilt at once.
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the players.
+            abilities : Sequence[float]
+                New abilities of the players.
+        """
+
+        player_ids, abilities = list(player_ids), [float(ability) for ability in abilities]
+        unknown = [id_player for id_player in player_ids if id_player not in self._ability]
+        if unknown:
+            raise KeyError(f"Players not in the index: {unknown}")
+
+        if len(player_ids) * 8 < self.n_players:
+            for id_player, ability in zip(player_ids, abilities):
+                self.update(id_player, ability)
+        else:
+            self._ability.update(zip(player_ids, abilities))
+            ids = np.array(list(self._ability.keys()))
+            all_abilities = np.array(list(self._ability.values()), dtype=float)
+            order = np.argsort(all_abilities, kind='stable')
+            self._sorted_abilities = all_abilities[order].tolist()
+            self._sorted_ids = ids[order].tolist()
+
+
+    def remove (self, id_player: int) -> None:
+        """
+        Remove a player from the index.
+
+        Args:
+            id_player : int
+                Identifier of the player.
+        """
+
+        self._remove_from_sorted(id_player)
+        for attribute in [self._ability, self._name, self._last_date, self._n_singles, self._n_doubles]:
+            del attribute[id_player]
+
+
+    def _remove_from_sorted (self, id_player: int) -> None:
+        """
+        Remove a player from the sorted lists, locating it by bisection on its current ability.
+        """
+
+        ability = self._ability[id_player]
+        idx = bisect_left(self._sorted_abilities, ability)
+        while self._sorted_ids[idx] != id_player:
+            idx += 1
+        del self._sorted_abilities[idx]
+        del self._sorted_ids[idx]
+
+
+    def __repr__ (self):
+
+        return f"{self.__class__.__name__}(n_players={self.n_players}, scoring_system={self.scoring_system.__class__.__name__})"
+
+
+    def __str__ (self):
+
+        return repr(self)
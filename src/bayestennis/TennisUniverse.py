@@ -1,11 +1,21 @@
 import pandas as pd
 import numpy as np
 import torch
+import json
+import os
+import time
+from math import ceil, log
+from pathlib import Path
 from torch.optim.lr_scheduler import LambdaLR
-from typing import Union
-from .structures import TennisDataFrame, PlayersDataFrame, OptimizationInfo
-from .Loss import Loss
+from typing import Iterable, Optional, Union, Sequence
+from .structures import SCORE_COLUMNS, as_score_array, TennisDataFrame, PlayersDataFrame, OptimizationInfo, RoundRobinDataFrame, DoublesDataFrame, SwissRoundDataFrame, SwissSimulationDataFrame
+from .Loss import Loss, L1_Regularization
+from . import scoring_systems
+from .simulation import simulate_round_robin
+from .pairing import balanced_doubles_exact, balanced_doubles_local_search, MAX_PLAYERS_EXACT_DOUBLES
+from .pairing import get_swiss_standings, swiss_pairings, simulate_swiss
 from .utils import TicToc
+from ._version import SNAPSHOT_FORMAT_VERSION
 
 
 class TennisUniverse:
@@ -21,15 +31,41 @@ class TennisUniverse:
             The Loss object used for optimization.
         device : torch.device
             The device to store tensors on.        
+        abilities_tensor : torch.Tensor | None
+            Raw (not normalized) abilities found by the last optimization. None before optimizing.
+        optimizer_state_dict : dict | None
+            State of the optimizer at the end of the last optimization. None before optimizing.
+        representation : str
+            Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+        compile : bool
+            Whether the log-likelihood terms are compiled with torch.compile (see LogLikelihoodTerm).
+        precision : str
+            Precision mode of the log-likelihood terms, 'float64', 'float32' or 'compact' (see
+            LogLikelihoodTerm).
+        fused : bool
+            Whether the log-likelihood terms are evaluated in a single pass (see Loss).
+        n_workers : int
+            Number of threads evaluating the log-likelihood terms (see Loss).
+        chunk_size : int | None
+            Number of matches of the chunks evaluated by the threads (see Loss).
 
     Methods:
         get_playersDataFrame_from_tennisDataFrame(tennisDataFrame)
         get_loss_from_tennisDataFrame(tennisDataFrame)
-        optimize(n_iter=1000, lr_start=1e-1, lr_end=1e-3, verbose=100)
+        from_tennisDataFrame_chunks(tdf_chunks, device='cpu', representation='dense', compile=False, precision='float32', fused=False, n_workers=1, chunk_size=None)
+        optimize(n_iter=1000, lr_start=1e-1, lr_end=1e-3, verbose=100, checkpoint_path=None, checkpoint_every_iter=None, checkpoint_every_seconds=None, resume_from=None)
+        simulate_round_robin(player_ids, n_qualified=2, n_simulations=10000, scoring_system_name='MrDodo', seed=None)
+        balanced_doubles(player_ids, n_courts, scoring_system_name='MrDodo')
+        swiss_pairings(player_ids, results=None, scoring_system_name='MrDodo')
+        simulate_swiss(player_ids, n_rounds, results=None, n_top=8, n_simulations=100, scoring_system_name='MrDodo', seed=None)
+        prob_teamA_wins(player_ids, scoring_system_name='MrDodo')
+        get_abilities(player_ids)
+        save(path)
+        load(path, mmap=True, device='cpu', representation=None, compile=False, precision=None, fused=False, n_workers=1, chunk_size=None)
         to(device)
     """
 
-    def __init__ (self, tennisDataFrame: TennisDataFrame, device: Union[str, torch.device] = 'cpu') -> None:
+    def __init__ (self, tennisDataFrame: TennisDataFrame, device: Union[str, torch.device] = 'cpu', representation: str = 'dense', compile: bool = False, precision: str = 'float32', fused: bool = False, n_workers: int = 1, chunk_size: Optional[int] = None) -> None:
         """
         Initialize the TennisUniverse with a TennisDataFrame and a device.
 
@@ -38,12 +74,42 @@ class TennisUniverse:
                 The TennisDataFrame containing the data.
             device : str or torch.device = 'cpu'
                 The device to store tensors on.
+            representation : str = 'dense'
+                Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+                'sparse' is faster for large numbers of matches.
+            compile : bool = False
+                Compile the computation of the loss and of its gradient with torch.compile (inductor
+                backend), one compiled function per scoring system, with fallback to eager mode.
+                The first optimization is slower (compilation); compiled artifacts are cached across
+                processes (see utils.CompiledFunction).
+            precision : str = 'float32'
+                Precision mode of the log-likelihood terms (see LogLikelihoodTerm). 'float64' computes
+                the loss and optimizes the abilities in float64, for reference results. 'compact'
+                stores the matches in reduced precision (about 3 times less memory), and computes in
+                float32.
+            fused : bool = False
+                Evaluate the log-likelihood terms of all the scoring systems in a single pass (see
+                Loss). Faster with several scoring systems.
+            n_workers : int = 1
+                Evaluate the loss on a pool of n_workers threads, each evaluating chunks of matches
+                forward and backward (see Loss). The number of threads of torch is divided among
+                the workers.
+            chunk_size : int | None = None
+                Number of matches of the chunks. Defaults to None, n_workers chunks of equal size.
         """
 
         self.device = torch.device(device)
+        self.representation = representation
+        self.compile = compile
+        self.precision = precision
+        self.fused = fused
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
         self.tennisDataFrame = tennisDataFrame
         self.playersDataFrame = self.get_playersDataFrame_from_tennisDataFrame(self.tennisDataFrame)
         self.loss = self.get_loss_from_tennisDataFrame(self.tennisDataFrame)
+        self.abilities_tensor: Optional[torch.Tensor] = None
+        self.optimizer_state_dict: Optional[dict] = None
 
         self.loss.to(self.device)
 
@@ -60,6 +126,8 @@ class TennisUniverse:
         if self.device != device:
             self.device = torch.device(device)
             self.loss.to(device)
+            if self.abilities_tensor is not None:
+                self.abilities_tensor = self.abilities_tensor.to(device)
 
 
     def get_playersDataFrame_from_tennisDataFrame(self, tdf: TennisDataFrame) -> PlayersDataFrame:
@@ -78,34 +146,10 @@ class TennisUniverse:
         # Filter out invalid rows
         tdf_valid = tdf[tdf['is_valid']]
 
-        # Extract all player-related information
-        player_records = []
-        for _, row in tdf_valid.iterrows():
-            if row['match_type'] == 'single':
-                player_records.append({'id_player': row['id_teamA_player1'], 'name': row['teamA_player1_name'], 'match_type': 'single', 'date': row['date'], 'tournament': row['tournament']})
-                player_records.append({'id_player': row['id_teamB_player1'], 'name': row['teamB_player1_name'], 'match_type': 'single', 'date': row['date'], 'tournament': row['tournament']})
-            elif row['match_type'] == 'double':
-                player_records.append({'id_player': row['id_teamA_player1'], 'name': row['teamA_player1_name'], 'match_type': 'double', 'date': row['date'], 'tournament': row['tournament']})
-                player_records.append({'id_player': row['id_teamA_player2'], 'name': row['teamA_player2_name'], 'match_type': 'double', 'date': row['date'], 'tournament': row['tournament']})
-                player_records.append({'id_player': row['id_teamB_player1'], 'name': row['teamB_player1_name'], 'match_type': 'double', 'date': row['date'], 'tournament': row['tournament']})
-                player_records.append({'id_player': row['id_teamB_player2'], 'name': row['teamB_player2_name'], 'match_type': 'double', 'date': row['date'], 'tournament': row['tournament']})
-        player_records = pd.DataFrame(player_records)
-
-        # Group by player id to compute required statistics
-        grouped = player_records.groupby('id_player')
-
-        playersDataFrame = grouped.apply(lambda group: pd.Series({
-            'name': group['name'].iloc[0],
-            'ability': np.nan,
-            'rank': np.nan,
-            'n_singles': (group['match_type'] == 'single').sum(),
-            'n_doubles': (group['match_type'] == 'double').sum(),
-            'n_matches': len(group),
-            'last_date': group['date'].max(),
-            'last_tournament': group.loc[group['date'].idxmax(), 'tournament']
-        })).reset_index()
-
-        return playersDataFrame
+        # Extract all player-related information, and group by player id to compute required statistics
+        player_statistics = aggregate_player_statistics(get_player_statistics(tdf_valid))
+
+        return get_playersDataFrame_from_player_statistics(player_statistics)
     
 
     def get_loss_from_tennisDataFrame (self, tdf: TennisDataFrame) -> Loss:
@@ -125,32 +169,94 @@ class TennisUniverse:
         tdf_valid = tdf[tdf['is_valid']]
 
         # Init loss
-        loss = Loss()
+        loss = Loss(representation=self.representation, compile=self.compile, precision=self.precision, fused=self.fused, n_workers=self.n_workers, chunk_size=self.chunk_size)
 
-        # Add log likelihood terms
-        for _, row in tdf_valid.iterrows():
+        # Add log likelihood terms, one scoring system at a time
+        for scoring_system_name, (score, player_indices, weight) in get_loss_arrays(tdf_valid).items():
+            loss.add(scoring_system_name, torch.from_numpy(score), torch.from_numpy(player_indices), torch.from_numpy(weight))
+            
+        return loss
 
-            scoring_system_name = row['scoring_system']
-            score = row['normalized_score_AvsB']
-            weight = row['log_likelihood_weight']
 
-            if row['match_type'] == 'single':
-                player_indices = [row['id_teamA_player1'], row['id_teamA_player1'], row['id_teamB_player1'], row['id_teamB_player1']]
-            elif row['match_type'] == 'double':
-                player_indices = [row['id_teamA_player1'], row['id_teamA_player2'], row['id_teamB_player1'], row['id_teamB_player2']]
-            else:
-                raise ValueError(f"Invalid match type: {row['match_type']}")
+    @classmethod
+    def from_tennisDataFrame_chunks (cls, tdf_chunks: Iterable[TennisDataFrame], device: Union[str, torch.device] = 'cpu', representation: str = 'dense', compile: bool = False, precision: str = 'float32', fused: bool = False, n_workers: int = 1, chunk_size: Optional[int] = None) -> 'TennisUniverse':
+        """
+        Create a TennisUniverse from a stream of TennisDataFrame chunks, e.g. io.stream_notion_csv.
 
-            loss.add(scoring_system_name, score, player_indices, weight)
-            
-        return loss
+        Description:
+            Each chunk is converted to loss arrays and per-player statistics, then dropped: the whole
+            TennisDataFrame is never held in memory (tennisDataFrame is None). Player IDs and weights
+            must already be assigned consistently across chunks, as io.stream_notion_csv does.
+
+        Args:
+            tdf_chunks : Iterable[TennisDataFrame]
+                The chunks of the TennisDataFrame.
+            device : str or torch.device = 'cpu'
+                The device to store tensors on.
+            representation : str = 'dense'
+                Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+            compile : bool = False
+                Compile the loss with torch.compile (see TennisUniverse.__init__).
+            precision : str = 'float32'
+                Precision mode of the log-likelihood terms (see TennisUniverse.__init__).
+            fused : bool = False
+                Evaluate the log-likelihood terms in a single pass (see TennisUniverse.__init__).
+            n_workers : int = 1
+                Number of threads evaluating the loss (see TennisUniverse.__init__).
+            chunk_size : int | None = None
+                Number of matches of the chunks evaluated by the threads (see TennisUniverse.__init__).
+
+        Returns:
+            tennisUniverse : TennisUniverse
+                The TennisUniverse, equivalent to TennisUniverse(pd.concat(tdf_chunks)).
+        """
+
+        player_statistics = None
+        loss_arrays = {}
+        for tdf in tdf_chunks:
+            tdf_valid = tdf[tdf['is_valid']]
+            player_statistics = aggregate_player_statistics(pd.concat([player_statistics, get_player_statistics(tdf_valid)], ignore_index=True))
+            for scoring_system_name, arrays in get_loss_arrays(tdf_valid).items():
+                loss_arrays.setdefault(scoring_system_name, []).append(arrays)
+        if player_statistics is None:
+            raise ValueError("no matches in tdf_chunks")
+
+        tennisUniverse = cls.__new__(cls)
+        tennisUniverse.device = torch.device('cpu')
+        tennisUniverse.tennisDataFrame = None
+        tennisUniverse.playersDataFrame = get_playersDataFrame_from_player_statistics(player_statistics)
+        tennisUniverse.representation = representation
+        tennisUniverse.compile = compile
+        tennisUniverse.precision = precision
+        tennisUniverse.fused = fused
+        tennisUniverse.n_workers = n_workers
+        tennisUniverse.chunk_size = chunk_size
+        tennisUniverse.loss = Loss(representation=representation, compile=compile, precision=precision, fused=fused, n_workers=n_workers, chunk_size=chunk_size)
+        for scoring_system_name, list_of_arrays in loss_arrays.items():
+            score, player_indices, weight = (torch.from_numpy(np.concatenate(arrays)) for arrays in zip(*list_of_arrays))
+            tennisUniverse.loss.add(scoring_system_name, score, player_indices, weight, copy=False)
+        tennisUniverse.abilities_tensor = None
+        tennisUniverse.optimizer_state_dict = None
+
+        tennisUniverse.to(device)
+
+        return tennisUniverse
 
 
     def optimize (self, 
                   n_iter: int = 1000, 
                   lr_start: float = 1e-1,
                   lr_end: float = 1e-3,
-                  verbose: int = 100) -> OptimizationInfo:
+                  verbose: int = 100,
+                  checkpoint_path: Optional[Union[str, Path]] = None,
+                  checkpoint_every_iter: Optional[int] = None,
+                  checkpoint_every_seconds: Optional[float] = None,
+                  resume_from: Optional[Union[str, Path]] = None,
+                  n_processes: int = 1,
+                  batch_size: Optional[int] = None,
+                  batch_growth: Optional[float] = None,
+                  weighted_sampling: bool = False,
+                  seed: Optional[int] = None) -> OptimizationInfo:
         """
         Optimize player abilities by minimizing the loss function.
 
@@ -159,6 +265,27 @@ class TennisUniverse:
             by minimizing the loss function. It uses an Adam optimizer and an exponential
             learning rate schedule.
 
+            Long optimizations can be checkpointed: every checkpoint_every_iter iterations and/or
+            every checkpoint_every_seconds seconds, the abilities, the optimizer and scheduler states
+            and the partial optimization info are written to checkpoint_path (to a temporary file
+            first, then renamed, so a crash never leaves a truncated checkpoint). The optimization
+            can then be resumed with resume_from=checkpoint_path, with the same n_iter, lr_start and
+            lr_end: the results are identical to an uninterrupted optimization.
+
+            With n_processes > 1, the optimization is data-parallel: the matches are split into
+            n_processes shards, optimized by as many worker processes whose gradients are summed at
+            every iteration with torch.distributed (gloo backend, over localhost). See
+            distributed.optimize_data_parallel. Checkpointing is not supported in this mode.
+
+            With batch_size set, the optimization is stochastic: each iteration evaluates the loss of
+            a random mini-batch of matches (see Loss.get_minibatch), an unbiased estimate of the loss
+            rescaled to all the matches against the regularization term. The mini-batch grows by a
+            factor batch_growth at each iteration, up to all the matches: the last iterations are
+            then exact (full batch). Cheap iterations on small mini-batches first, then exact ones
+            near convergence, reach the optimum with fewer passes over the matches than the
+            deterministic optimization (see the batch_size column of optimization_info): e.g. twice
+            the iterations for a third of the passes.
+
         Args:
             n_iter : int = 1000
                 Number of optimization iterations.
@@ -168,42 +295,146 @@ class TennisUniverse:
                 Final learning rate.
             verbose : int = 100
                 Frequency of logging the progress. Set to 0 for no logging.
+            checkpoint_path : str or Path | None = None
+                File to write checkpoints to. Set to None for no checkpointing.
+            checkpoint_every_iter : int | None = None
+                Write a checkpoint every checkpoint_every_iter iterations.
+            checkpoint_every_seconds : float | None = None
+                Write a checkpoint when checkpoint_every_seconds seconds have elapsed since the last one.
+            resume_from : str or Path | None = None
+                Checkpoint to resume the optimization from. Set to None to start from scratch.
+            n_processes : int = 1
+                Number of worker processes, each optimizing on a shard of the matches. Set to 1 to
+                optimize in this process.
+            batch_size : int | None = None
+                Number of matches of the first mini-batch. Set to None to evaluate all the matches at
+                every iteration.
+            batch_growth : float | None = None
+                Growth factor of the mini-batch at each iteration. Defaults to None, a growth reaching
+                all the matches after 90% of the iterations.
+            weighted_sampling : bool = False
+                Sample the matches with probabilities proportional to their log_likelihood_weight,
+                instead of uniformly.
+            seed : int | None = None
+                Seed of the sampling of the mini-batches. Set to None for a random seed.
 
         Returns:
             optimization_info : OptimizationInfo
                 DataFrame containing iteration indices and corresponding loss values.
         """
 
+        if batch_size is not None and (batch_size < 1 or (batch_growth is not None and batch_growth < 1)):
+            raise ValueError("batch_size must be at least 1, and batch_growth at least 1")
+        if checkpoint_path is not None and checkpoint_every_iter is None and checkpoint_every_seconds is None:
+            raise ValueError("checkpoint_every_iter or checkpoint_every_seconds is required with checkpoint_path")
+
         # Ensure CUDA availability if specified
         if self.device.type == 'cuda' and not torch.cuda.is_available():
             raise Exception("Unable to use CUDA: CUDA is not available")
 
-        # Initialize abilities tensor on the specified device
         n_players = len(self.playersDataFrame)
-        abilities_tensor = torch.zeros(n_players, device=self.device, dtype=torch.float, requires_grad=True)
+        if n_processes > 1:
+            if checkpoint_path is not None or resume_from is not None:
+                raise ValueError("Checkpointing is not supported with n_processes > 1")
+            if batch_size is not None:
+                raise ValueError("Mini-batches are not supported with n_processes > 1")
+            if self.device.type != 'cpu':
+                raise ValueError("Data-parallel optimization (n_processes > 1) runs on the CPU")
+            from .distributed import optimize_data_parallel
+            result = optimize_data_parallel(self.loss, n_players, n_processes, n_iter=n_iter, lr_start=lr_start, lr_end=lr_end, verbose=verbose)
+            return self._set_abilities(result['abilities'], result['optimizer'], result['optimization_info'])
+
+        # Initialize abilities tensor on the specified device
+        abilities_tensor = torch.zeros(n_players, device=self.device, dtype=self.loss.dtype, requires_grad=True)
 
         # Configure optimizer and learning rate scheduler
         optimizer = torch.optim.Adam([abilities_tensor], lr=lr_start)
         lr_policy = LR_Exponential_Policy(lr_start, lr_end, n_iter)
         scheduler = LambdaLR(optimizer, lr_lambda=lr_policy)
 
+        # Generator and growth of the mini-batches
+        n_matches = sum(logLikelihoodTerm.n_matches for logLikelihoodTerm in self.loss.logLikelihoodTerms.values())
+        growth = batch_growth
+        if batch_size is not None and batch_growth is None:
+            growth = max(n_matches / batch_size, 1) ** (1 / max(0.9 * n_iter, 1))
+        generator = torch.Generator()
+        if seed is None:
+            generator.seed()
+        else:
+            generator.manual_seed(seed)
+
         # Initialize container for optimization logs
         optimization_info = {
             "idx_iteration": [],
             "loss": [],
+            "batch_size": [],
         }
 
+        # Restore the state of an interrupted optimization
+        i_iter_start = 0
+        if resume_from is not None:
+            checkpoint = torch.load(resume_from, map_location=self.device, weights_only=False)
+            hyperparameters = {'n_players': n_players, 'n_iter': n_iter, 'lr_start': lr_start, 'lr_end': lr_end, 'batch_size': batch_size, 'batch_growth': batch_growth, 'weighted_sampling': weighted_sampling}
+            defaults = {'batch_size': None, 'batch_growth': None, 'weighted_sampling': False}  # Checkpoints written before mini-batches: full batch
+            for key, value in hyperparameters.items():
+                value_checkpoint = checkpoint.get(key, defaults.get(key))
+                if value_checkpoint != value:
+                    raise ValueError(f"Unable to resume: {key} is {value}, but {value_checkpoint} in the checkpoint")
+            with torch.no_grad():
+                abilities_tensor.copy_(checkpoint['abilities'])
+            optimizer.load_state_dict(checkpoint['optimizer'])
+            scheduler.load_state_dict(checkpoint['scheduler'])
+            if 'generator' in checkpoint:
+                generator.set_state(checkpoint['generator'].cpu())
+            optimization_info = checkpoint['optimization_info']
+            optimization_info.setdefault('batch_size', [n_matches] * len(optimization_info['idx_iteration']))
+            i_iter_start = checkpoint['i_iter_next']
+
+        def get_batch_size (i_iter: int) -> int:
+            # Size of the mini-batch of iteration i_iter: batch_size * growth**i_iter, up to n_matches
+            if batch_size is None or batch_size >= n_matches or i_iter * log(growth) >= log(n_matches / batch_size):
+                return n_matches
+            return min(ceil(batch_size * growth**i_iter), n_matches)
+
+        def write_checkpoint (i_iter_next: int) -> None:
+            checkpoint = {
+                'n_players': n_players,
+                'n_iter': n_iter,
+                'lr_start': lr_start,
+                'lr_end': lr_end,
+                'batch_size': batch_size,
+                'batch_growth': batch_growth,
+                'weighted_sampling': weighted_sampling,
+                'i_iter_next': i_iter_next,
+                'abilities': abilities_tensor.detach().clone(),
+                'optimizer': optimizer.state_dict(),
+                'scheduler': scheduler.state_dict(),
+                'generator': generator.get_state(),
+                'optimization_info': optimization_info,
+            }
+            checkpoint_path_tmp = f"{checkpoint_path}.tmp"
+            with open(checkpoint_path_tmp, 'wb') as file:
+                torch.save(checkpoint, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(checkpoint_path_tmp, checkpoint_path)
+
         # Timer for verbose output
         timer = TicToc()
 
         # Begin optimization loop
         if verbose:
             timer.tic()
-            print("Optimization started:")
+            print("Optimization started:" if i_iter_start == 0 else f"Optimization resumed at iteration {i_iter_start}:")
 
-        for i_iter in range(n_iter):
-            # Compute loss and gradients
-            loss = self.loss(abilities_tensor)
+        time_last_checkpoint = time.monotonic()
+        for i_iter in range(i_iter_start, n_iter):
+            # Compute loss and gradients, on all the matches or on a mini-batch
+            batch_size_iter = get_batch_size(i_iter)
+            if batch_size_iter < n_matches:
+                loss = self.loss.get_minibatch(batch_size_iter, weighted=weighted_sampling, generator=generator)(abilities_tensor)
+            else:
+                loss = self.loss(abilities_tensor)
             optimizer.zero_grad()
             loss.backward()
             optimizer.step()
@@ -216,6 +447,15 @@ class TennisUniverse:
             # Record iteration data
             optimization_info["idx_iteration"].append(i_iter)
             optimization_info["loss"].append(loss.item())
+            optimization_info["batch_size"].append(batch_size_iter)
+
+            # Checkpoint, if due
+            if checkpoint_path is not None and i_iter + 1 < n_iter:
+                is_due_iter = checkpoint_every_iter is not None and (i_iter + 1) % checkpoint_every_iter == 0
+                is_due_seconds = checkpoint_every_seconds is not None and time.monotonic() - time_last_checkpoint >= checkpoint_every_seconds
+                if is_due_iter or is_due_seconds:
+                    write_checkpoint(i_iter + 1)
+                    time_last_checkpoint = time.monotonic()
 
         # Final verbose output
         if verbose:
@@ -224,6 +464,28 @@ class TennisUniverse:
 
         # Post-process abilities
         abilities_tensor.requires_grad_(False)
+        return self._set_abilities(abilities_tensor, optimizer.state_dict(), optimization_info)
+
+
+    def _set_abilities (self, abilities_tensor: torch.Tensor, optimizer_state_dict: dict, optimization_info: dict) -> OptimizationInfo:
+        """
+        Store the optimized abilities, and assign them (normalized) and the ranks to playersDataFrame.
+
+        Args:
+            abilities_tensor : torch.Tensor (n_players,)
+                The optimized abilities.
+            optimizer_state_dict : dict
+                The state of the optimizer.
+            optimization_info : dict
+                Iteration indices and loss values, as lists.
+
+        Returns:
+            optimization_info : OptimizationInfo
+                DataFrame containing iteration indices and corresponding loss values.
+        """
+
+        self.abilities_tensor = abilities_tensor
+        self.optimizer_state_dict = optimizer_state_dict
         abilities_numpy = abilities_tensor.cpu().numpy()
 
         # Normalize abilities so median is 100
@@ -241,10 +503,464 @@ class TennisUniverse:
         return optimization_info_df
     
 
+    def simulate_round_robin (self,
+                              player_ids: Sequence[int],
+                              n_qualified: int = 2,
+                              n_simulations: int = 10000,
+                              scoring_system_name: str = 'MrDodo',
+                              seed: Optional[int] = None) -> RoundRobinDataFrame:
+        """
+        Simulate a round-robin group between the given players, using the optimized abilities.
+
+        Description:
+            The full score of every match is sampled from the model, and the group standings are
+            computed with the usual tie-break rules (matches won, head-to-head between two tied
+            players, set difference, game difference, draw). See simulation.get_round_robin_standings.
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the players of the group.
+            n_qualified : int = 2
+                Number of players qualifying from the group.
+            n_simulations : int = 10000
+                Number of simulations.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system of the group matches.
+            seed : int | None = None
+                Seed of the random number generator. Set to None for a random seed.
+
+        Returns:
+            roundRobinDataFrame : RoundRobinDataFrame
+                Qualification probabilities and expected standings of each player.
+        """
+
+        # Abilities of the players of the group
+        player_ids = list(player_ids)
+        abilities = self.get_abilities(player_ids)
+        if not 0 < n_qualified <= len(player_ids):
+            raise ValueError("n_qualified must be between 1 and the number of players")
+
+        # Simulate
+        scoring_system = getattr(scoring_systems, scoring_system_name)(device=self.device)
+        generator = torch.Generator(device=self.device)
+        if seed is None: generator.seed()
+        else: generator.manual_seed(seed)
+        positions, wins = simulate_round_robin(scoring_system, torch.tensor(abilities, dtype=torch.float, device=self.device), n_simulations, generator)
+        positions, wins = positions.cpu().numpy(), wins.cpu().numpy()
+
+        # Summarize simulations
+        roundRobinDataFrame = pd.DataFrame({
+            'id_player': player_ids,
+            'name': self.playersDataFrame.set_index('id_player').loc[player_ids, 'name'].to_numpy(),
+            'ability': abilities,
+            'expected_wins': wins.mean(axis=0),
+            'expected_position': positions.mean(axis=0) + 1,
+            'prob_first': (positions == 0).mean(axis=0),
+            'prob_qualification': (positions < n_qualified).mean(axis=0),
+        })
+
+        return roundRobinDataFrame
+
+
+    def balanced_doubles (self, player_ids: Sequence[int], n_courts: int, scoring_system_name: str = 'MrDodo') -> DoublesDataFrame:
+        """
+        Split players into the most balanced double matches.
+
+        Description:
+            Pairings and court assignments are searched to minimize the total |P(team A wins) - 0.5|
+            over the courts. Up to MAX_PLAYERS_EXACT_DOUBLES players, all the assignments are
+            enumerated (see pairing.balanced_doubles_exact). Beyond that, a local search starting
+            from a greedy assignment is used (see pairing.balanced_doubles_local_search).
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the players. Their number must be 4 * n_courts.
+            n_courts : int
+                Number of courts.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system of the matches.
+
+        Returns:
+            doublesDataFrame : DoublesDataFrame
+                The matches, one per court.
+        """
+
+        # Checks
+        player_ids = np.asarray(list(player_ids), dtype=int)
+        if len(player_ids) != 4 * n_courts:
+            raise ValueError("The number of players must be 4 * n_courts")
+        if len(np.unique(player_ids)) != len(player_ids):
+            raise ValueError("player_ids must be unique")
+
+        # Search the most balanced assignment
+        scoring_system = getattr(scoring_systems, scoring_system_name)(device=self.device)
+        abilities = torch.tensor(self.get_abilities(player_ids), dtype=torch.float, device=self.device)
+        if len(player_ids) <= MAX_PLAYERS_EXACT_DOUBLES:
+            assignment = balanced_doubles_exact(scoring_system, abilities)
+        else:
+            assignment = balanced_doubles_local_search(scoring_system, abilities)
+        assignment_ids = player_ids[assignment]  # (n_courts, 4)
+
+        # Build the DoublesDataFrame
+        names = self.playersDataFrame.set_index('id_player')['name']
+        doublesDataFrame = pd.DataFrame({'court': np.arange(n_courts)})
+        for k, column in enumerate(['teamA_player1', 'teamA_player2', 'teamB_player1', 'teamB_player2']):
+            doublesDataFrame[f'id_{column}'] = assignment_ids[:, k]
+            doublesDataFrame[f'{column}_name'] = names.loc[assignment_ids[:, k]].to_numpy()
+        doublesDataFrame['prob_teamA_wins'] = self.prob_teamA_wins(assignment_ids, scoring_system_name)
+
+        return doublesDataFrame
+
+
+    def swiss_pairings (self, player_ids: Sequence[int], results: Optional[Union[np.ndarray, Sequence]] = None, scoring_system_name: str = 'MrDodo') -> SwissRoundDataFrame:
+        """
+        Pair the next round of a Swiss event, from the current results and the optimized abilities.
+
+        Description:
+            Players with similar points and abilities are paired by weighted matching, avoiding
+            rematches, and the bye (if any) goes to the lowest-standing player without a previous bye.
+            See pairing.swiss_pairings.
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the entrants.
+            results : array-like (n_results, 2) | None = None
+                Results of the previous rounds, as [id_winner, id_loser]. A bye is recorded as
+                [id_player, -1] and counts as a win. Set to None before the first round.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system of the matches.
+
+        Returns:
+            swissRoundDataFrame : SwissRoundDataFrame
+                The pairings of the round.
+        """
+
+        # Standings, with player indices local to the event
+        player_ids = np.asarray(list(player_ids), dtype=int)
+        abilities = self.get_abilities(player_ids)
+        results_indices = self._get_event_results_indices(player_ids, results)
+        points, _, has_played = get_swiss_standings(len(player_ids), results_indices)
+        has_had_bye = np.bincount(results_indices[results_indices[:, 1] < 0, 0], minlength=len(player_ids)) > 0
+
+        # Pairings
+        pairs, idx_bye = swiss_pairings(points, abilities, has_played, has_had_bye)
+        names = self.playersDataFrame.set_index('id_player')['name']
+        swissRoundDataFrame = pd.DataFrame({
+            'board': np.arange(len(pairs)),
+            'id_teamA_player1': player_ids[pairs[:, 0]],
+            'teamA_player1_name': names.loc[player_ids[pairs[:, 0]]].to_numpy(),
+            'teamA_points': points[pairs[:, 0]],
+            'id_teamB_player1': player_ids[pairs[:, 1]],
+            'teamB_player1_name': names.loc[player_ids[pairs[:, 1]]].to_numpy(),
+            'teamB_points': points[pairs[:, 1]],
+            'prob_teamA_wins': self.prob_teamA_wins(player_ids[pairs], scoring_system_name) if len(pairs) else np.empty(0),
+        })
+        if idx_bye >= 0:
+            swissRoundDataFrame.loc[len(swissRoundDataFrame)] = [len(swissRoundDataFrame), player_ids[idx_bye], names.loc[player_ids[idx_bye]], points[idx_bye], -1, None, 0, 1.]
+
+        return swissRoundDataFrame
+
+
+    def simulate_swiss (self,
+                        player_ids: Sequence[int],
+                        n_rounds: int,
+                        results: Optional[Union[np.ndarray, Sequence]] = None,
+                        n_top: int = 8,
+                        n_simulations: int = 100,
+                        scoring_system_name: str = 'MrDodo',
+                        seed: Optional[int] = None) -> SwissSimulationDataFrame:
+        """
+        Pre-simulate the remaining rounds of a Swiss event, to estimate final-standing probabilities.
+
+        Description:
+            Every simulation pairs each round as swiss_pairings does, and draws the winners from the
+            model. Final standings are ordered by points, then Buchholz, then draw.
+            See pairing.simulate_swiss.
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the entrants.
+            n_rounds : int
+                Number of rounds still to be played.
+            results : array-like (n_results, 2) | None = None
+                Results of the rounds already played. See swiss_pairings.
+            n_top : int = 8
+                Number of top positions used for prob_top.
+            n_simulations : int = 100
+                Number of simulations.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system of the matches.
+            seed : int | None = None
+                Seed of the random number generator. Set to None for a random seed.
+
+        Returns:
+            swissSimulationDataFrame : SwissSimulationDataFrame
+                Final-standing probabilities of each player.
+        """
+
+        player_ids = np.asarray(list(player_ids), dtype=int)
+        abilities = self.get_abilities(player_ids)
+        results_indices = self._get_event_results_indices(player_ids, results)
+
+        # Simulate
+        scoring_system = getattr(scoring_systems, scoring_system_name)(device=self.device)
+        generator = torch.Generator()
+        if seed is None: generator.seed()
+        else: generator.manual_seed(seed)
+        positions, points = simulate_swiss(scoring_system, torch.tensor(abilities, dtype=torch.float, device=self.device), n_rounds, n_simulations, results_indices, generator)
+
+        # Summarize simulations
+        swissSimulationDataFrame = pd.DataFrame({
+            'id_player': player_ids,
+            'name': self.playersDataFrame.set_index('id_player').loc[player_ids, 'name'].to_numpy(),
+            'ability': abilities,
+            'expected_points': points.mean(axis=0),
+            'expected_position': positions.mean(axis=0) + 1,
+            'prob_first': (positions == 0).mean(axis=0),
+            'prob_top': (positions < n_top).mean(axis=0),
+        })
+
+        return swissSimulationDataFrame
+
+
+    def _get_event_results_indices (self, player_ids: np.ndarray, results: Optional[Union[np.ndarray, Sequence]]) -> np.ndarray:
+        """
+        Convert event results from [id_winner, id_loser] to indices within player_ids (-1 is kept for byes).
+        """
+
+        if results is None:
+            return np.empty((0, 2), dtype=int)
+        results = np.asarray(results, dtype=int).reshape(-1, 2)
+        id_to_index = {id_player: idx for idx, id_player in enumerate(player_ids)}
+        id_to_index[-1] = -1
+        try:
+            return np.vectorize(id_to_index.__getitem__, otypes=[int])(results).reshape(-1, 2)
+        except KeyError as e:
+            raise ValueError(f"results contain a player not in player_ids: {e}")
+
+
+    def prob_teamA_wins (self, player_ids: Union[np.ndarray, Sequence], scoring_system_name: str = 'MrDodo') -> np.ndarray:
+        """
+        Compute the probability of team A winning, using the optimized abilities.
+
+        Usage example:
+            # Single: player 0 vs player 1
+            tennisUniverse.prob_teamA_wins([0, 1])
+            # Doubles: players 0, 1 vs players 2, 3 and players 0, 2 vs players 1, 3
+            tennisUniverse.prob_teamA_wins([[0, 1, 2, 3], [0, 2, 1, 3]])
+
+        Args:
+            player_ids : array-like (n_matches, 2) or (n_matches, 4) or (2,) or (4,)
+                Identifiers of the players of each match:
+                    - 2: match type = single, [teamA_player1, teamB_player1]
+                    - 4: match type = double, [teamA_player1, teamA_player2, teamB_player1, teamB_player2]
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system of the matches.
+
+        Returns:
+            p_teamA_wins : np.ndarray (n_matches,)
+                Probability of team A winning each match.
+        """
+
+        player_ids = np.atleast_2d(np.asarray(player_ids, dtype=int))
+        abilities = self.get_abilities(player_ids.reshape(-1)).reshape(player_ids.shape)
+        scoring_system = getattr(scoring_systems, scoring_system_name)(device=self.device)
+        p_teamA_wins = scoring_system.prob_teamA_wins(torch.tensor(abilities, dtype=torch.float, device=self.device))
+
+        return p_teamA_wins.cpu().numpy()
+
+
+    def get_abilities (self, player_ids: Sequence[int]) -> np.ndarray:
+        """
+        Get the optimized abilities of the given players.
+
+        Args:
+            player_ids : Sequence[int]
+                Identifiers of the players.
+
+        Returns:
+            abilities : np.ndarray (n_players,)
+                Abilities of the players, in the same order as player_ids.
+        """
+
+        abilities = self.playersDataFrame.set_index('id_player').loc[list(player_ids), 'ability'].to_numpy(dtype=float)
+        if np.isnan(abilities).any():
+            raise ValueError("Abilities are not available: run optimize() first")
+
+        return abilities
+
+
+    def save (self, path: Union[str, Path]) -> None:
+        """
+        Save the TennisUniverse into a directory of .npy files, to be loaded back with TennisUniverse.load.
+
+        Description:
+            The directory contains:
+                - manifest.json: format version, regularization, columns of the player table,
+                  scoring systems and non-tensor optimizer state;
+                - players/<column>.npy: the player table, one array per column;
+                - terms/<scoring_system_name>/{score, player_indices, weights}.npy: the tensors of
+                  each LogLikelihoodTerm;
+                - abilities.npy and optimizer/<key>.npy: raw abilities and optimizer state, if
+                  optimize has been run.
+            The manifest is written last, so a directory without manifest is an incomplete save.
+            The TennisDataFrame is not saved.
+
+        Args:
+            path : str or Path
+                Directory to save into. Created if it does not exist.
+        """
+
+        for scoring_system_name, logLikelihoodTerm in self.loss.logLikelihoodTerms.items():
+            if logLikelihoodTerm.score_tensor is None:
+                raise ValueError(f"Cannot save the log-likelihood term {scoring_system_name}: its scores were not kept (keep_scores=False)")
+
+        path = Path(path)
+        (path / 'players').mkdir(parents=True, exist_ok=True)
+        (path / 'manifest.json').unlink(missing_ok=True)
+
+        # Player table
+        players_dtypes = {}
+        for column in self.playersDataFrame.columns:
+            series = self.playersDataFrame[column]
+            players_dtypes[column] = str(series.dtype)
+            array = series.to_numpy(dtype=str) if series.dtype == object else series.to_numpy()
+            np.save(path / 'players' / f'{column}.npy', array, allow_pickle=False)
+
+        # Log-likelihood terms
+        terms = {}
+        for scoring_system_name, logLikelihoodTerm in self.loss.logLikelihoodTerms.items():
+            (path / 'terms' / scoring_system_name).mkdir(parents=True, exist_ok=True)
+            np.save(path / 'terms' / scoring_system_name / 'score.npy', logLikelihoodTerm.score_tensor.cpu().numpy())
+            np.save(path / 'terms' / scoring_system_name / 'player_indices.npy', logLikelihoodTerm.player_indices_tensor.cpu().numpy())
+            np.save(path / 'terms' / scoring_system_name / 'weights.npy', logLikelihoodTerm.weights_tensor.cpu().numpy())
+            terms[scoring_system_name] = {'n_matches': logLikelihoodTerm.n_matches}
+
+        # Abilities and optimizer state: tensors as .npy, everything else in the manifest
+        optimizer = None
+        if self.abilities_tensor is not None:
+            np.save(path / 'abilities.npy', self.abilities_tensor.cpu().numpy())
+        if self.optimizer_state_dict is not None:
+            (path / 'optimizer').mkdir(exist_ok=True)
+            state = {}
+            for id_param, param_state in self.optimizer_state_dict['state'].items():
+                state[str(id_param)] = {}
+                for key, value in param_state.items():
+                    if isinstance(value, torch.Tensor):
+                        np.save(path / 'optimizer' / f'{id_param}_{key}.npy', value.cpu().numpy())
+                        state[str(id_param)][key] = {'tensor': f'{id_param}_{key}.npy'}
+                    else:
+                        state[str(id_param)][key] = {'value': value}
+            optimizer = {'state': state, 'param_groups': self.optimizer_state_dict['param_groups']}
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'regularization': {
+                'name': 'L1' if isinstance(self.loss.regularizationTerm, L1_Regularization) else 'L2',
+                'coupling_const': self.loss.regularizationTerm.coupling_const,
+            },
+            'representation': self.representation,
+            'precision': self.precision,
+            'players': players_dtypes,
+            'terms': terms,
+            'optimizer': optimizer,
+        }
+        with open(path / 'manifest.json', 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+
+    @classmethod
+    def load (cls, path: Union[str, Path], mmap: bool = True, device: Union[str, torch.device] = 'cpu', representation: Optional[str] = None, compile: bool = False, precision: Optional[str] = None, fused: bool = False, n_workers: int = 1, chunk_size: Optional[int] = None) -> 'TennisUniverse':
+        """
+        Load a TennisUniverse saved with TennisUniverse.save.
+
+        Description:
+            With mmap=True, the arrays of the log-likelihood terms are memory-mapped (copy-on-write)
+            and handed to torch without copying: loading does not depend on the number of matches,
+            and pages are read from disk only when used. The loaded TennisUniverse has no
+            TennisDataFrame (tennisDataFrame is None).
+
+        Args:
+            path : str or Path
+                Directory to load from.
+            mmap : bool = True
+                Memory-map the arrays instead of reading them into memory.
+            device : str or torch.device = 'cpu'
+                The device to store tensors on. Tensors are copied if the device is not 'cpu'.
+            representation : str | None = None
+                Representation of the log-likelihood terms, 'dense' or 'sparse' (see LogLikelihoodTerm).
+                Defaults to None, the representation of the saved TennisUniverse.
+            compile : bool = False
+                Compile the loss with torch.compile (see TennisUniverse.__init__).
+            precision : str | None = None
+                Precision mode of the log-likelihood terms (see TennisUniverse.__init__). Defaults to
+                None, the precision mode of the saved TennisUniverse.
+            fused : bool = False
+                Evaluate the log-likelihood terms in a single pass (see TennisUniverse.__init__).
+            n_workers : int = 1
+                Number of threads evaluating the loss (see TennisUniverse.__init__).
+            chunk_size : int | None = None
+                Number of matches of the chunks evaluated by the threads (see TennisUniverse.__init__).
+
+        Returns:
+            tennisUniverse : TennisUniverse
+                The loaded TennisUniverse.
+        """
+
+        path = Path(path)
+        with open(path / 'manifest.json') as file:
+            manifest = json.load(file)
+        if manifest['format_version'] > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {manifest['format_version']} (max supported: {SNAPSHOT_FORMAT_VERSION})")
+        mmap_mode = 'c' if mmap else None
+
+        def load_tensor (file_path: Path) -> torch.Tensor:
+            return torch.from_numpy(np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False))
+
+        tennisUniverse = cls.__new__(cls)
+        tennisUniverse.device = torch.device('cpu')
+        tennisUniverse.tennisDataFrame = None
+        tennisUniverse.representation = representation if representation is not None else manifest.get('representation', 'dense')
+        tennisUniverse.compile = compile
+        tennisUniverse.precision = precision if precision is not None else manifest.get('precision', 'float32')
+        tennisUniverse.fused = fused
+        tennisUniverse.n_workers = n_workers
+        tennisUniverse.chunk_size = chunk_size
+
+        # Player table
+        tennisUniverse.playersDataFrame = pd.DataFrame({
+            column: pd.Series(np.load(path / 'players' / f'{column}.npy', allow_pickle=False)).astype(dtype)
+            for column, dtype in manifest['players'].items()
+        })
+
+        # Log-likelihood terms
+        loss = Loss(Regularization=manifest['regularization']['name'], coupling_const=manifest['regularization']['coupling_const'], representation=tennisUniverse.representation, compile=compile, precision=tennisUniverse.precision, fused=fused, n_workers=n_workers, chunk_size=chunk_size)
+        for scoring_system_name in manifest['terms']:
+            term_path = path / 'terms' / scoring_system_name
+            loss.add(scoring_system_name, load_tensor(term_path / 'score.npy'), load_tensor(term_path / 'player_indices.npy'), load_tensor(term_path / 'weights.npy'), copy=False)
+        tennisUniverse.loss = loss
+
+        # Abilities and optimizer state
+        tennisUniverse.abilities_tensor = load_tensor(path / 'abilities.npy') if (path / 'abilities.npy').exists() else None
+        tennisUniverse.optimizer_state_dict = None
+        if manifest['optimizer'] is not None:
+            state = {}
+            for id_param, param_state in manifest['optimizer']['state'].items():
+                state[int(id_param)] = {
+                    key: load_tensor(path / 'optimizer' / value['tensor']) if 'tensor' in value else value['value']
+                    for key, value in param_state.items()
+                }
+            tennisUniverse.optimizer_state_dict = {'state': state, 'param_groups': manifest['optimizer']['param_groups']}
+
+        tennisUniverse.to(device)
+
+        return tennisUniverse
+
+
     def __repr__ (self):
 
         n_players = len(self.playersDataFrame)
-        n_matches = len(self.tennisDataFrame[self.tennisDataFrame['is_valid']])
+        n_matches = sum(logLikelihoodTerm.n_matches for logLikelihoodTerm in self.loss.logLikelihoodTerms.values())
         return f"TennisUniverse(n_players={n_players}, n_matches={n_matches})"
     
 
@@ -253,6 +969,117 @@ class TennisUniverse:
         return repr(self)        
 
 
+def get_player_statistics (tdf_valid: TennisDataFrame) -> pd.DataFrame:
+    """
+    Get the statistics of each player of each match of a TennisDataFrame (valid rows only).
+
+    Returns:
+        player_statistics : pd.DataFrame
+            One row per player per match, in match order, with columns id_player, name, n_singles,
+            n_doubles, last_date and last_tournament. See aggregate_player_statistics.
+    """
+
+    ids = tdf_valid[['id_teamA_player1', 'id_teamA_player2', 'id_teamB_player1', 'id_teamB_player2']].to_numpy()
+    names = tdf_valid[['teamA_player1_name', 'teamA_player2_name', 'teamB_player1_name', 'teamB_player2_name']].to_numpy(dtype=object)
+    is_single = (tdf_valid['match_type'] == 'single').to_numpy()
+
+    # Players of each match: all of them for doubles, player 1 of each team for singles
+    is_player = np.ones(ids.shape, dtype=bool)
+    is_player[is_single, 1] = False
+    is_player[is_single, 3] = False
+    n_players_per_match = is_player.sum(axis=1)
+
+    player_statistics = pd.DataFrame({
+        'id_player': ids[is_player],
+        'name': names[is_player],
+        'n_singles': np.repeat(is_single, n_players_per_match).astype(np.int64),
+        'n_doubles': np.repeat(~is_single, n_players_per_match).astype(np.int64),
+        'last_date': np.repeat(tdf_valid['date'].to_numpy(), n_players_per_match),
+        'last_tournament': np.repeat(tdf_valid['tournament'].to_numpy(dtype=object), n_players_per_match),
+    })
+
+    return player_statistics
+
+
+def aggregate_player_statistics (player_statistics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate player statistics by player id: numbers of matches are summed, and the last tournament
+    is the first one played at the last date.
+
+    Returns:
+        player_statistics : pd.DataFrame
+            One row per player, sorted by id_player.
+    """
+
+    player_statistics = player_statistics.reset_index(drop=True)
+    grouped = player_statistics.groupby('id_player', sort=True)
+
+    aggregated = pd.DataFrame({
+        'name': grouped['name'].first(),
+        'n_singles': grouped['n_singles'].sum(),
+        'n_doubles': grouped['n_doubles'].sum(),
+        'last_date': grouped['last_date'].max(),
+    }).reset_index()
+    aggregated['last_tournament'] = player_statistics.loc[grouped['last_date'].idxmax().to_numpy(), 'last_tournament'].to_numpy()
+
+    return aggregated
+
+
+def get_playersDataFrame_from_player_statistics (player_statistics: pd.DataFrame) -> PlayersDataFrame:
+    """
+    Get a PlayersDataFrame (without abilities) from aggregated player statistics.
+    """
+
+    playersDataFrame = pd.DataFrame({
+        'id_player': player_statistics['id_player'].to_numpy(dtype=np.int64),
+        'name': player_statistics['name'].to_numpy(dtype=object),
+        'ability': np.nan,
+        'rank': np.nan,
+        'n_singles': player_statistics['n_singles'].to_numpy(dtype=np.int64),
+        'n_doubles': player_statistics['n_doubles'].to_numpy(dtype=np.int64),
+        'n_matches': (player_statistics['n_singles'] + player_statistics['n_doubles']).to_numpy(dtype=np.int64),
+        'last_date': player_statistics['last_date'].to_numpy(),
+        'last_tournament': player_statistics['last_tournament'].to_numpy(dtype=object),
+    })
+
+    return playersDataFrame
+
+
+def get_loss_arrays (tdf_valid: TennisDataFrame) -> dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Get the arrays of the log-likelihood terms of a TennisDataFrame (valid rows only), by scoring system.
+
+    Returns:
+        loss_arrays : dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]
+            For each scoring system, in order of first appearance: scores (n_matches, n_score_elements)
+            as int8, player indices (n_matches, 4) and weights (n_matches,). See LogLikelihoodTerm.
+    """
+
+    if not tdf_valid['match_type'].isin(['single', 'double']).all():
+        raise ValueError(f"Invalid match type: {set(tdf_valid['match_type']) - {'single', 'double'}}")
+
+    loss_arrays = {}
+    for scoring_system_name in pd.unique(tdf_valid['scoring_system']):
+
+        tdf_system = tdf_valid[tdf_valid['scoring_system'] == scoring_system_name]
+        is_single = (tdf_system['match_type'] == 'single').to_numpy()
+
+        # Single matches are represented by [teamA_player1, teamA_player1, teamB_player1, teamB_player1]
+        id_teamA_player1 = tdf_system['id_teamA_player1'].to_numpy(dtype=np.int64)
+        id_teamB_player1 = tdf_system['id_teamB_player1'].to_numpy(dtype=np.int64)
+        id_teamA_player2 = np.where(is_single, id_teamA_player1, tdf_system['id_teamA_player2'].to_numpy(dtype=np.int64))
+        id_teamB_player2 = np.where(is_single, id_teamB_player1, tdf_system['id_teamB_player2'].to_numpy(dtype=np.int64))
+
+        n_score_elements = getattr(scoring_systems, scoring_system_name)().n_score_elements
+        score = as_score_array(tdf_system[SCORE_COLUMNS[:n_score_elements]].to_numpy())
+        player_indices = np.stack([id_teamA_player1, id_teamA_player2, id_teamB_player1, id_teamB_player2], axis=-1)
+        weight = tdf_system['log_likelihood_weight'].to_numpy(dtype=np.float32)
+
+        loss_arrays[scoring_system_name] = (score, player_indices, weight)
+
+    return loss_arrays
+
+
 class LR_Exponential_Policy:
     """
     A class to implement an exponential learning rate policy.
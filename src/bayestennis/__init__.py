@@ -1,6 +1,12 @@
-from . import io
-from . import scoring_systems
-from . import utils
-from .LogLikelihoodTerm import LogLikelihoodTerm
-from .Loss import Loss
-from .TennisUniverse import TennisUniverse
+from ._version import __version__
+from . import _lazy
+
+# Submodules and classes are imported on first access (PEP 562), so that `import bayestennis` does
+# not import torch, pandas and scipy. E.g. `bayestennis.TennisUniverse` imports the TennisUniverse
+# module on first access, and `from bayestennis import TennisUniverse` works as usual.
+__getattr__, __dir__ = _lazy.set_lazy_attributes(__name__, ['io', 'scoring_systems', 'utils'], {
+    'LogLikelihoodTerm': '.LogLikelihoodTerm',
+    'Loss': '.Loss',
+    'TennisUniverse': '.TennisUniverse',
+    'MatchmakingIndex': '.MatchmakingIndex',
+})
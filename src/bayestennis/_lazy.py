@@ -0,0 +1,61 @@
+import importlib
+import sys
+import types
+from typing import Callable, Tuple
+
+
+class LazyModule (types.ModuleType):
+    """
+    Module with lazy attributes (see set_lazy_attributes): importing a submodule named like a lazy
+    class (e.g. bayestennis.TennisUniverse) does not shadow the class, as it would with PEP 562 only.
+    """
+
+    def __setattr__ (self, name, value):
+
+        if name in self.__dict__.get('_lazy_classes', {}) and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+def set_lazy_attributes (module_name: str, lazy_submodules: list[str], lazy_classes: dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Make submodules and classes of a package importable on first access (PEP 562).
+
+    Usage example:
+        # in package/__init__.py
+        __getattr__, __dir__ = set_lazy_attributes(__name__, ['io'], {'TennisUniverse': '.TennisUniverse'})
+
+    Args:
+        module_name : str
+            Name of the package, i.e. __name__ in its __init__.py.
+        lazy_submodules : list[str]
+            Submodules imported on first access.
+        lazy_classes : dict[str, str]
+            Classes imported on first access, with the relative name of their module.
+
+    Returns:
+        __getattr__ : Callable
+            Module __getattr__, to be assigned in the package namespace.
+        __dir__ : Callable
+            Module __dir__, to be assigned in the package namespace.
+    """
+
+    module = sys.modules[module_name]
+    module._lazy_classes = lazy_classes
+    module.__all__ = [name for name in module.__dict__ if not name.startswith('_')] + lazy_submodules + list(lazy_classes)
+
+    def __getattr__ (name: str):
+        if name in lazy_submodules:
+            return importlib.import_module(f'.{name}', module_name)
+        if name in lazy_classes:
+            value = getattr(importlib.import_module(lazy_classes[name], module_name), name)
+            module.__dict__[name] = value
+            return value
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    def __dir__ ():
+        return sorted(set(module.__dict__) | set(module.__all__))
+
+    module.__class__ = LazyModule
+
+    return __getattr__, __dir__
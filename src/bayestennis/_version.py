@@ -0,0 +1,4 @@
+__version__ = '0.2.0'
+
+SNAPSHOT_FORMAT_VERSION = 1
+"""Version of the directory format written by TennisUniverse.save."""
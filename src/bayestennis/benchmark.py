@@ -0,0 +1,258 @@
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Callable, Sequence
+from .structures import TennisDataFrame, SCORE_COLUMNS
+
+
+def get_synthetic_tennisDataFrame (n_players: int = 1000, n_matches: int = 20000, fraction_doubles: float = 0.5, seed: int = 0) -> TennisDataFrame:
+    """
+    Get a synthetic TennisDataFrame, with scores sampled from the model (MrDodo scoring system).
+
+    Description:
+        Players get random abilities (normal, mean 100, standard deviation 5). Each match is between
+        random players; its score is sampled with MrDodo.sample_score, and its date is random over
+        the last 2 years. Useful for benchmarks and for tests needing many matches.
+
+    Args:
+        n_players : int = 1000
+            Number of players.
+        n_matches : int = 20000
+            Number of matches.
+        fraction_doubles : float = 0.5
+            Fraction of double matches.
+        seed : int = 0
+            Seed of the random generators.
+
+    Returns:
+        tdf : TennisDataFrame
+            The synthetic TennisDataFrame. All the matches are valid.
+    """
+
+    import torch
+    from .scoring_systems import MrDodo
+    from .io.import_notion_csv import process_tdf
+    from .io.import_parquet import get_score_as_str
+
+    generator = np.random.default_rng(seed)
+    abilities = generator.normal(100, 5, size=n_players)
+    names = np.array([f"Player {id_player}" for id_player in range(n_players)], dtype=object)
+
+    # Players: 4 distinct players per match, the second of each team unused in single matches
+    is_double = generator.random(n_matches) < fraction_doubles
+    if n_players < 4:
+        raise ValueError("n_players must be at least 4")
+    players = generator.integers(n_players, size=(n_matches, 4))
+    while True:
+        sorted_players = np.sort(players, axis=1)
+        has_duplicates = (sorted_players[:, 1:] == sorted_players[:, :-1]).any(axis=1)
+        if not has_duplicates.any():
+            break
+        players[has_duplicates] = generator.integers(n_players, size=(has_duplicates.sum(), 4))
+
+    # Scores sampled from the model
+    mrdodo = MrDodo()
+    torch_generator = torch.Generator().manual_seed(seed)
+    scores = np.zeros((n_matches, len(SCORE_COLUMNS)), dtype=np.int8)
+    for rows, players_rows in [(~is_double, players[:, [0, 2]]), (is_double, players)]:
+        if rows.any():
+            abilities_rows = torch.tensor(abilities[players_rows[rows]], dtype=torch.float)
+            scores[rows, :mrdodo.n_score_elements] = mrdodo.sample_score(abilities_rows, generator=torch_generator)[0].numpy()
+    _, _, winner_team = mrdodo.process_scores(scores.astype(np.int64))
+
+    most_recent_date = datetime(2024, 12, 1)
+    tdf = pd.DataFrame({
+        'id_match': np.arange(n_matches),
+        'file_name': 'synthetic',
+        'file_path': 'synthetic',
+        'id_match_within_file': np.arange(n_matches),
+        'is_valid': True,
+        'error_msg': "",
+        'match_type': np.where(is_double, 'double', 'single').astype(object),
+        'tournament': 'Synthetic',
+        'scoring_system': 'MrDodo',
+        'date': np.array([most_recent_date - timedelta(days=int(days)) for days in generator.integers(0, 730, size=n_matches)], dtype='datetime64[ns]'),
+        'elapsed_days': np.nan,  # assigned by process_tdf()
+        'log_likelihood_weight': 0.,  # assigned by process_tdf()
+        'id_teamA_player1': -1,  # assigned by process_tdf()
+        'teamA_player1_name': names[players[:, 0]],
+        'id_teamA_player2': -1,
+        'teamA_player2_name': np.where(is_double, names[players[:, 1]], None),
+        'id_teamB_player1': -1,
+        'teamB_player1_name': names[players[:, 2]],
+        'id_teamB_player2': -1,
+        'teamB_player2_name': np.where(is_double, names[players[:, 3]], None),
+        'score_AvsB_str': [get_score_as_str(score) for score in scores.tolist()],
+        **{column: scores[:, i_column] for i_column, column in enumerate(SCORE_COLUMNS)},
+        'winner_team': winner_team,
+    })
+
+    return process_tdf(tdf)
+
+
+def time_it (function: Callable, n_repeat: int = 3) -> float:
+    """
+    Time a function, as the best of n_repeat calls.
+
+    Args:
+        function : Callable
+            Function to time, called without arguments.
+        n_repeat : int = 3
+            Number of calls.
+
+    Returns:
+        seconds : float
+            The best time, in seconds.
+    """
+
+    seconds = []
+    for _ in range(n_repeat):
+        tic = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - tic)
+
+    return min(seconds)
+
+
+def run_benchmark (file_paths: Sequence[str] = (), n_players: int = 1000, n_matches: int = 20000, n_iter: int = 100, n_repeat: int = 3, seed: int = 0, compile: bool = False, n_processes: Sequence[int] = ()) -> dict:
+    """
+    Run the performance suite: time the main stages of a ranking job.
+
+    Description:
+        Stages (best of n_repeat, in seconds):
+            - import: import_notion_csv of file_paths (only if file_paths are given)
+            - tennisUniverse_init: TennisUniverse from the TennisDataFrame
+            - loss_forward_backward: one evaluation of the loss and of its gradient
+            - loss_forward_backward_sparse: the same, with the sparse representation of the
+              log-likelihood terms (see LogLikelihoodTerm)
+            - loss_forward_backward_fused: the same, with the log-likelihood terms of all the scoring
+              systems evaluated in a single pass (see Loss)
+            - loss_forward_backward_threads: the same, with the matches split into chunks evaluated
+              by a pool of threads, one per thread of torch (at least 2, see Loss)
+            - compile, loss_forward_backward_compiled: only if compile is True. The first evaluation
+              of the loss and of its gradient compiled with torch.compile (compilation, or loading
+              from the cache of compiled artifacts), then the same as loss_forward_backward
+            - optimize: optimize with n_iter iterations
+            - optimize_minibatch: the same, stochastic, with growing mini-batches of 1% of the matches
+              at first (see TennisUniverse.optimize)
+            - prob_teamA_wins_torch, prob_teamA_wins_numpy: win probabilities of all the matches, with
+              the torch and NumPy backends of MrDodo
+        Precision modes (see LogLikelihoodTerm), for each of 'float64', 'float32' and 'compact':
+            - bytes_per_match: memory of the tensors of the matches, per match
+            - loss_forward_backward: seconds, as above
+            - loss_relative_error: relative error of the loss at the abilities optimized in float64,
+              with respect to float64
+            - abilities_max_abs_error: maximum absolute error of the abilities optimized with n_iter
+              iterations, with respect to float64
+        Data-parallel optimization (see distributed.optimize_data_parallel), for 1 process and for
+        each number of processes of n_processes:
+            - seconds_per_iter: seconds per iteration of the optimization loop, without starting the
+              processes
+            - speedup: seconds_per_iter of 1 process / seconds_per_iter
+            - efficiency: speedup / number of processes (1 for perfect scaling)
+        Without file_paths, a synthetic TennisDataFrame is used (see get_synthetic_tennisDataFrame).
+
+    Args:
+        file_paths : Sequence[str] = ()
+            Notion CSV files to benchmark on. Notation with '*' is supported. Empty for synthetic data.
+        n_players : int = 1000
+            Number of players of the synthetic data.
+        n_matches : int = 20000
+            Number of matches of the synthetic data.
+        n_iter : int = 100
+            Number of iterations of optimize.
+        n_repeat : int = 3
+            Number of repetitions of each stage.
+        seed : int = 0
+            Seed of the synthetic data.
+        compile : bool = False
+            Also time the loss compiled with torch.compile (see TennisUniverse).
+        n_processes : Sequence[int] = ()
+            Numbers of processes to time the data-parallel optimization with. Empty to skip it.
+
+    Returns:
+        results : dict
+            Keys: n_players, n_matches, n_iter, n_repeat, seconds (dict of stage -> seconds), precisions
+            (dict of precision mode -> dict of measure -> value), data_parallel (dict of number of
+            processes -> dict of measure -> value).
+    """
+
+    import torch
+    from .TennisUniverse import TennisUniverse
+    from .scoring_systems import MrDodo
+
+    seconds = {}
+    if file_paths:
+        from .io import import_notion_csv
+        seconds['import'] = time_it(lambda: import_notion_csv(*file_paths), n_repeat)
+        tdf = import_notion_csv(*file_paths)
+    else:
+        tdf = get_synthetic_tennisDataFrame(n_players, n_matches, seed=seed)
+
+    seconds['tennisUniverse_init'] = time_it(lambda: TennisUniverse(tdf), n_repeat)
+    tennisUniverse = TennisUniverse(tdf)
+
+    abilities_tensor = torch.zeros(len(tennisUniverse.playersDataFrame), requires_grad=True)
+    seconds['loss_forward_backward'] = time_it(lambda: tennisUniverse.loss(abilities_tensor).backward(), n_repeat)
+    tennisUniverse_sparse = TennisUniverse(tdf, representation='sparse')
+    seconds['loss_forward_backward_sparse'] = time_it(lambda: tennisUniverse_sparse.loss(abilities_tensor).backward(), n_repeat)
+    tennisUniverse_fused = TennisUniverse(tdf, fused=True)
+    seconds['loss_forward_backward_fused'] = time_it(lambda: tennisUniverse_fused.loss(abilities_tensor).backward(), n_repeat)
+    tennisUniverse_threads = TennisUniverse(tdf, n_workers=max(torch.get_num_threads(), 2))
+    seconds['loss_forward_backward_threads'] = time_it(lambda: tennisUniverse_threads.loss(abilities_tensor).backward(), n_repeat)
+    if compile:
+        tennisUniverse_compiled = TennisUniverse(tdf, compile=True)
+        seconds['compile'] = time_it(lambda: tennisUniverse_compiled.loss(abilities_tensor).backward(), 1)
+        seconds['loss_forward_backward_compiled'] = time_it(lambda: tennisUniverse_compiled.loss(abilities_tensor).backward(), n_repeat)
+    seconds['optimize'] = time_it(lambda: tennisUniverse.optimize(n_iter=n_iter, verbose=0), n_repeat)
+    seconds['optimize_minibatch'] = time_it(lambda: tennisUniverse.optimize(n_iter=n_iter, verbose=0, batch_size=max(1, len(tdf) // 100), seed=seed), n_repeat)
+
+    # Win probabilities of all the MrDodo matches, from the optimized abilities
+    if 'MrDodo' in tennisUniverse.loss.logLikelihoodTerms:
+        abilities_matches = tennisUniverse.abilities_tensor[tennisUniverse.loss.logLikelihoodTerms['MrDodo'].player_indices_tensor]
+        abilities_matches_numpy = abilities_matches.numpy()
+        mrdodo_torch, mrdodo_numpy = MrDodo(), MrDodo(backend='numpy')
+        seconds['prob_teamA_wins_torch'] = time_it(lambda: mrdodo_torch.prob_teamA_wins(abilities_matches), n_repeat)
+        seconds['prob_teamA_wins_numpy'] = time_it(lambda: mrdodo_numpy.prob_teamA_wins(abilities_matches_numpy), n_repeat)
+
+    # Precision modes: memory, speed, and accuracy with respect to float64
+    losses, abilities, precisions = {}, {}, {}
+    for precision in ['float64', 'float32', 'compact']:
+        tennisUniverse_precision = TennisUniverse(tdf, precision=precision)
+        loss = losses[precision] = tennisUniverse_precision.loss
+        abilities_tensor_precision = torch.zeros(len(tennisUniverse_precision.playersDataFrame), dtype=loss.dtype, requires_grad=True)
+        tennisUniverse_precision.optimize(n_iter=n_iter, verbose=0)
+        abilities[precision] = tennisUniverse_precision.abilities_tensor.double()
+        precisions[precision] = {
+            'bytes_per_match': sum(logLikelihoodTerm.get_n_bytes() for logLikelihoodTerm in loss.logLikelihoodTerms.values()) / int(tdf['is_valid'].sum()),
+            'loss_forward_backward': time_it(lambda: loss(abilities_tensor_precision).backward(), n_repeat),
+        }
+    with torch.no_grad():
+        loss_values = {precision: loss(abilities['float64'].to(loss.dtype)).item() for precision, loss in losses.items()}
+    for precision, measures in precisions.items():
+        measures['loss_relative_error'] = abs(loss_values[precision] - loss_values['float64']) / abs(loss_values['float64'])
+        measures['abilities_max_abs_error'] = (abilities[precision] - abilities['float64']).abs().max().item()
+
+    # Data-parallel optimization: scaling with the number of processes, with respect to 1 process
+    data_parallel = {}
+    if n_processes:
+        from .distributed import optimize_data_parallel
+        for n in [1, *(n for n in n_processes if n != 1)]:
+            seconds_per_iter = optimize_data_parallel(tennisUniverse.loss, len(tennisUniverse.playersDataFrame), n, n_iter=n_iter, verbose=0)['seconds'] / n_iter
+            speedup = data_parallel[1]['seconds_per_iter'] / seconds_per_iter if n != 1 else 1.
+            data_parallel[n] = {
+                'seconds_per_iter': seconds_per_iter,
+                'speedup': speedup,
+                'efficiency': speedup / n,
+            }
+
+    return {
+        'n_players': len(tennisUniverse.playersDataFrame),
+        'n_matches': int(tdf['is_valid'].sum()),
+        'n_iter': n_iter,
+        'n_repeat': n_repeat,
+        'seconds': seconds,
+        'precisions': precisions,
+        'data_parallel': data_parallel,
+    }
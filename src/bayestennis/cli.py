@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+from ._version import __version__
+
+# Heavy modules (numpy, pandas, torch) are imported by the commands, after --threads is applied.
+
+EXIT_OK = 0
+"""Exit code: success."""
+
+EXIT_ERROR = 1
+"""Exit code: the command failed (the message is printed to stderr)."""
+
+EXIT_USAGE = 2
+"""Exit code: invalid command line (as argparse)."""
+
+EXIT_NO_DATA = 3
+"""Exit code: no input file, or no valid match, to rank."""
+
+
+def main (argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of the bayestennis command line: `python -m bayestennis <command> ...`.
+
+    Description:
+        Commands:
+            - rank: import match files, optimize, and write the ranking (CSV, Parquet or XLSX)
+            - predict: head-to-head probabilities of a batch of matches, from a saved TennisUniverse
+            - bench: run the performance suite (see benchmark.run_benchmark), results as JSON
+        With --timings, the elapsed seconds of each stage, the command and its exit code are written
+        as JSON, for batch jobs to collect.
+
+    Args:
+        argv : Sequence[str] | None = None
+            Command line arguments, without the program name. Set to None to use sys.argv.
+
+    Returns:
+        exit_code : int
+            EXIT_OK, EXIT_ERROR, EXIT_USAGE or EXIT_NO_DATA.
+    """
+
+    parser = get_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+
+    if args.threads is not None:
+        set_threads(args.threads)
+
+    seconds = {}
+    tic = time.perf_counter()
+    try:
+        exit_code = args.function(args, seconds)
+    except Exception as e:
+        print(f"bayestennis {args.command}: error: {e}", file=sys.stderr)
+        exit_code = EXIT_ERROR
+    seconds['total'] = time.perf_counter() - tic
+
+    if args.timings is not None:
+        timings = {'command': args.command, 'exit_code': exit_code, 'threads': args.threads, 'version': __version__, 'seconds': seconds}
+        write_json(timings, args.timings)
+
+    return exit_code
+
+
+def get_parser () -> argparse.ArgumentParser:
+    """
+    Get the parser of the command line. See main.
+    """
+
+    parser = argparse.ArgumentParser(prog='bayestennis', description="Rank tennis players, and predict matches, from match files.")
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--threads', type=int, default=None, help="Number of threads of torch and of the numerical libraries.")
+    common.add_argument('--timings', default=None, metavar='PATH', help="Write the elapsed seconds of each stage as JSON to PATH ('-' for stdout).")
+    compile_options = argparse.ArgumentParser(add_help=False)
+    compile_options.add_argument('--compile', action='store_true', help="Compile the loss with torch.compile (see TennisUniverse).")
+    compile_options.add_argument('--compile-cache-dir', default=None, metavar='DIR', help="Cache directory of the compiled artifacts, shared across runs (TORCHINDUCTOR_CACHE_DIR).")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # rank
+    parser_rank = subparsers.add_parser('rank', parents=[common, compile_options], help="Import match files, optimize, and write the ranking.")
+    parser_rank.add_argument('file_paths', nargs='+', help="Match files. Notation with '*' is supported (quote it).")
+    parser_rank.add_argument('-o', '--output', required=True, help="Ranking file: .csv, .parquet or .xlsx.")
+    parser_rank.add_argument('--input-format', choices=['auto', 'notion-csv', 'parquet', 'arrow'], default='auto', help="Format of the match files. 'auto': from the extension of the first file.")
+    parser_rank.add_argument('--date-from', default=None, help="First date to import (Parquet and Arrow only), e.g. 2023-01-01.")
+    parser_rank.add_argument('--date-to', default=None, help="Last date to import (Parquet and Arrow only), e.g. 2023-12-31.")
+    parser_rank.add_argument('--cache-dir', default=None, help="Import cache directory (Notion CSV only).")
+    parser_rank.add_argument('--n-workers', type=int, default=1, help="Worker processes parsing files (Notion CSV only).")
+    parser_rank.add_argument('--representation', choices=['dense', 'sparse'], default='dense', help="Representation of the log-likelihood terms (see LogLikelihoodTerm).")
+    parser_rank.add_argument('--fused', action='store_true', help="Evaluate the log-likelihood terms of all the scoring systems in a single pass (see Loss).")
+    parser_rank.add_argument('--loss-workers', type=int, default=1, help="Threads evaluating the loss, each on chunks of matches (see Loss). --threads are divided among them.")
+    parser_rank.add_argument('--loss-chunk-size', type=int, default=None, help="Matches per chunk evaluated by the loss threads. Default: equal chunks, one per thread.")
+    parser_rank.add_argument('--processes', type=int, default=1, help="Worker processes optimizing, each on a shard of the matches (see TennisUniverse.optimize). --threads are divided among them.")
+    parser_rank.add_argument('--batch-size', type=int, default=None, help="Matches of the first mini-batch, for a stochastic optimization with growing mini-batches (see TennisUniverse.optimize). Default: all the matches at every iteration.")
+    parser_rank.add_argument('--batch-growth', type=float, default=None, help="Growth factor of the mini-batch at each iteration. Default: all the matches after 90%% of the iterations.")
+    parser_rank.add_argument('--weighted-sampling', action='store_true', help="Sample the mini-batches with probabilities proportional to the weights of the matches.")
+    parser_rank.add_argument('--precision', choices=['float64', 'float32', 'compact'], default='float32', help="Precision mode of the log-likelihood terms (see LogLikelihoodTerm).")
+    parser_rank.add_argument('--n-iter', type=int, default=1000, help="Number of optimization iterations.")
+    parser_rank.add_argument('--lr-start', type=float, default=1e-1, help="Initial learning rate.")
+    parser_rank.add_argument('--lr-end', type=float, default=1e-3, help="Final learning rate.")
+    parser_rank.add_argument('--save-snapshot', default=None, metavar='DIR', help="Also save the TennisUniverse into DIR (see TennisUniverse.save), e.g. for predict.")
+    parser_rank.add_argument('--verbose', type=int, default=0, help="Frequency of logging the optimization progress. 0 for no logging.")
+    parser_rank.set_defaults(function=rank)
+
+    # predict
+    parser_predict = subparsers.add_parser('predict', parents=[common], help="Head-to-head probabilities from a saved TennisUniverse.")
+    parser_predict.add_argument('snapshot', help="Directory of a TennisUniverse saved with TennisUniverse.save (or rank --save-snapshot).")
+    parser_predict.add_argument('matches', help="Matches file (.csv or .parquet) with columns id_teamA_player1, id_teamB_player1 and, for double matches, id_teamA_player2, id_teamB_player2 (-1 or empty for single matches).")
+    parser_predict.add_argument('-o', '--output', required=True, help="Predictions file: .csv, .parquet or .xlsx. The matches, with a prob_teamA_wins column.")
+    parser_predict.add_argument('--scoring-system', default='MrDodo', help="Scoring system of the matches.")
+    parser_predict.set_defaults(function=predict)
+
+    # bench
+    parser_bench = subparsers.add_parser('bench', parents=[common, compile_options], help="Run the performance suite, and write the results as JSON.")
+    parser_bench.add_argument('file_paths', nargs='*', help="Notion CSV files to benchmark on. Synthetic data if none.")
+    parser_bench.add_argument('-o', '--output', default='-', help="Results file (JSON). '-' for stdout.")
+    parser_bench.add_argument('--n-players', type=int, default=1000, help="Number of players of the synthetic data.")
+    parser_bench.add_argument('--n-matches', type=int, default=20000, help="Number of matches of the synthetic data.")
+    parser_bench.add_argument('--n-iter', type=int, default=100, help="Number of optimization iterations.")
+    parser_bench.add_argument('--n-repeat', type=int, default=3, help="Repetitions of each stage (the best time is kept).")
+    parser_bench.add_argument('--processes', type=int, nargs='*', default=[], help="Numbers of processes to time the data-parallel optimization with, e.g. 2 4.")
+    parser_bench.set_defaults(function=bench)
+
+    return parser
+
+
+def set_threads (n_threads: int) -> None:
+    """
+    Set the number of threads of torch and of the numerical libraries (OpenMP, MKL, OpenBLAS).
+    The environment variables only apply to libraries not imported yet.
+
+    Args:
+        n_threads : int
+            Number of threads.
+    """
+
+    for variable in ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']:
+        os.environ[variable] = str(n_threads)
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(n_threads)
+
+
+def set_torch_threads (args: argparse.Namespace) -> None:
+    """
+    Apply --threads to torch, imported by the command.
+    """
+
+    if args.threads is not None:
+        import torch
+        torch.set_num_threads(args.threads)
+
+
+def set_compile_cache_dir (args: argparse.Namespace) -> None:
+    """
+    Apply --compile-cache-dir, before anything is compiled.
+    """
+
+    if args.compile_cache_dir is not None:
+        os.environ['TORCHINDUCTOR_CACHE_DIR'] = os.path.abspath(args.compile_cache_dir)
+
+
+def rank (args: argparse.Namespace, seconds: dict) -> int:
+    """
+    Command rank. See main.
+    """
+
+    from .io import import_notion_csv, import_parquet, import_arrow_ipc
+    from .io.import_notion_csv import resolve_file_paths
+    from .TennisUniverse import TennisUniverse
+
+    set_torch_threads(args)
+    check_table_format(args.output)
+
+    file_paths = resolve_file_paths(args.file_paths)
+    if not file_paths:
+        print(f"bayestennis rank: no file matches {args.file_paths}", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    # Import
+    tic = time.perf_counter()
+    input_format = args.input_format if args.input_format != 'auto' else get_input_format(file_paths[0])
+    if input_format == 'notion-csv':
+        if args.date_from is not None or args.date_to is not None:
+            raise ValueError("--date-from and --date-to are supported for Parquet and Arrow files only")
+        tdf = import_notion_csv(*file_paths, cache_dir=args.cache_dir, n_workers=args.n_workers)
+    else:
+        date_range = (args.date_from, args.date_to)
+        import_match_logs = import_parquet if input_format == 'parquet' else import_arrow_ipc
+        tdf = import_match_logs(*file_paths, date_range=date_range)
+    seconds['import'] = time.perf_counter() - tic
+    if not tdf['is_valid'].any():
+        print(f"bayestennis rank: no valid match in {len(file_paths)} files", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    # Optimize
+    tic = time.perf_counter()
+    set_compile_cache_dir(args)
+    tennisUniverse = TennisUniverse(tdf, representation=args.representation, compile=args.compile, precision=args.precision, fused=args.fused, n_workers=args.loss_workers, chunk_size=args.loss_chunk_size)
+    tennisUniverse.optimize(n_iter=args.n_iter, lr_start=args.lr_start, lr_end=args.lr_end, verbose=args.verbose, n_processes=args.processes, batch_size=args.batch_size, batch_growth=args.batch_growth, weighted_sampling=args.weighted_sampling)
+    seconds['optimize'] = time.perf_counter() - tic
+
+    # Write
+    tic = time.perf_counter()
+    write_table(tennisUniverse.playersDataFrame.sort_values('rank', kind='stable'), args.output)
+    if args.save_snapshot is not None:
+        tennisUniverse.save(args.save_snapshot)
+    seconds['write'] = time.perf_counter() - tic
+
+    return EXIT_OK
+
+
+def predict (args: argparse.Namespace, seconds: dict) -> int:
+    """
+    Command predict. See main. Does not import torch.
+    """
+
+    import numpy as np
+    import pandas as pd
+    from .service.RankingSnapshot import RankingSnapshot
+
+    check_table_format(args.output)
+
+    tic = time.perf_counter()
+    snapshot = RankingSnapshot.load(args.snapshot, scoring_system_name=args.scoring_system)
+    matches = pd.read_parquet(args.matches) if Path(args.matches).suffix == '.parquet' else pd.read_csv(args.matches)
+    seconds['load'] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    missing_columns = [column for column in ['id_teamA_player1', 'id_teamB_player1'] if column not in matches.columns]
+    if missing_columns:
+        raise ValueError(f"Matches file is missing the columns {missing_columns}")
+    ids = {}
+    for column in ['id_teamA_player1', 'id_teamA_player2', 'id_teamB_player1', 'id_teamB_player2']:
+        if column in matches.columns:
+            matches[column] = matches[column].astype('Int64')  # keep empty cells empty
+            ids[column] = matches[column].fillna(-1).to_numpy(dtype=np.int64)
+        else:
+            ids[column] = np.full(len(matches), -1)
+    matches['prob_teamA_wins'] = snapshot.prob_teamA_wins_batch(**ids)
+    n_unknown = int(matches['prob_teamA_wins'].isna().sum())
+    if n_unknown:
+        print(f"bayestennis predict: {n_unknown} matches with unknown players or teams of different sizes (prob_teamA_wins is empty)", file=sys.stderr)
+    seconds['predict'] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    write_table(matches, args.output)
+    seconds['write'] = time.perf_counter() - tic
+
+    return EXIT_OK
+
+
+def bench (args: argparse.Namespace, seconds: dict) -> int:
+    """
+    Command bench. See main.
+    """
+
+    from .benchmark import run_benchmark
+
+    set_torch_threads(args)
+
+    tic = time.perf_counter()
+    set_compile_cache_dir(args)
+    results = run_benchmark(args.file_paths, n_players=args.n_players, n_matches=args.n_matches, n_iter=args.n_iter, n_repeat=args.n_repeat, compile=args.compile, n_processes=args.processes)
+    seconds['bench'] = time.perf_counter() - tic
+
+    write_json({'version': __version__, 'threads': args.threads, **results}, args.output)
+
+    return EXIT_OK
+
+
+def get_input_format (file_path: str) -> str:
+    """
+    Get the format of a match file from its extension: 'parquet', 'arrow' or 'notion-csv'.
+    """
+
+    suffix = Path(file_path).suffix.lower()
+    if suffix in ['.parquet', '.pq']:
+        return 'parquet'
+    if suffix in ['.arrow', '.feather', '.ipc']:
+        return 'arrow'
+    return 'notion-csv'
+
+
+def check_table_format (file_path: str) -> None:
+    """
+    Check that the extension of an output file is supported by write_table, before any long computation.
+    """
+
+    if Path(file_path).suffix.lower() not in ['.csv', '.parquet', '.xlsx']:
+        raise ValueError(f"Unsupported output format: {file_path} (expected .csv, .parquet or .xlsx)")
+
+
+def write_table (df, file_path: str) -> None:
+    """
+    Write a pandas DataFrame, without index, in the format of the file extension: .csv, .parquet or .xlsx.
+    """
+
+    check_table_format(file_path)
+    suffix = Path(file_path).suffix.lower()
+    if suffix == '.csv':
+        df.to_csv(file_path, index=False)
+    elif suffix == '.parquet':
+        df.to_parquet(file_path, index=False)
+    else:
+        df.to_excel(file_path, index=False)
+
+
+def write_json (data: dict, file_path: str) -> None:
+    """
+    Write data as JSON to file_path ('-' for stdout).
+    """
+
+    text = json.dumps(data, indent=2, default=str)
+    if file_path == '-':
+        print(text, flush=True)
+    else:
+        Path(file_path).write_text(text + "\n")
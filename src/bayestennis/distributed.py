@@ -0,0 +1,268 @@
+import os
+import socket
+import tempfile
+import time
+import multiprocessing
+from datetime import timedelta
+from typing import Optional
+import torch
+from .Loss import Loss, L1_Regularization
+
+
+def get_shards (loss: Loss, n_processes: int) -> list[list[tuple]]:
+    """
+    Split the matches of a Loss into n_processes shards, for data-parallel optimization.
+
+    Description:
+        The matches of each log-likelihood term are split into n_processes contiguous ranges of
+        (almost) equal sizes, so that every shard gets its share of every scoring system. The
+        tensors of each shard are copies, sent to the worker processes through shared memory.
+
+    Args:
+        loss : Loss
+            The loss to split. Its log-likelihood terms must keep the scores (keep_scores=True).
+        n_processes : int
+            Number of shards.
+
+    Returns:
+        shards : list[list[tuple]]
+            shards[rank] is the list of (scoring_system_name, score, player_indices, weight) of
+            the matches of the rank-th shard, the arguments of Loss.add.
+    """
+
+    shards = [[] for _ in range(n_processes)]
+    for scoring_system_name, logLikelihoodTerm in loss.logLikelihoodTerms.items():
+        if logLikelihoodTerm.score_tensor is None:
+            raise ValueError("Data-parallel optimization requires the scores of the matches (keep_scores=True)")
+        n_matches = logLikelihoodTerm.n_matches
+        for rank in range(n_processes):
+            start, stop = n_matches * rank // n_processes, n_matches * (rank + 1) // n_processes
+            if start < stop:
+                shards[rank].append((
+                    scoring_system_name,
+                    logLikelihoodTerm.score_tensor[start:stop].cpu().clone(),
+                    logLikelihoodTerm.player_indices_tensor[start:stop].cpu().clone(),
+                    logLikelihoodTerm.weights_tensor[start:stop].cpu().clone(),
+                ))
+
+    return shards
+
+
+def get_shard_options (loss: Loss, n_processes: int) -> dict:
+    """
+    Get the options of the Loss of each shard: those of loss, with the coupling constant of the
+    regularization divided by n_processes. The sum of the losses of the n_processes shards is then
+    loss, with the regularization counted once.
+
+    Args:
+        loss : Loss
+            The loss the shards come from.
+        n_processes : int
+            Number of shards.
+
+    Returns:
+        options : dict
+            Keyword arguments of Loss (see get_shard_loss).
+    """
+
+    return {
+        'Regularization': 'L1' if isinstance(loss.regularizationTerm, L1_Regularization) else 'L2',
+        'coupling_const': loss.regularizationTerm.coupling_const / n_processes,
+        'representation': loss.representation,
+        'compile': loss.compile,
+        'precision': loss.precision,
+        'fused': loss.fused,
+    }
+
+
+def get_shard_loss (options: dict, shard: list[tuple]) -> Loss:
+    """
+    Get the Loss of a shard.
+
+    Args:
+        options : dict
+            Keyword arguments of Loss, see get_shard_options.
+        shard : list[tuple]
+            The matches of the shard, see get_shards.
+
+    Returns:
+        shard_loss : Loss
+            The loss of the matches of the shard, evaluated sequentially (n_workers=1), on the CPU.
+    """
+
+    shard_loss = Loss(**options)
+    for scoring_system_name, score, player_indices, weight in shard:
+        shard_loss.add(scoring_system_name, score, player_indices, weight)
+
+    return shard_loss
+
+
+def optimize_data_parallel (loss: Loss,
+                            n_players: int,
+                            n_processes: int,
+                            n_iter: int = 1000,
+                            lr_start: float = 1e-1,
+                            lr_end: float = 1e-3,
+                            verbose: int = 100,
+                            n_threads_per_process: Optional[int] = None,
+                            timeout: float = 600.) -> dict:
+    """
+    Optimize player abilities on n_processes worker processes, each holding a shard of the matches.
+
+    Description:
+        The matches are split into n_processes shards (see get_shards). Each worker process (spawned)
+        computes the loss of its shard and its gradient (see get_shard_loss), then the gradients and
+        the losses are summed over the processes with an all-reduce of torch.distributed (gloo
+        backend, over localhost), so that every process gets the gradient of the full loss. Every
+        process then takes the same Adam step, as in TennisUniverse.optimize: the abilities stay
+        identical across processes, without being sent. Results match TennisUniverse.optimize up to
+        the order of the floating point sums.
+
+    Args:
+        loss : Loss
+            The loss to minimize.
+        n_players : int
+            Number of players (size of the abilities tensor).
+        n_processes : int
+            Number of worker processes.
+        n_iter : int = 1000
+            Number of optimization iterations.
+        lr_start : float = 0.1
+            Initial learning rate.
+        lr_end : float = 0.001
+            Final learning rate.
+        verbose : int = 100
+            Frequency of logging the progress (by the process of rank 0). Set to 0 for no logging.
+        n_threads_per_process : int | None = None
+            Number of intra-op threads of each process. Defaults to None, the number of threads of
+            torch (torch.get_num_threads()) divided among the processes.
+        timeout : float = 600.
+            Seconds a process waits for the others at each all-reduce before failing.
+
+    Returns:
+        result : dict
+            Keys: abilities (torch.Tensor (n_players,)), optimizer (state dict of the Adam optimizer),
+            optimization_info (dict of lists, see OptimizationInfo), seconds (seconds of the
+            optimization loop, without starting the processes and building the shards).
+    """
+
+    if n_processes < 1:
+        raise ValueError("n_processes must be at least 1")
+    n_threads_per_process = n_threads_per_process or max(1, torch.get_num_threads() // n_processes)
+
+    # Free port on localhost for the rendezvous of the processes
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        init_method = f"tcp://127.0.0.1:{s.getsockname()[1]}"
+
+    options, shards = get_shard_options(loss, n_processes), get_shards(loss, n_processes)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result_path = os.path.join(tmp_dir, 'result.pt')
+        mp_context = multiprocessing.get_context('spawn')
+        processes = [
+            mp_context.Process(target=optimize_worker, args=(rank, n_processes, init_method, options, shards[rank], n_players, n_iter, lr_start, lr_end, verbose, n_threads_per_process, timeout, result_path))
+            for rank in range(n_processes)
+        ]
+        del shards
+        for process in processes:
+            process.start()
+
+        # Wait for the processes; if one fails, stop the others (blocked in an all-reduce)
+        try:
+            while any(process.is_alive() for process in processes):
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    break
+                for process in processes:
+                    process.join(timeout=0.1)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        exitcodes = [process.exitcode for process in processes]
+        if any(exitcode != 0 for exitcode in exitcodes):
+            raise RuntimeError(f"Data-parallel optimization failed, exit codes of the processes: {exitcodes}")
+
+        result = torch.load(result_path, weights_only=False)
+
+    return result
+
+
+def optimize_worker (rank: int,
+                     n_processes: int,
+                     init_method: str,
+                     options: dict,
+                     shard: list[tuple],
+                     n_players: int,
+                     n_iter: int,
+                     lr_start: float,
+                     lr_end: float,
+                     verbose: int,
+                     n_threads: int,
+                     timeout: float,
+                     result_path: str) -> None:
+    """
+    Worker process of optimize_data_parallel: optimize the abilities on a shard of the matches,
+    with the gradients all-reduced over the processes. The process of rank 0 writes the result to
+    result_path (see optimize_data_parallel).
+    """
+
+    import torch.distributed as dist
+    from .TennisUniverse import LR_Exponential_Policy
+
+    torch.set_num_threads(n_threads)
+    dist.init_process_group('gloo', init_method=init_method, rank=rank, world_size=n_processes, timeout=timedelta(seconds=timeout))
+    try:
+        shard_loss = get_shard_loss(options, shard)
+        del shard
+        n_matches = torch.tensor([sum(logLikelihoodTerm.n_matches for logLikelihoodTerm in shard_loss.logLikelihoodTerms.values())])
+        dist.all_reduce(n_matches, op=dist.ReduceOp.SUM)
+        n_matches = n_matches.item()
+
+        abilities_tensor = torch.zeros(n_players, dtype=shard_loss.dtype, requires_grad=True)
+        optimizer = torch.optim.Adam([abilities_tensor], lr=lr_start)
+        scheduler = torch.optim.lr_scheduler.LambdaLR(optimizer, lr_lambda=LR_Exponential_Policy(lr_start, lr_end, n_iter))
+        optimization_info = {
+            "idx_iteration": [],
+            "loss": [],
+            "batch_size": [],
+        }
+
+        if verbose and rank == 0:
+            print(f"Optimization started ({n_processes} processes):", flush=True)
+        dist.barrier()
+        tic = time.perf_counter()
+        for i_iter in range(n_iter):
+            # Loss and gradient of the shard
+            loss_shard = shard_loss(abilities_tensor)
+            optimizer.zero_grad()
+            loss_shard.backward()
+
+            # Sum of the gradients and of the losses of all the shards, in a single all-reduce
+            buffer = torch.cat([abilities_tensor.grad, loss_shard.detach().reshape(1)])
+            dist.all_reduce(buffer, op=dist.ReduceOp.SUM)
+            abilities_tensor.grad.copy_(buffer[:-1])
+            loss_value = buffer[-1].item()
+
+            optimizer.step()
+            scheduler.step()
+
+            if verbose and rank == 0 and i_iter % verbose == 0:
+                print(f"  {i_iter} / {n_iter}: Loss = {loss_value:.6f}", flush=True)
+            optimization_info["idx_iteration"].append(i_iter)
+            optimization_info["loss"].append(loss_value)
+            optimization_info["batch_size"].append(n_matches)
+        seconds = time.perf_counter() - tic
+
+        if verbose and rank == 0:
+            print(f"  {n_iter} / {n_iter}: Loss = {loss_value:.6f} (end)", flush=True)
+        if rank == 0:
+            result = {
+                'abilities': abilities_tensor.detach(),
+                'optimizer': optimizer.state_dict(),
+                'optimization_info': optimization_info,
+                'seconds': seconds,
+            }
+            torch.save(result, result_path)
+    finally:
+        dist.destroy_process_group()
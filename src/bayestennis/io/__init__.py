@@ -1 +1,3 @@
 from .import_notion_csv import import_notion_csv
+from .stream_notion_csv import stream_notion_csv
+from .import_parquet import import_parquet, import_arrow_ipc
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Union
+from ..structures import TennisDataFrame
+
+
+# Kinds of the values of object columns, stored next to their string representation
+_KIND_STR, _KIND_NONE, _KIND_NAN = 0, 1, 2
+
+
+def get_file_hash (file_path: Union[str, Path]) -> str:
+    """
+    Get the SHA-256 hash of the content of a file.
+
+    Args:
+        file_path : str or Path
+            Path of the file.
+
+    Returns:
+        file_hash : str
+            Hexadecimal SHA-256 hash of the file content.
+    """
+
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def save_tdf_to_cache (tdf: TennisDataFrame, cache_file_path: Union[str, Path]) -> None:
+    """
+    Save a TennisDataFrame into an uncompressed .npz file, one array per column.
+
+    Description:
+        Columns with a numpy dtype are stored as they are. Object columns are stored as fixed-width
+        strings plus the kind of each value (string, None or NaN), so they are restored exactly.
+        The file is written to a temporary file first, then renamed.
+
+    Args:
+        tdf : TennisDataFrame
+            The TennisDataFrame to save.
+        cache_file_path : str or Path
+            Path of the .npz file.
+    """
+
+    arrays = {'__columns__': np.array(tdf.columns, dtype=str)}
+    for column in tdf.columns:
+        series = tdf[column]
+        if series.dtype != object:
+            arrays[f'{column}:values'] = series.to_numpy()
+        else:
+            kinds = series.map(lambda value: _KIND_NONE if value is None else _KIND_NAN if isinstance(value, float) and np.isnan(value) else _KIND_STR)
+            arrays[f'{column}:str'] = np.array(['' if kind != _KIND_STR else str(value) for value, kind in zip(series, kinds)], dtype=str)
+            arrays[f'{column}:kinds'] = kinds.to_numpy(dtype=np.int8)
+
+    cache_file_path = Path(cache_file_path)
+    cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_file_path_tmp = cache_file_path.with_name(f"{cache_file_path.name}.{os.getpid()}.tmp")
+    with open(cache_file_path_tmp, 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(cache_file_path_tmp, cache_file_path)
+
+
+def load_tdf_from_cache (cache_file_path: Union[str, Path]) -> Optional[TennisDataFrame]:
+    """
+    Load a TennisDataFrame saved with save_tdf_to_cache.
+
+    Args:
+        cache_file_path : str or Path
+            Path of the .npz file.
+
+    Returns:
+        tdf : TennisDataFrame | None
+            The TennisDataFrame. None if the file does not exist or cannot be read.
+    """
+
+    try:
+        with np.load(cache_file_path, allow_pickle=False) as npz:
+            columns = {}
+            for column in npz['__columns__']:
+                if f'{column}:values' in npz:
+                    columns[column] = npz[f'{column}:values']
+                else:
+                    values = npz[f'{column}:str'].astype(object)
+                    kinds = npz[f'{column}:kinds']
+                    values[kinds == _KIND_NONE] = None
+                    values[kinds == _KIND_NAN] = np.nan
+                    columns[column] = values
+    except (OSError, KeyError, ValueError):
+        return None
+
+    return pd.DataFrame(columns)
@@ -1,18 +1,39 @@
 from .. import scoring_systems
+from .._version import __version__
+from .cache import get_file_hash, save_tdf_to_cache, load_tdf_from_cache
+import hashlib
+import multiprocessing
 import pandas as pd
-from typing import Tuple
-from ..structures import TennisDataFrame
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Union
+from ..structures import TennisDataFrame, SCORE_COLUMNS, CATEGORICAL_COLUMNS, as_score_array
 from glob import glob
 from pathlib import Path
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
 
-# Load notion_tournaments_config as a pandas DataFrame
-notion_tournaments_config = pd.read_csv(Path(__file__).resolve().parent / 'notion_tournaments_config.csv')
-notion_tournaments_config.set_index('tournament', inplace=True)
+notion_tournaments_config_path = Path(__file__).resolve().parent / 'notion_tournaments_config.csv'
 
 
-def import_notion_csv (*file_paths: Tuple[str]) -> TennisDataFrame:
+@lru_cache(maxsize=None)
+def get_notion_tournaments_config () -> pd.DataFrame:
+    """
+    Load notion_tournaments_config.csv as a pandas DataFrame indexed by tournament, on first use.
+    The result is cached: do not modify it.
+
+    Returns:
+        notion_tournaments_config : pd.DataFrame
+            Tournaments configuration, with columns scoring_system and reference_date.
+    """
+
+    notion_tournaments_config = pd.read_csv(notion_tournaments_config_path)
+    notion_tournaments_config.set_index('tournament', inplace=True)
+
+    return notion_tournaments_config
+
+
+def import_notion_csv (*file_paths: Tuple[str], cache_dir: Optional[Union[str, Path]] = None, n_workers: int = 1) -> TennisDataFrame:
     """
     Import a TennisDataFrame from Notion CSV files.
 
@@ -30,6 +51,14 @@ def import_notion_csv (*file_paths: Tuple[str]) -> TennisDataFrame:
             File paths to import. Notation with '*' is supported. E.g.:
                 - 'path/to/file1.csv'
                 - 'path/to/file*.csv'
+        cache_dir : str or Path | None = None
+            Directory of the import cache. The parsed TennisDataFrame of each file is cached, keyed
+            by the hash of the file content, the hash of notion_tournaments_config.csv and the package
+            version: unchanged files are loaded from the cache instead of being parsed again.
+            Set to None for no cache.
+        n_workers : int = 1
+            Number of worker processes parsing files concurrently. The order of the files, hence the
+            id_match of each match, does not depend on n_workers. Set to 1 to parse in this process.
 
     Returns:
         tdf : TennisDataFrame
@@ -39,22 +68,14 @@ def import_notion_csv (*file_paths: Tuple[str]) -> TennisDataFrame:
     # resolve file paths
     file_paths = resolve_file_paths(file_paths)
 
-    # create a TennisDataFrame (tdf) for each file
-    tdfs = []
-    for file_path in file_paths:
-
-        # Read CSV file as pandas DataFrame (df)
-        df = pd.read_csv(file_path)
-        assert len(df.columns) == 6, "Notion CSV file must have 6 columns: id, Teams, Players A, Players B, Score, Tournament"
-        df.columns = ["id", "Teams", "Players A", "Players B", "Score", "Tournament"]
-
-        # Parse DataFrame to TennisDataFrame, row-by-row
-        tdf = df.apply(get_tdf_row_from_df_row, axis=1)
-        tdf['id_match'] = None  # assigned later
-        tdf['file_path'] = file_path
-        tdf['file_name'] = str(Path(file_path).name)
-
-        tdfs.append(tdf)
+    # create a TennisDataFrame (tdf) for each file, in the order of file_paths
+    cache_dirs = [cache_dir] * len(file_paths)
+    if n_workers > 1 and len(file_paths) > 1:
+        mp_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(file_paths)), mp_context=mp_context) as executor:
+            tdfs = list(executor.map(read_notion_csv_file_cached, file_paths, cache_dirs))
+    else:
+        tdfs = list(map(read_notion_csv_file_cached, file_paths, cache_dirs))
 
     # concatenate all TennisDataFrames
     tdf = pd.concat(tdfs, ignore_index=True)
@@ -66,6 +87,107 @@ def import_notion_csv (*file_paths: Tuple[str]) -> TennisDataFrame:
     return tdf
 
 
+def read_notion_csv_file (file_path: str) -> TennisDataFrame:
+    """
+    Parse a single Notion CSV file into a TennisDataFrame, before the global processing (see process_tdf).
+
+    Args:
+        file_path : str
+            File path to import.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the parsed data. id_match is not assigned yet.
+    """
+
+    # Read CSV file as pandas DataFrame (df)
+    df = pd.read_csv(file_path)
+    assert len(df.columns) == 6, "Notion CSV file must have 6 columns: id, Teams, Players A, Players B, Score, Tournament"
+    df.columns = ["id", "Teams", "Players A", "Players B", "Score", "Tournament"]
+
+    # Parse DataFrame to TennisDataFrame, row-by-row
+    tdf = expand_normalized_scores(df.apply(get_tdf_row_from_df_row, axis=1))
+    tdf['id_match'] = None  # assigned later
+    tdf['file_path'] = file_path
+    tdf['file_name'] = str(Path(file_path).name)
+
+    return tdf
+
+
+def expand_normalized_scores (tdf: TennisDataFrame) -> TennisDataFrame:
+    """
+    Replace the normalized_score_AvsB column (one list per row, see get_tdf_row_from_df_row) by int8
+    score columns (see structures.SCORE_COLUMNS), at the same position.
+
+    Args:
+        tdf : TennisDataFrame
+            TennisDataFrame with a normalized_score_AvsB column.
+
+    Returns:
+        tdf : TennisDataFrame
+            TennisDataFrame with score columns.
+    """
+
+    scores = np.zeros((len(tdf), len(SCORE_COLUMNS)), dtype=np.int64)
+    for i_row, normalized_score in enumerate(tdf['normalized_score_AvsB']):
+        scores[i_row, :len(normalized_score)] = normalized_score
+    scores = as_score_array(scores)
+
+    idx_column = tdf.columns.get_loc('normalized_score_AvsB')
+    tdf = tdf.drop(columns='normalized_score_AvsB')
+    tdf = pd.concat([tdf.iloc[:, :idx_column], pd.DataFrame(scores, columns=SCORE_COLUMNS, index=tdf.index), tdf.iloc[:, idx_column:]], axis=1)
+
+    return tdf
+
+
+def read_notion_csv_file_cached (file_path: str, cache_dir: Optional[Union[str, Path]] = None) -> TennisDataFrame:
+    """
+    Parse a single Notion CSV file with read_notion_csv_file, through the import cache.
+
+    Args:
+        file_path : str
+            File path to import.
+        cache_dir : str or Path | None = None
+            Directory of the import cache. See import_notion_csv. Set to None for no cache.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the parsed data. id_match is not assigned yet.
+    """
+
+    if cache_dir is None:
+        return read_notion_csv_file(file_path)
+
+    cache_file_path = Path(cache_dir) / f"{get_cache_key(file_path)}.npz"
+    tdf = load_tdf_from_cache(cache_file_path)
+    if tdf is None:
+        tdf = read_notion_csv_file(file_path)
+        save_tdf_to_cache(tdf, cache_file_path)
+    tdf['file_path'] = file_path  # the same content may be cached from another path
+    tdf['file_name'] = str(Path(file_path).name)
+
+    return tdf
+
+
+def get_cache_key (file_path: str) -> str:
+    """
+    Get the import cache key of a file: the hash of the file content, of notion_tournaments_config.csv
+    and of the package version, as any of them changes the parsed TennisDataFrame.
+
+    Args:
+        file_path : str
+            File path.
+
+    Returns:
+        cache_key : str
+            Hexadecimal cache key.
+    """
+
+    key = f"{get_file_hash(file_path)}:{get_file_hash(notion_tournaments_config_path)}:{__version__}"
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
 def get_tdf_row_from_df_row (df_row: pd.Series) -> pd.Series:
     """
     Get a TennisDataFrame row from a DataFrame row.
@@ -175,7 +297,7 @@ def get_tdf_row_from_df_row (df_row: pd.Series) -> pd.Series:
 
     try:
         tournament_name = df_row['Tournament']
-        tournament_info = notion_tournaments_config.loc[tournament_name]
+        tournament_info = get_notion_tournaments_config().loc[tournament_name]
     except Exception:
         tdf_row['is_valid'] = False
         tdf_row['error_msg'] = f"Tournament not recognized: {tournament_name}"
@@ -297,25 +419,78 @@ def process_tdf (tdf: TennisDataFrame) -> TennisDataFrame:
     Assign the value of remaining columns of the TennisDataFrame
     """
 
+    # Assign player IDs
+    assign_player_ids(tdf, {})
+
+    # Compute elapsed days and log likelihood weights
+    assign_log_likelihood_weights(tdf, tdf['date'].max())
+
+    # Columnar layout
+    set_categorical_dtypes(tdf)
+
+    return tdf
+
+
+def assign_player_ids (tdf: TennisDataFrame, name_to_id_dict: dict[str, int]) -> None:
+    """
+    Assign player IDs, in place, extending name_to_id_dict with the new players.
+
+    Description:
+        New players get consecutive IDs in order of first appearance among the valid rows. Calling
+        this function on consecutive chunks of a TennisDataFrame, with the same name_to_id_dict,
+        assigns the same IDs as calling it once on the whole TennisDataFrame.
+
+    Args:
+        tdf : TennisDataFrame
+            TennisDataFrame (or chunk of TennisDataFrame) to assign IDs to.
+        name_to_id_dict : dict[str, int]
+            Map from player names to IDs. Updated with the new players.
+    """
+
     # Filter out invalid rows
     tdf_valid = tdf[tdf['is_valid']]
 
-    # Assign player IDs
+    # Extend the map with new players
     player_names = tdf_valid[['teamA_player1_name', 'teamA_player2_name', 'teamB_player1_name', 'teamB_player2_name']].stack().unique()
-    player_ids = np.arange(len(player_names))
-    name_to_id_dict = dict(zip(player_names, player_ids))
+    for player_name in player_names:
+        if player_name not in name_to_id_dict:
+            name_to_id_dict[player_name] = len(name_to_id_dict)
+
+    # Assign player IDs
     name_to_id_map = lambda name: name_to_id_dict.get(name, -1)
-    tdf['id_teamA_player1'] = tdf['teamA_player1_name'].map(name_to_id_map).astype(int)
-    tdf['id_teamA_player2'] = tdf['teamA_player2_name'].map(name_to_id_map).astype(int)
-    tdf['id_teamB_player1'] = tdf['teamB_player1_name'].map(name_to_id_map).astype(int)
-    tdf['id_teamB_player2'] = tdf['teamB_player2_name'].map(name_to_id_map).astype(int)
+    tdf['id_teamA_player1'] = tdf['teamA_player1_name'].map(name_to_id_map).astype(np.int32)
+    tdf['id_teamA_player2'] = tdf['teamA_player2_name'].map(name_to_id_map).astype(np.int32)
+    tdf['id_teamB_player1'] = tdf['teamB_player1_name'].map(name_to_id_map).astype(np.int32)
+    tdf['id_teamB_player2'] = tdf['teamB_player2_name'].map(name_to_id_map).astype(np.int32)
+
+
+def assign_log_likelihood_weights (tdf: TennisDataFrame, most_recent_date: datetime) -> None:
+    """
+    Assign elapsed days and log likelihood weights, in place.
+
+    Args:
+        tdf : TennisDataFrame
+            TennisDataFrame (or chunk of TennisDataFrame) to assign weights to.
+        most_recent_date : datetime
+            Reference date of the elapsed days.
+    """
 
     # Compute elapsed days
-    most_recent_date = tdf['date'].max()
     tdf['elapsed_days'] = (most_recent_date - tdf['date']) / timedelta(days=1)
 
     # Compute log likelihood weights
     half_life_days = 8 * 30  # 8 months. This hard-coded value can be adjusted later, if needed
     tdf['log_likelihood_weight'] = 2 ** (-tdf['elapsed_days'] / half_life_days)
 
-    return tdf
+
+def set_categorical_dtypes (tdf: TennisDataFrame) -> None:
+    """
+    Convert the low-cardinality string columns to categorical dtype, in place. See structures.CATEGORICAL_COLUMNS.
+
+    Args:
+        tdf : TennisDataFrame
+            TennisDataFrame (or chunk of TennisDataFrame) to convert.
+    """
+
+    for column in CATEGORICAL_COLUMNS:
+        tdf[column] = tdf[column].astype('category')
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from .. import scoring_systems
+from ..structures import TennisDataFrame, SCORE_COLUMNS, as_score_array
+from .import_notion_csv import resolve_file_paths, check_if_admittable_player, process_tdf
+
+PLAYER_COLUMNS = ['teamA_player1', 'teamA_player2', 'teamB_player1', 'teamB_player2']
+"""Player name columns of a match log. Second players are null for single matches."""
+
+MATCH_LOG_COLUMNS = PLAYER_COLUMNS + ['tournament', 'date', 'scoring_system']
+"""Required columns of a match log, besides the score columns."""
+
+
+def import_parquet (*file_paths: Tuple[str], date_range: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None) -> TennisDataFrame:
+    """
+    Import a TennisDataFrame from Parquet match logs.
+
+    Description:
+        A match log is a table with the following columns:
+            - id (optional): identifier of the match within the file. Default: row number
+            - teamA_player1, teamA_player2, teamB_player1, teamB_player2: player names (string).
+              Second players are null for single matches
+            - tournament: tournament name (string)
+            - date: date of the match (date or timestamp)
+            - scoring_system: name of the scoring system, e.g. 'MrDodo' (string)
+            - score_0, ..., score_5: score of team A vs team B in the format of the scoring system
+              (integer), e.g. [6, 3, 4, 6, 11, 9]. Missing columns and nulls are 0
+
+        Only these columns are read (column projection), and the date range is pushed down to the
+        reader as a filter, so row groups out of the range are skipped, using their statistics. Scores
+        are validated by the vectorized process_scores of the scoring systems, with the same error
+        messages as import_notion_csv.
+
+        pyarrow is required.
+
+    Args:
+        *file_paths : Tuple[str]
+            File paths to import. Notation with '*' is supported. E.g.:
+                - 'path/to/season_2023.parquet'
+                - 'path/to/season_*.parquet'
+        date_range : Tuple[datetime | None, datetime | None] | None = None
+            Dates of the first and last matches to import (both included). None for no bound.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the imported data.
+    """
+
+    return import_match_logs(file_paths, 'parquet', date_range)
+
+
+def import_arrow_ipc (*file_paths: Tuple[str], date_range: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None) -> TennisDataFrame:
+    """
+    Import a TennisDataFrame from Arrow IPC (Feather v2) match logs.
+    See import_parquet for the schema of a match log.
+
+    Args:
+        *file_paths : Tuple[str]
+            File paths to import. Notation with '*' is supported.
+        date_range : Tuple[datetime | None, datetime | None] | None = None
+            Dates of the first and last matches to import (both included). None for no bound.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the imported data.
+    """
+
+    return import_match_logs(file_paths, 'ipc', date_range)
+
+
+def import_match_logs (file_paths: Tuple[str], file_format: str, date_range: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None) -> TennisDataFrame:
+    """
+    Import a TennisDataFrame from match logs. See import_parquet.
+
+    Args:
+        file_paths : Tuple[str]
+            File paths to import. Notation with '*' is supported.
+        file_format : str
+            Format of the files: 'parquet' or 'ipc'.
+        date_range : Tuple[datetime | None, datetime | None] | None = None
+            Dates of the first and last matches to import (both included). None for no bound.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the imported data.
+    """
+
+    # resolve file paths
+    file_paths = resolve_file_paths(file_paths)
+
+    # create a TennisDataFrame (tdf) for each file
+    tdfs = [read_match_log_file(file_path, file_format, date_range) for file_path in file_paths]
+
+    # concatenate all TennisDataFrames
+    tdf = pd.concat(tdfs, ignore_index=True)
+    tdf['id_match'] = np.arange(len(tdf))
+
+    # process tdf to assign the rest of the TennisDataFrame columns
+    tdf = process_tdf(tdf)
+
+    return tdf
+
+
+def read_match_log_file (file_path: str, file_format: str, date_range: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None) -> TennisDataFrame:
+    """
+    Read and validate a single match log file, before the global processing (see process_tdf).
+
+    Args:
+        file_path : str
+            File path to import.
+        file_format : str
+            Format of the file: 'parquet' or 'ipc'.
+        date_range : Tuple[datetime | None, datetime | None] | None = None
+            Dates of the first and last matches to import (both included). None for no bound.
+
+    Returns:
+        tdf : TennisDataFrame
+            Tennis DataFrame containing the parsed data. id_match is not assigned yet.
+    """
+
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError("pyarrow is required to import Parquet and Arrow IPC files: pip install pyarrow") from e
+
+    # Column projection
+    dataset = ds.dataset(file_path, format=file_format)
+    missing_columns = [column for column in MATCH_LOG_COLUMNS if column not in dataset.schema.names]
+    if missing_columns:
+        raise ValueError(f"Match log {file_path} is missing the columns {missing_columns}")
+    score_columns = [column for column in SCORE_COLUMNS if column in dataset.schema.names]
+    id_columns = ['id'] if 'id' in dataset.schema.names else []
+    columns = id_columns + MATCH_LOG_COLUMNS + score_columns
+
+    # Predicate pushdown of the date range
+    date_filter = None
+    date_type = dataset.schema.field('date').type
+    for bound, compare in zip(date_range or (None, None), [lambda a, b: a >= b, lambda a, b: a <= b]):
+        if bound is not None:
+            bound_filter = compare(ds.field('date'), pa.scalar(pd.Timestamp(bound).to_pydatetime()).cast(date_type))
+            date_filter = bound_filter if date_filter is None else date_filter & bound_filter
+
+    df = dataset.to_table(columns=columns, filter=date_filter).to_pandas()
+
+    # Scores, as integers
+    scores = np.zeros((len(df), len(SCORE_COLUMNS)), dtype=np.int64)
+    for i_column, column in enumerate(SCORE_COLUMNS):
+        if column in df.columns:
+            scores[:, i_column] = df[column].fillna(0).to_numpy(dtype=np.int64)
+
+    # Players
+    players = {column: df[column].astype(object).where(df[column].notna(), None).to_numpy() for column in PLAYER_COLUMNS}
+    is_double = pd.notna(players['teamA_player2'])
+    is_admittable_player = {column: np.array([isinstance(player, str) and check_if_admittable_player(player) for player in players[column]], dtype=bool) for column in PLAYER_COLUMNS}
+
+    # Validate, from the last check to the first, so that each row keeps the message of its first error
+    n_rows = len(df)
+    is_valid = np.ones(n_rows, dtype=bool)
+    error_msg = np.full(n_rows, "", dtype=object)
+    normalized_scores = np.zeros((n_rows, len(SCORE_COLUMNS)), dtype=np.int64)
+    winner_team = np.full(n_rows, "", dtype=object)
+    score_AvsB_str = np.array([get_score_as_str(score) for score in scores.tolist()], dtype=object)
+
+    for scoring_system_name in pd.unique(df['scoring_system']):
+        rows = (df['scoring_system'] == scoring_system_name).to_numpy()
+        try:
+            scoringSystemObj = getattr(scoring_systems, scoring_system_name)()  # E.g.: MrDodo()
+        except Exception:
+            is_valid[rows] = False
+            error_msg[rows] = f"Scoring system not recognized: {scoring_system_name}"
+            continue
+        is_admittable_score, normalized_score_AvsB, winner_team[rows] = scoringSystemObj.process_scores(scores[rows])
+        normalized_scores[rows, :normalized_score_AvsB.shape[1]] = normalized_score_AvsB
+        is_not_admittable = rows.copy()
+        is_not_admittable[rows] = ~is_admittable_score
+        is_valid[is_not_admittable] = False
+        error_msg[is_not_admittable] = [f"Score '{score}' is not admittable for the scoring system '{scoring_system_name}'" for score in score_AvsB_str[is_not_admittable]]
+
+    is_double_admittable = is_admittable_player['teamA_player2'] & is_admittable_player['teamB_player2']
+    is_not_admittable = ~(is_admittable_player['teamA_player1'] & is_admittable_player['teamB_player1'] & (is_double_admittable | ~is_double))
+    is_valid[is_not_admittable] = False
+    for i_row in np.flatnonzero(is_not_admittable):
+        players_row = [players[column][i_row] for column in PLAYER_COLUMNS if is_double[i_row] or column.endswith('player1')]
+        error_msg[i_row] = f"Players name not admittable: {[player for player in players_row if not (isinstance(player, str) and check_if_admittable_player(player))]}"
+
+    is_strange = is_double != pd.notna(players['teamB_player2'])
+    is_valid[is_strange] = False
+    error_msg[is_strange] = "Strange number of players. Is it a single or a double match?"
+
+    # Invalid rows have no normalized score nor winner
+    normalized_scores[~is_valid] = 0
+    normalized_scores = as_score_array(normalized_scores)
+    winner_team[~is_valid] = ""
+
+    # Assemble the TennisDataFrame, with the columns in the order of import_notion_csv
+    tdf = pd.DataFrame({
+        'id_match': None,  # assigned later
+        'file_name': str(Path(file_path).name),
+        'file_path': file_path,
+        'id_match_within_file': df['id'].to_numpy() if id_columns else np.arange(n_rows),
+        'is_valid': is_valid,
+        'error_msg': error_msg,
+        'match_type': np.where(is_double, 'double', 'single').astype(object),
+        'tournament': df['tournament'].astype(object).to_numpy(),
+        'scoring_system': df['scoring_system'].astype(object).to_numpy(),
+        'date': pd.to_datetime(df['date']).astype('datetime64[ns]').to_numpy(),
+        'elapsed_days': np.nan,  # assigned later. See process_tdf()
+        'log_likelihood_weight': 0.,  # assigned later. See process_tdf()
+        'id_teamA_player1': -1,  # assigned later. See process_tdf()
+        'teamA_player1_name': players['teamA_player1'],
+        'id_teamA_player2': -1,
+        'teamA_player2_name': players['teamA_player2'],
+        'id_teamB_player1': -1,
+        'teamB_player1_name': players['teamB_player1'],
+        'id_teamB_player2': -1,
+        'teamB_player2_name': players['teamB_player2'],
+        'score_AvsB_str': score_AvsB_str,
+        **{column: normalized_scores[:, i_column] for i_column, column in enumerate(SCORE_COLUMNS)},
+        'winner_team': winner_team,
+    }, index=pd.RangeIndex(n_rows))
+
+    return tdf
+
+
+def get_score_as_str (score: list[int]) -> str:
+    """
+    Get score as string, the inverse of import_notion_csv.get_score_as_list. Trailing 0-0 pairs are dropped.
+
+    Args:
+        score : list[int]
+            Score as list of int. E.g. [6, 3, 4, 6, 11, 9, 0, 0]
+
+    Returns:
+        score_as_str : str
+            Score as string. E.g. "6-3 4-6 11-9"
+    """
+
+    pairs = [f"{score[i]}-{score[i+1]}" for i in range(0, len(score) - 1, 2)]
+    while len(pairs) > 1 and pairs[-1] == "0-0":
+        pairs.pop()
+
+    return " ".join(pairs)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from ..structures import TennisDataFrame
+from .import_notion_csv import get_notion_tournaments_config, resolve_file_paths, get_tdf_row_from_df_row, expand_normalized_scores, check_if_admittable_player, assign_player_ids, assign_log_likelihood_weights, set_categorical_dtypes
+
+
+def stream_notion_csv (*file_paths: Tuple[str], chunksize: int = 10000) -> Iterator[TennisDataFrame]:
+    """
+    Import Notion CSV files chunk by chunk, as a stream of TennisDataFrames.
+
+    Description:
+        Files are read with pd.read_csv(chunksize=chunksize), so the memory used does not depend on
+        the size of the files. Each chunk is parsed, then its player IDs and log likelihood weights
+        are assigned: player IDs through a map from names to IDs built incrementally, and weights
+        from the most recent date, found by a first (light) pass over the files.
+
+        Concatenating the chunks gives the same TennisDataFrame as import_notion_csv, except for the
+        player IDs of invalid rows: a player seen only in later chunks is still unknown (-1). The
+        categories of categorical columns are those of each chunk. To build a
+        TennisUniverse without holding the whole TennisDataFrame in memory, see
+        TennisUniverse.from_tennisDataFrame_chunks.
+
+    Args:
+        *file_paths : Tuple[str]
+            File paths to import. Notation with '*' is supported. See import_notion_csv.
+        chunksize : int = 10000
+            Number of CSV rows per chunk.
+
+    Yields:
+        tdf : TennisDataFrame
+            TennisDataFrame of the next chunk.
+    """
+
+    # resolve file paths
+    file_paths = resolve_file_paths(file_paths)
+
+    # First pass, on players and tournaments only
+    most_recent_date = get_most_recent_date(file_paths, chunksize)
+
+    # Second pass, chunk by chunk
+    name_to_id_dict = {}
+    n_matches = 0
+    for file_path in file_paths:
+        for df in pd.read_csv(file_path, chunksize=chunksize):
+
+            assert len(df.columns) == 6, "Notion CSV file must have 6 columns: id, Teams, Players A, Players B, Score, Tournament"
+            df.columns = ["id", "Teams", "Players A", "Players B", "Score", "Tournament"]
+            if len(df) == 0:
+                continue
+
+            # Parse DataFrame to TennisDataFrame, row-by-row
+            tdf = expand_normalized_scores(df.apply(get_tdf_row_from_df_row, axis=1).reset_index(drop=True))
+            tdf['id_match'] = np.arange(n_matches, n_matches + len(tdf))
+            tdf['file_path'] = file_path
+            tdf['file_name'] = str(Path(file_path).name)
+            n_matches += len(tdf)
+
+            # Assign the rest of the TennisDataFrame columns
+            assign_player_ids(tdf, name_to_id_dict)
+            assign_log_likelihood_weights(tdf, most_recent_date)
+            set_categorical_dtypes(tdf)
+
+            yield tdf
+
+
+def get_most_recent_date (file_paths: list[str], chunksize: int = 10000) -> datetime:
+    """
+    Get the most recent match date of Notion CSV files, reading only the players and tournament columns.
+
+    Description:
+        As in import_notion_csv, the date of a match is known when its players are admittable and its
+        tournament is recognized.
+
+    Args:
+        file_paths : list[str]
+            Resolved file paths.
+        chunksize : int = 10000
+            Number of CSV rows per chunk.
+
+    Returns:
+        most_recent_date : datetime
+            The most recent date. NaT if no date is known.
+    """
+
+    tournament_dates = {
+        tournament: datetime.strptime(reference_date, '%b %Y')
+        for tournament, reference_date in get_notion_tournaments_config()['reference_date'].items()
+    }
+
+    def get_date (players_teamA: str, players_teamB: str, tournament: str) -> Optional[datetime]:
+        if not isinstance(players_teamA, str) or not isinstance(players_teamB, str):
+            return None
+        players_teamA, players_teamB = players_teamA.split(", "), players_teamB.split(", ")
+        if len(players_teamA) != len(players_teamB) or len(players_teamA) not in [1, 2]:
+            return None
+        if not all(check_if_admittable_player(player) for player in players_teamA + players_teamB):
+            return None
+        return tournament_dates.get(tournament)
+
+    most_recent_date = pd.NaT
+    for file_path in file_paths:
+        for df in pd.read_csv(file_path, usecols=[2, 3, 5], chunksize=chunksize):
+            for players_teamA, players_teamB, tournament in df.itertuples(index=False):
+                date = get_date(players_teamA, players_teamB, tournament)
+                if date is not None and (most_recent_date is pd.NaT or date > most_recent_date):
+                    most_recent_date = date
+
+    return most_recent_date
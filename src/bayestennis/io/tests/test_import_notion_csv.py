@@ -3,6 +3,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
 from bayestennis.io import import_notion_csv
 import pandas as pd
+import tempfile
 
 
 def main():
@@ -13,6 +14,18 @@ def main():
 
     tdf = import_notion_csv(file_path)
 
+    # Import cache: the first import fills the cache, the second one reads it
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tdf_cache_miss = import_notion_csv(file_path, cache_dir=cache_dir)
+        tdf_cache_hit = import_notion_csv(file_path, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(tdf_cache_miss, tdf)
+        pd.testing.assert_frame_equal(tdf_cache_hit, tdf)
+
+    # Parallel import: same result as the serial one, whatever the order of completion
+    tdf_serial = import_notion_csv(file_path, file_path, file_path)
+    tdf_parallel = import_notion_csv(file_path, file_path, file_path, n_workers=3)
+    pd.testing.assert_frame_equal(tdf_parallel, tdf_serial)
+
     BREAKPOINT_ME = 0
 
 
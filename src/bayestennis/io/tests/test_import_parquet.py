@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.io import import_notion_csv, import_parquet, import_arrow_ipc
+from bayestennis.io.import_notion_csv import get_score_as_list
+from bayestennis.structures import SCORE_COLUMNS, as_score_array
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import tempfile
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parent / "notion_database_example.csv")
+
+    # Match log with the matches of the Notion CSV file whose tournament and score are readable
+    tdf_notion = import_notion_csv(file_path)
+    def try_get_score_as_list (score):
+        try:
+            return get_score_as_list(score)
+        except Exception:
+            return None
+    scores = tdf_notion['score_AvsB_str'].map(try_get_score_as_list)
+    tdf_notion = tdf_notion[tdf_notion['date'].notna() & scores.notna()].reset_index(drop=True)
+    scores = np.array([score + [0] * (len(SCORE_COLUMNS) - len(score)) for score in scores.dropna()], dtype=np.int16)
+    match_log = pd.DataFrame({
+        'id': tdf_notion['id_match_within_file'],
+        'teamA_player1': tdf_notion['teamA_player1_name'].astype(object),
+        'teamA_player2': tdf_notion['teamA_player2_name'].astype(object),
+        'teamB_player1': tdf_notion['teamB_player1_name'].astype(object),
+        'teamB_player2': tdf_notion['teamB_player2_name'].astype(object),
+        'tournament': tdf_notion['tournament'].astype(str),
+        'date': tdf_notion['date'],
+        'scoring_system': tdf_notion['scoring_system'].astype(str),
+        **{column: scores[:, i_column] for i_column, column in enumerate(SCORE_COLUMNS)},
+    })
+
+    columns = [column for column in tdf_notion.columns if column not in ['id_match', 'file_name', 'file_path']]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        parquet_path = str(Path(tmp_dir) / "matches.parquet")
+        ipc_path = str(Path(tmp_dir) / "matches.arrow")
+        match_log.to_parquet(parquet_path, row_group_size=20)
+        match_log.to_feather(ipc_path)
+
+        # Same TennisDataFrame as the Notion importer
+        for tdf in [import_parquet(parquet_path), import_arrow_ipc(ipc_path)]:
+            assert (tdf['file_path'] == tdf['file_path'][0]).all()
+            pd.testing.assert_frame_equal(tdf[columns].astype(tdf_notion[columns].dtypes.to_dict()), tdf_notion[columns])
+
+        # Date range: only the matches in the range
+        date_range = (datetime(2023, 1, 1), datetime(2023, 12, 31))
+        is_in_range = (match_log['date'] >= date_range[0]) & (match_log['date'] <= date_range[1])
+        assert 0 < is_in_range.sum() < len(match_log)
+        for tdf in [import_parquet(parquet_path, date_range=date_range), import_arrow_ipc(ipc_path, date_range=date_range)]:
+            assert tdf['id_match_within_file'].tolist() == match_log['id'][is_in_range].tolist()
+        tdf = import_parquet(parquet_path, date_range=(None, date_range[0]))
+        assert tdf['id_match_within_file'].tolist() == match_log['id'][match_log['date'] <= date_range[0]].tolist()
+
+        # Invalid matches: same error messages as the Notion importer
+        invalid_log = match_log.iloc[[0, 0, 0, 0]].reset_index(drop=True)
+        invalid_log.loc[0, SCORE_COLUMNS[:4]] = [6, 5, 6, 1]
+        invalid_log.loc[1, 'teamB_player1'] = 'Boh'
+        invalid_log.loc[2, 'teamA_player2'] = 'Pardi Marco'
+        invalid_log.loc[3, 'scoring_system'] = 'Wimbledon'
+        invalid_log.to_parquet(parquet_path)
+        tdf = import_parquet(parquet_path)
+        assert not tdf['is_valid'].any()
+        assert (tdf[SCORE_COLUMNS] == 0).all().all()
+        assert tdf['error_msg'].tolist() == [
+            "Score '6-5 6-1' is not admittable for the scoring system 'MrDodo'",
+            "Players name not admittable: ['Boh']",
+            "Strange number of players. Is it a single or a double match?",
+            "Scoring system not recognized: Wimbledon",
+        ]
+
+    # Scores are cast to int8 with a range check, instead of wrapping around
+    assert as_score_array(np.array([[6, 1, 127]])).dtype == np.int8
+    try:
+        as_score_array(np.array([[6, 1, 0], [6, 300, 0]]))
+        raise AssertionError("a score out of the int8 range should raise ValueError")
+    except ValueError:
+        pass
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
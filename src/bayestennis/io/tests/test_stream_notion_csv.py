@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.io import import_notion_csv, stream_notion_csv
+from bayestennis.TennisUniverse import TennisUniverse
+import pandas as pd
+import torch
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parent / "notion_database_example.csv")
+
+    tdf = import_notion_csv(file_path, file_path)
+
+    # Concatenated chunks: same TennisDataFrame as the full import (player IDs may differ on invalid rows only)
+    tdf_chunks = list(stream_notion_csv(file_path, file_path, chunksize=50))
+    tdf_streamed = pd.concat(tdf_chunks, ignore_index=True).astype(tdf.dtypes.to_dict())  # categories differ by chunk
+    pd.testing.assert_frame_equal(tdf_streamed[tdf_streamed['is_valid']], tdf[tdf['is_valid']])
+    pd.testing.assert_series_equal(tdf_streamed['error_msg'], tdf['error_msg'])
+
+    # TennisUniverse built chunk by chunk: same players and loss tensors
+    tu = TennisUniverse(tdf)
+    tu_streamed = TennisUniverse.from_tennisDataFrame_chunks(stream_notion_csv(file_path, file_path, chunksize=50))
+    pd.testing.assert_frame_equal(tu_streamed.playersDataFrame, tu.playersDataFrame)
+    for scoring_system_name, logLikelihoodTerm in tu.loss.logLikelihoodTerms.items():
+        logLikelihoodTerm_streamed = tu_streamed.loss.logLikelihoodTerms[scoring_system_name]
+        assert torch.equal(logLikelihoodTerm_streamed.score_tensor, logLikelihoodTerm.score_tensor)
+        assert torch.equal(logLikelihoodTerm_streamed.player_indices_tensor, logLikelihoodTerm.player_indices_tensor)
+        assert torch.equal(logLikelihoodTerm_streamed.weights_tensor, logLikelihoodTerm.weights_tensor)
+
+    # No chunk: no matches
+    try:
+        TennisUniverse.from_tennisDataFrame_chunks(iter([]))
+        raise AssertionError("an empty stream of chunks should raise ValueError")
+    except ValueError:
+        pass
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,495 @@
+import numpy as np
+import torch
+from itertools import combinations
+from scipy.optimize import linear_sum_assignment
+from typing import Callable, Optional, Tuple
+from .scoring_systems.base import ScoringSystem
+
+
+# Largest number of players for which balanced_doubles_exact is used (155925 candidate assignments)
+MAX_PLAYERS_EXACT_DOUBLES = 12
+
+
+def get_doubles_unbalance_function (scoring_system: ScoringSystem) -> Callable[[torch.Tensor], torch.Tensor]:
+    """
+    Get the function measuring the unbalance |P(team A wins) - 0.5| of a match, given the
+    difference between the abilities of team A and team B.
+
+    Description:
+        A team ability is the mean of its players abilities (see prob_teamA_wins_point), so the
+        probability of a double match depends only on the difference d between team abilities,
+        and it is the same as the probability of a single match with abilities [d, 0].
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system of the matches.
+
+    Returns:
+        unbalance : Callable[[torch.Tensor], torch.Tensor]
+            Function mapping team ability differences (n_matches,) to unbalances (n_matches,).
+    """
+
+    def unbalance (ability_difference: torch.Tensor) -> torch.Tensor:
+        abilities = torch.stack([ability_difference, torch.zeros_like(ability_difference)], dim=-1)
+        return (scoring_system.prob_teamA_wins(abilities) - 0.5).abs()
+
+    return unbalance
+
+
+def enumerate_doubles_assignments (n_players: int) -> np.ndarray:
+    """
+    Enumerate all the ways to split n_players players into double matches.
+
+    Description:
+        Assignments are built court by court, vectorized over partial assignments: the first
+        remaining player is always placed in team A of the next court, with one of the remaining
+        players as partner, against two of the others. Assignments differing only by the order of
+        courts, of teams or of players within a team are enumerated once.
+
+    Args:
+        n_players : int
+            Number of players. Must be a multiple of 4.
+
+    Returns:
+        assignments : np.ndarray[int] (n_assignments, n_courts, 4)
+            assignments[i, c] = [teamA_player1, teamA_player2, teamB_player1, teamB_player2] are the
+            players indices on court c in the i-th assignment.
+    """
+
+    if n_players % 4 != 0:
+        raise ValueError("n_players must be a multiple of 4")
+
+    assignments = np.empty((1, 0, 4), dtype=int)
+    remaining = np.arange(n_players)[None, :]
+    while remaining.shape[1] > 0:
+
+        # Patterns of positions within the remaining players: 3 players join the first one
+        n_remaining = remaining.shape[1]
+        patterns, complements = [], []
+        for x, y, z in combinations(range(1, n_remaining), 3):
+            complement = [i for i in range(1, n_remaining) if i not in (x, y, z)]
+            for pattern in [(0, x, y, z), (0, y, x, z), (0, z, x, y)]:
+                patterns.append(pattern)
+                complements.append(complement)
+        patterns = np.array(patterns, dtype=int)
+        complements = np.array(complements, dtype=int).reshape(len(patterns), n_remaining-4)
+
+        # Extend all partial assignments with all patterns
+        n_partial, n_patterns = assignments.shape[0], patterns.shape[0]
+        new_courts = remaining[:, patterns]  # (n_partial, n_patterns, 4)
+        assignments = np.concatenate([
+            np.repeat(assignments, n_patterns, axis=0),
+            new_courts.reshape(n_partial*n_patterns, 1, 4)
+        ], axis=1)
+        remaining = remaining[:, complements].reshape(n_partial*n_patterns, n_remaining-4)
+
+    return assignments
+
+
+def balanced_doubles_exact (scoring_system: ScoringSystem, abilities: torch.Tensor) -> np.ndarray:
+    """
+    Find the most balanced double matches by exact enumeration.
+
+    Description:
+        The unbalance of every possible match (a, b vs c, d) is computed once, in a single vectorized
+        call of scoring_system.prob_teamA_wins. All the assignments are then scored by table lookups.
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system of the matches.
+        abilities : torch.Tensor[torch.float] (n_players,)
+            Abilities of the players. n_players must be a multiple of 4.
+
+    Returns:
+        assignment : np.ndarray[int] (n_courts, 4)
+            The assignment minimizing the total unbalance. See enumerate_doubles_assignments.
+    """
+
+    n_players = abilities.shape[0]
+    unbalance = get_doubles_unbalance_function(scoring_system)
+
+    # Unbalance of every match (a, b vs c, d), as a (n_players, n_players, n_players, n_players) table
+    team_abilities = (abilities[:, None] + abilities[None, :]) / 2
+    ability_difference = team_abilities[:, :, None, None] - team_abilities[None, None, :, :]
+    unbalance_table = unbalance(ability_difference.reshape(-1)).reshape(ability_difference.shape).cpu().numpy()
+
+    # Total unbalance of every assignment
+    assignments = enumerate_doubles_assignments(n_players)
+    total_unbalance = unbalance_table[assignments[..., 0], assignments[..., 1], assignments[..., 2], assignments[..., 3]].sum(axis=1)
+
+    return assignments[np.argmin(total_unbalance)]
+
+
+def balanced_doubles_local_search (scoring_system: ScoringSystem, abilities: torch.Tensor, max_iter: int = 1000, tol: float = 1e-6) -> np.ndarray:
+    """
+    Find balanced double matches with a fast heuristic.
+
+    Description:
+        Players are sorted by ability and grouped by 4, the strongest and the weakest of each group
+        playing against the two middle ones. The assignment is then improved by local search, with two
+        kinds of moves: swapping two players, and swapping two teams between courts. At each iteration
+        the total unbalance change of every move is evaluated at once, and the best improving moves
+        involving distinct courts are applied. The search stops when no move improves the total
+        unbalance by more than tol, or after max_iter iterations.
+        Since the unbalance depends only on the team ability difference, it is tabulated once with
+        scoring_system.prob_teamA_wins on a fine grid, and linearly interpolated during the search.
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system of the matches.
+        abilities : torch.Tensor[torch.float] (n_players,)
+            Abilities of the players. n_players must be a multiple of 4.
+        max_iter : int = 1000
+            Maximum number of local search iterations.
+        tol : float = 1e-6
+            Minimum improvement of the total unbalance to continue the search.
+
+    Returns:
+        assignment : np.ndarray[int] (n_courts, 4)
+            The assignment found. See enumerate_doubles_assignments.
+    """
+
+    n_players = abilities.shape[0]
+    if n_players % 4 != 0:
+        raise ValueError("n_players must be a multiple of 4")
+    n_courts = n_players // 4
+    device = abilities.device
+    abilities = abilities.double()  # Team ability sums are updated incrementally: avoid float32 rounding
+
+    # Tabulate the unbalance on a grid of ability differences covering all the possible matches
+    n_grid = 4097
+    max_difference = float(abilities.max() - abilities.min()) + 1e-3
+    grid_step = 2 * max_difference / (n_grid - 1)
+    unbalance_grid = get_doubles_unbalance_function(scoring_system)(torch.linspace(-max_difference, max_difference, n_grid, device=device)).double()
+
+    def unbalance (ability_difference: torch.Tensor) -> torch.Tensor:
+        x = ((ability_difference + max_difference) / grid_step).clamp(0, n_grid - 1.001)
+        idx = x.long()
+        return torch.lerp(unbalance_grid[idx], unbalance_grid[idx+1], x - idx)
+
+    # Initial assignment: [strongest, weakest] vs [middle, middle], for each group of 4
+    order = torch.argsort(abilities, descending=True).reshape(n_courts, 4)
+    slots = order[:, [0, 3, 1, 2]].reshape(-1)  # slots[4*c + k] = player in position k on court c
+
+    # Every move transfers an ability amount delta from a team u to a team v, where team 2*c + t is
+    # team t (0 = A, 1 = B) of court c. Moves of player slots i < j, then moves of teams u < v.
+    slot_i, slot_j = torch.triu_indices(n_players, n_players, offset=1, device=device)
+    team_u, team_v = torch.triu_indices(2*n_courts, 2*n_courts, offset=1, device=device)
+    move_u = torch.cat([slot_i // 2, team_u])
+    move_v = torch.cat([slot_j // 2, team_v])
+    n_player_moves = slot_i.shape[0]
+    court_u, court_v = move_u // 2, move_v // 2
+    sign_u, sign_v = 1. - 2. * (move_u % 2), 1. - 2. * (move_v % 2)
+    is_same_court = (court_u == court_v)
+
+    for _ in range(max_iter):
+
+        # Current state
+        slot_abilities = abilities[slots]
+        team_abilities = slot_abilities.reshape(2*n_courts, 2).sum(dim=1)
+        ability_difference = (team_abilities[0::2] - team_abilities[1::2]) / 2
+        court_unbalance = unbalance(ability_difference)
+
+        # Total unbalance change of every move
+        delta = torch.cat([
+            slot_abilities[slot_j] - slot_abilities[slot_i],
+            team_abilities[team_v] - team_abilities[team_u]
+        ])
+        new_difference_u = ability_difference[court_u] + sign_u * delta / 2
+        new_difference_v = ability_difference[court_v] - sign_v * delta / 2
+        new_difference_same_court = ability_difference[court_u] + (sign_u - sign_v) * delta / 2
+        gain = torch.where(
+            is_same_court,
+            unbalance(new_difference_same_court) - court_unbalance[court_u],
+            unbalance(new_difference_u) + unbalance(new_difference_v) - court_unbalance[court_u] - court_unbalance[court_v]
+        )
+
+        # Apply the best improving moves, on distinct courts
+        idx_improving = torch.nonzero(gain < -tol).reshape(-1)
+        if idx_improving.shape[0] == 0:
+            break
+        idx_improving = idx_improving[torch.argsort(gain[idx_improving])][:n_players]
+        used_courts = set()
+        slots = slots.reshape(2*n_courts, 2).clone()
+        for idx_move in idx_improving.tolist():
+            courts = {int(court_u[idx_move]), int(court_v[idx_move])}
+            if used_courts & courts:
+                continue
+            used_courts |= courts
+            if idx_move < n_player_moves:
+                i, j = int(slot_i[idx_move]), int(slot_j[idx_move])
+                slots[i//2, i%2], slots[j//2, j%2] = slots[j//2, j%2].clone(), slots[i//2, i%2].clone()
+            else:
+                u, v = int(move_u[idx_move]), int(move_v[idx_move])
+                slots[[u, v]] = slots[[v, u]]
+            if len(used_courts) >= n_courts - 1:
+                break
+        slots = slots.reshape(-1)
+
+    return slots.reshape(n_courts, 4).cpu().numpy()
+
+
+def min_weight_perfect_matching (cost: np.ndarray, max_iter_2opt: int = 100) -> np.ndarray:
+    """
+    Pair up nodes, approximately minimizing the total cost of the pairs.
+
+    Description:
+        The assignment problem on the symmetric cost matrix (with forbidden self-assignments) is
+        solved with the Hungarian algorithm (scipy linear_sum_assignment). Its solution is a
+        permutation, i.e. a set of cycles: 2-cycles are pairs; even cycles are split into the
+        cheaper of their two alternating matchings; odd cycles are split leaving out the node which
+        gives the cheapest alternating matching. Left-out nodes are matched again in the same way,
+        until all nodes are paired. Every round costs O(n^3) at most, instead of enumerating matchings.
+        The matching is finally refined by 2-opt: for every two pairs (a, b), (c, d), the re-pairings
+        (a, c), (b, d) and (a, d), (b, c) are evaluated at once, and the best improving ones applied.
+
+    Args:
+        cost : np.ndarray (n_nodes, n_nodes)
+            Symmetric cost matrix. n_nodes must be even.
+        max_iter_2opt : int = 100
+            Maximum number of 2-opt iterations.
+
+    Returns:
+        pairs : np.ndarray[int] (n_nodes // 2, 2)
+            The pairs of node indices.
+    """
+
+    n_nodes = cost.shape[0]
+    if n_nodes % 2 != 0:
+        raise ValueError("The number of nodes must be even")
+
+    forbidden_cost = 2 * np.abs(cost).max() * n_nodes + 1
+    pairs = []
+    remaining = np.arange(n_nodes)
+    while remaining.size > 0:
+
+        # Assignment problem on the remaining nodes
+        sub_cost = cost[np.ix_(remaining, remaining)].astype(float)
+        np.fill_diagonal(sub_cost, forbidden_cost)
+        _, successor = linear_sum_assignment(sub_cost)
+
+        # Split the cycles of the permutation into pairs
+        is_visited = np.zeros(remaining.size, dtype=bool)
+        left_out = []
+        for start in range(remaining.size):
+            if is_visited[start]:
+                continue
+            cycle = [start]
+            is_visited[start] = True
+            while not is_visited[successor[cycle[-1]]]:
+                cycle.append(successor[cycle[-1]])
+                is_visited[cycle[-1]] = True
+            # Candidate alternating matchings: for each rotation of the cycle, pair consecutive nodes
+            n_rotations = 2 if len(cycle) % 2 == 0 else len(cycle)
+            best_pairs, best_cost = None, np.inf
+            for rotation in range(n_rotations):
+                rotated = cycle[rotation:] + cycle[:rotation]
+                candidate_pairs = [(rotated[i], rotated[i+1]) for i in range(0, len(rotated)-1, 2)]
+                candidate_cost = sum(sub_cost[i, j] for i, j in candidate_pairs)
+                if candidate_cost < best_cost:
+                    best_pairs, best_cost = candidate_pairs, candidate_cost
+                    best_left_out = rotated[-1] if len(cycle) % 2 == 1 else None
+            pairs += [(remaining[i], remaining[j]) for i, j in best_pairs]
+            if best_left_out is not None:
+                left_out.append(best_left_out)
+
+        remaining = remaining[np.array(left_out, dtype=int)]
+
+    # 2-opt refinement
+    pairs = np.array(pairs, dtype=int).reshape(-1, 2)
+    for _ in range(max_iter_2opt):
+        a, b = pairs[:, 0], pairs[:, 1]
+        pair_cost = cost[a, b]
+        cost_ac_bd = cost[a[:, None], a[None, :]] + cost[b[:, None], b[None, :]]
+        cost_ad_bc = cost[a[:, None], b[None, :]] + cost[b[:, None], a[None, :]]
+        gain = np.triu(np.minimum(cost_ac_bd, cost_ad_bc) - pair_cost[:, None] - pair_cost[None, :], k=1)
+        idx_p, idx_q = np.nonzero(gain < -1e-9 * (1 + np.abs(pair_cost).max()))
+        if idx_p.size == 0:
+            break
+        is_used = np.zeros(pairs.shape[0], dtype=bool)
+        for p, q in zip(idx_p[np.argsort(gain[idx_p, idx_q])], idx_q[np.argsort(gain[idx_p, idx_q])]):
+            if is_used[p] or is_used[q]:
+                continue
+            is_used[p] = is_used[q] = True
+            if cost_ac_bd[p, q] <= cost_ad_bc[p, q]:
+                pairs[p], pairs[q] = (a[p], a[q]), (b[p], b[q])
+            else:
+                pairs[p], pairs[q] = (a[p], b[q]), (b[p], a[q])
+
+    return pairs
+
+
+def get_swiss_standings (n_players: int, results: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute Swiss standings from the results of the previous rounds.
+
+    Args:
+        n_players : int
+            Number of players.
+        results : np.ndarray[int] (n_results, 2)
+            Results of the previous rounds, as [winner, loser] player indices. A bye is recorded as
+            [player, -1] and counts as a win.
+
+    Returns:
+        points : np.ndarray[int] (n_players,)
+            Matches won (byes included) by each player.
+        buchholz : np.ndarray[int] (n_players,)
+            Sum of the points of the opponents of each player (byes excluded).
+        has_played : np.ndarray[bool] (n_players, n_players)
+            has_played[i, j] is True if players i and j already played each other.
+    """
+
+    results = np.asarray(results, dtype=int).reshape(-1, 2)
+    winner, loser = results[:, 0], results[:, 1]
+    is_match = (loser >= 0)
+
+    points = np.bincount(winner, minlength=n_players)
+    has_played = np.zeros((n_players, n_players), dtype=bool)
+    has_played[winner[is_match], loser[is_match]] = True
+    has_played[loser[is_match], winner[is_match]] = True
+    buchholz = has_played.astype(int) @ points
+
+    return points, buchholz, has_played
+
+
+def swiss_pairings (
+        points: np.ndarray,
+        abilities: np.ndarray,
+        has_played: np.ndarray,
+        has_had_bye: Optional[np.ndarray] = None,
+        points_weight: float = 100.,
+        rematch_penalty: float = 1e6
+    ) -> Tuple[np.ndarray, int]:
+    """
+    Pair the players of the next Swiss round.
+
+    Description:
+        If the number of players is odd, the bye goes to the lowest-standing player (by points, then
+        ability) without a previous bye. The other players are paired by min_weight_perfect_matching,
+        with cost between players i and j:
+            points_weight * (points_i - points_j)^2 + ((a_i - a_j) / std(a))^2 + rematch_penalty * has_played_ij
+        so that players with the same standing and similar abilities meet, and rematches are avoided
+        whenever possible.
+
+    Args:
+        points : np.ndarray (n_players,)
+            Current points of each player.
+        abilities : np.ndarray (n_players,)
+            Abilities of each player.
+        has_played : np.ndarray[bool] (n_players, n_players)
+            has_played[i, j] is True if players i and j already played each other.
+        has_had_bye : np.ndarray[bool] (n_players,) | None = None
+            Players who already had a bye. Set to None if no bye was given yet.
+        points_weight : float = 100.
+            Weight of the standing difference, relative to the normalized ability difference.
+        rematch_penalty : float = 1e6
+            Cost of a rematch.
+
+    Returns:
+        pairs : np.ndarray[int] (n_players // 2, 2)
+            Player indices of each match, the higher-standing player first.
+        idx_bye : int
+            Index of the player receiving the bye, or -1 if the number of players is even.
+    """
+
+    points = np.asarray(points, dtype=float)
+    abilities = np.asarray(abilities, dtype=float)
+    n_players = points.shape[0]
+    if has_had_bye is None:
+        has_had_bye = np.zeros(n_players, dtype=bool)
+
+    # Bye
+    order = np.lexsort((abilities, points))  # from the lowest to the highest standing
+    idx_bye = -1
+    if n_players % 2 == 1:
+        candidates = order[~has_had_bye[order]]
+        idx_bye = int(candidates[0]) if candidates.size > 0 else int(order[0])
+    is_paired = np.arange(n_players) != idx_bye
+    idx_paired = np.flatnonzero(is_paired)
+
+    # Cost matrix and matching
+    ability_scale = abilities.std() if abilities.std() > 0 else 1.
+    cost = \
+        points_weight * (points[:, None] - points[None, :])**2 + \
+        ((abilities[:, None] - abilities[None, :]) / ability_scale)**2 + \
+        rematch_penalty * has_played
+    pairs = idx_paired[min_weight_perfect_matching(cost[np.ix_(idx_paired, idx_paired)])]
+
+    # Higher-standing player first, matches sorted by standing
+    rank = np.empty(n_players, dtype=int)
+    rank[order[::-1]] = np.arange(n_players)
+    pairs = np.where((rank[pairs[:, 0]] <= rank[pairs[:, 1]])[:, None], pairs, pairs[:, ::-1])
+    pairs = pairs[np.argsort(rank[pairs[:, 0]])]
+
+    return pairs, idx_bye
+
+
+def simulate_swiss (
+        scoring_system: ScoringSystem,
+        abilities: torch.Tensor,
+        n_rounds: int,
+        n_simulations: int = 100,
+        results: Optional[np.ndarray] = None,
+        generator: Optional[torch.Generator] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate the remaining rounds of a Swiss event.
+
+    Description:
+        The win probabilities of all the possible matches are computed once, in a single call of
+        scoring_system.prob_teamA_wins. Each simulation then pairs every round with swiss_pairings
+        and draws the winners. Final standings are ordered by points, then Buchholz, then draw.
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system of the matches.
+        abilities : torch.Tensor[torch.float] (n_players,)
+            Abilities of the players.
+        n_rounds : int
+            Number of rounds still to be played.
+        n_simulations : int = 100
+            Number of simulations.
+        results : np.ndarray[int] (n_results, 2) | None = None
+            Results of the rounds already played. See get_swiss_standings.
+        generator : torch.Generator | None = None
+            Random number generator used for sampling.
+
+    Returns:
+        positions : np.ndarray[int] (n_simulations, n_players)
+            positions[s, i] is the final position (0 = first) of the i-th player in the s-th simulation.
+        points : np.ndarray[int] (n_simulations, n_players)
+            points[s, i] is the final number of points of the i-th player in the s-th simulation.
+    """
+
+    n_players = abilities.shape[0]
+    results = np.empty((0, 2), dtype=int) if results is None else np.asarray(results, dtype=int).reshape(-1, 2)
+
+    # Win probabilities of all the possible matches
+    abilities_pairs = torch.stack(torch.broadcast_tensors(abilities[:, None], abilities[None, :]), dim=-1).reshape(-1, 2)
+    p_teamA_wins = scoring_system.prob_teamA_wins(abilities_pairs).reshape(n_players, n_players).cpu().numpy()
+    abilities = abilities.cpu().numpy()
+
+    # Random numbers for all simulations: match outcomes and final draws
+    u_outcomes = torch.rand((n_simulations, n_rounds, n_players // 2), generator=generator).numpy()
+    u_draw = torch.rand((n_simulations, n_players), generator=generator).numpy()
+
+    positions = np.empty((n_simulations, n_players), dtype=int)
+    final_points = np.empty((n_simulations, n_players), dtype=int)
+    for i_simulation in range(n_simulations):
+        simulation_results = [results]
+        for i_round in range(n_rounds):
+            all_results = np.concatenate(simulation_results)
+            points, _, has_played = get_swiss_standings(n_players, all_results)
+            has_had_bye = np.bincount(all_results[all_results[:, 1] < 0, 0], minlength=n_players) > 0
+            pairs, idx_bye = swiss_pairings(points, abilities, has_played, has_had_bye)
+            has_first_won = u_outcomes[i_simulation, i_round, :pairs.shape[0]] < p_teamA_wins[pairs[:, 0], pairs[:, 1]]
+            round_results = np.where(has_first_won[:, None], pairs, pairs[:, ::-1])
+            if idx_bye >= 0:
+                round_results = np.concatenate([round_results, [[idx_bye, -1]]])
+            simulation_results.append(round_results)
+        points, buchholz, _ = get_swiss_standings(n_players, np.concatenate(simulation_results))
+        order = np.lexsort((u_draw[i_simulation], -buchholz, -points))
+        positions[i_simulation, order] = np.arange(n_players)
+        final_points[i_simulation] = points
+
+    return positions, final_points
@@ -1,6 +1,8 @@
-from typing import Sequence, Union
+from typing import Optional, Sequence, Tuple, Union
+import numpy as np
 import torch
 from .base import BasicScoreBlock, prob_teamA_wins_point, ScoringSystem
+from . import numpy_backend
 from ..utils import as_torch_tensor, as_2dim_tensor
 
 
@@ -11,6 +13,8 @@ class Toringo (ScoringSystem):
     Attributes:
         device : torch.device
             Device to store tensors on.
+        backend : str
+            Backend of prob_teamA_wins: 'torch' or 'numpy'.
         n_score_elements : int
             Number of elements in a score.
         game : BasicScoreBlock(score_end=4)
@@ -27,21 +31,36 @@ class Toringo (ScoringSystem):
     Methods:
         to(device)
         process_score(score)
+        process_scores(scores)
         prob_this_score(score, abilities)
+        get_score_coefficients(score)
+        get_unit_blocks()
         prob_teamA_wins(abilities)
+        sample_score(abilities, n_samples=1, generator=None)
+        count_sets_and_games(score)
     """
 
 
-    def __init__ (self, device: torch.device = torch.device("cpu")) -> None:
+    def __init__ (self, device: torch.device = torch.device("cpu"), backend: str = 'torch') -> None:
         """
         Toringo scoring system.
 
         Args:
             device : torch.device = torch.device("cpu")
                 Device to store tensors on. Defaults to CPU.
+            backend : str = 'torch'
+                Backend of prob_teamA_wins:
+                    - 'torch': torch tensors, differentiable
+                    - 'numpy': NumPy arrays (float64), for inference. See numpy_backend
+                The other methods always use torch.
         """
 
+        if backend not in ['torch', 'numpy']:
+            raise ValueError("backend must be 'torch' or 'numpy'")
+
         self.device = device
+        self.backend = backend
+        self._numpy_scoring_system = numpy_backend.Toringo() if backend == 'numpy' else None
         self.n_score_elements = 6
         self.game = BasicScoreBlock(score_end=4, device=device)
         self.set_tie_break = BasicScoreBlock(score_end=7, device=device)
@@ -126,6 +145,60 @@ class Toringo (ScoringSystem):
         return False, None, None
 
 
+    def process_scores (self, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Check many scores at once. Vectorized version of process_score.
+
+        Usage example:
+            toringo = Toringo()
+            scores = np.array([[6, 1, 6, 2, 0, 0], [6, 3, 6, 7, 10, 6], [6, 5, 6, 2, 0, 0]])
+            is_valid, normalized_scores, winner_teams = toringo.process_scores(scores)
+
+        Args:
+            scores : np.ndarray[int] (n_scores, n_elements)
+                The scores to check. n_elements must be 4 (no match tie-break) or 6 (with match
+                tie-break, 0-0 when not played). See process_score.
+
+        Returns:
+            is_valid : np.ndarray[bool] (n_scores,)
+                True if the score is valid, False otherwise.
+            normalized_scores : np.ndarray[int] (n_scores, n_score_elements)
+                The normalized scores. Rows of invalid scores are 0.
+            winner_teams : np.ndarray[object] (n_scores,)
+                "Team A" or "Team B", or None if the score is not valid.
+        """
+
+        # Preprocess: add [0, 0] for match tie-break if not present
+        scores = np.asarray(scores, dtype=np.int64)
+        if scores.ndim != 2 or scores.shape[1] not in [4, 6]:
+            raise ValueError("scores.shape must be (n_scores, 4) or (n_scores, 6)")
+        if scores.shape[1] == 4:
+            scores = np.concatenate([scores, np.zeros((len(scores), 2), dtype=np.int64)], axis=1)
+
+        # Results: +1 (A win), -1 (B win), 0 (not valid); match tie-break: 2 (no tie break)
+        def get_result_from_score_set (a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            _max, _min = np.maximum(a, b), np.minimum(a, b)
+            is_valid = (_min >= 0) & (((_max == 6) & (_min <= 4)) | ((_max == 7) & ((_min == 5) | (_min == 6))))
+            return np.where(is_valid, np.where(a > b, 1, -1), 0)
+
+        def get_result_from_score_match_tie_break (a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            _max, _min = np.maximum(a, b), np.minimum(a, b)
+            is_valid = (_min >= 0) & (((_max == 10) & (_min <= 8)) | ((_max > 10) & (_min == _max-2)))
+            return np.where((a == 0) & (b == 0), 2, np.where(is_valid, np.where(a > b, 1, -1), 0))
+
+        set_1_result = get_result_from_score_set(scores[:, 0], scores[:, 1])
+        set_2_result = get_result_from_score_set(scores[:, 2], scores[:, 3])
+        match_tie_break_result = get_result_from_score_match_tie_break(scores[:, 4], scores[:, 5])
+
+        # Determine if the score is valid and the winner
+        is_valid = (set_1_result != 0) & (set_2_result != 0) & np.where(set_1_result == set_2_result, match_tie_break_result == 2, np.abs(match_tie_break_result) == 1)
+        has_teamA_won = np.where(set_1_result == set_2_result, set_1_result, match_tie_break_result) == 1
+        normalized_scores = np.where(is_valid[:, None], scores, 0)
+        winner_teams = np.where(is_valid, np.where(has_teamA_won, 'Team A', 'Team B'), None).astype(object)
+
+        return is_valid, normalized_scores, winner_teams
+
+
     def prob_this_score (self, score: Union[torch.Tensor, Sequence[int]], abilities: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
         """
         Compute the probability of a given score.
@@ -166,6 +239,57 @@ class Toringo (ScoringSystem):
         return p_this_score
 
 
+    def get_score_coefficients (self, score: Union[torch.Tensor, Sequence[int]]) -> torch.Tensor:
+        """
+        Get the coefficients of the log-probabilities of given scores, which depend on the scores only.
+        See ScoringSystem.get_score_coefficients. Units: game, set tie-break and point.
+
+        Args:
+            score : torch.Tensor[torch.long] (n_batches, n_score_elements)
+                The normalized scores. n_score_elements must be 6.
+
+        Returns:
+            score_coefficients : torch.Tensor[torch.float64] (n_batches, 7)
+                Log-constant, then exponents of (P, 1-P) for the game, the set tie-break and the point.
+        """
+
+        # As 2D torch tensor
+        score = as_2dim_tensor(as_torch_tensor(score, torch.long, device=self.device))
+
+        # Checks
+        if score.shape[-1] != self.n_score_elements:
+            raise Exception(f"score.shape[-1] must be {self.n_score_elements}")
+
+        # Sets: games, and set tie-break as deciding point. Match tie-break: points
+        set_1 = self.set.get_score_coefficients(score[:, 0], score[:, 1])
+        set_2 = self.set.get_score_coefficients(score[:, 2], score[:, 3])
+        match_tie_break = self.match_tie_break.get_score_coefficients(score[:, 4], score[:, 5])
+        score_coefficients = torch.stack([
+            set_1[0] + set_2[0] + match_tie_break[0],
+            set_1[1] + set_2[1],
+            set_1[2] + set_2[2],
+            set_1[3] + set_2[3],
+            set_1[4] + set_2[4],
+            match_tie_break[1],
+            match_tie_break[2],
+        ], dim=-1)
+
+        return score_coefficients
+
+
+    def get_unit_blocks (self) -> list[Optional[BasicScoreBlock]]:
+        """
+        Get the units of the log-probabilities of scores: game, set tie-break and point. See
+        ScoringSystem.get_unit_blocks.
+
+        Returns:
+            unit_blocks : list[BasicScoreBlock | None]
+                [game, set_tie_break, None].
+        """
+
+        return [self.game, self.set_tie_break, None]
+
+
     def prob_teamA_wins (self, abilities: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
         """
         Compute the probability of team A winning.
@@ -178,9 +302,12 @@ class Toringo (ScoringSystem):
 
         Returns:
             p_teamA_wins: torch.Tensor[torch.float] (n_batches,)
-                The probability of team A winning.
+                The probability of team A winning. np.ndarray[float] with backend='numpy'.
         """
 
+        if self.backend == 'numpy':
+            return self._numpy_scoring_system.prob_teamA_wins(np.asarray(abilities, dtype=np.float64))
+
         # As 2D torch tensors
         abilities = as_2dim_tensor(as_torch_tensor(abilities, torch.float, device=self.device))
 
@@ -195,6 +322,83 @@ class Toringo (ScoringSystem):
         p_teamA_wins = self.match.prob_teamA_wins(p_teamA_wins_set, p_teamA_wins_match_tie_break)
 
         return p_teamA_wins
+
+
+    def sample_score (self, abilities: Union[torch.Tensor, Sequence[float]], n_samples: int = 1, generator: Optional[torch.Generator] = None) -> torch.Tensor:
+        """
+        Sample normalized scores.
+
+        Args:
+            abilities : torch.Tensor[torch.float] (n_batches, 2) or (n_batches, 4)
+                abilities of players. The last dimension must be in [2, 4]:
+                    - 2: match type = single
+                    - 4: match type = double
+            n_samples : int = 1
+                Number of scores to sample for each batch element.
+            generator : torch.Generator | None = None
+                Random number generator used for sampling.
+
+        Returns:
+            score : torch.Tensor[torch.long] (n_samples, n_batches, n_score_elements)
+                The sampled normalized scores. See process_score method for details.
+        """
+
+        # As 2D torch tensors
+        abilities = as_2dim_tensor(as_torch_tensor(abilities, torch.float, device=self.device))
+
+        # Compute utility probabilities
+        p_teamA_wins_point = prob_teamA_wins_point(abilities)
+        p_teamA_wins_game = self.game.prob_teamA_wins(p_teamA_wins_point)
+        p_teamA_wins_set_tie_break = self.set_tie_break.prob_teamA_wins(p_teamA_wins_point)
+
+        # Sample sets, and the match tie-break (kept only if sets are split)
+        set_1_teamA, set_1_teamB = self.set.sample_score(p_teamA_wins_game, p_teamA_wins_set_tie_break, n_samples, generator)
+        set_2_teamA, set_2_teamB = self.set.sample_score(p_teamA_wins_game, p_teamA_wins_set_tie_break, n_samples, generator)
+        match_tie_break_teamA, match_tie_break_teamB = self.match_tie_break.sample_score(p_teamA_wins_point, None, n_samples, generator)
+        is_split = (set_1_teamA > set_1_teamB) != (set_2_teamA > set_2_teamB)
+        match_tie_break_teamA = match_tie_break_teamA * is_split
+        match_tie_break_teamB = match_tie_break_teamB * is_split
+
+        score = torch.stack([set_1_teamA, set_1_teamB, set_2_teamA, set_2_teamB, match_tie_break_teamA, match_tie_break_teamB], dim=-1)
+
+        return score
+
+
+    def count_sets_and_games (self, score: Union[torch.Tensor, Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Count sets and games won by each team, as used by tournament standings.
+        The match tie-break counts as one set and as one game for the team winning it.
+
+        Args:
+            score : torch.Tensor[torch.long] (..., n_score_elements)
+                Normalized scores. See process_score method for details.
+
+        Returns:
+            sets_teamA : torch.Tensor[torch.long] (...,)
+                Sets won by team A.
+            sets_teamB : torch.Tensor[torch.long] (...,)
+                Sets won by team B.
+            games_teamA : torch.Tensor[torch.long] (...,)
+                Games won by team A.
+            games_teamB : torch.Tensor[torch.long] (...,)
+                Games won by team B.
+        """
+
+        # As torch tensor
+        score = as_torch_tensor(score, torch.long, device=self.device)
+
+        # Sets and match tie-break won by each team
+        set_1_teamA = (score[..., 0] > score[..., 1]).long()
+        set_2_teamA = (score[..., 2] > score[..., 3]).long()
+        match_tie_break_teamA = (score[..., 4] > score[..., 5]).long()
+        match_tie_break_teamB = (score[..., 5] > score[..., 4]).long()
+
+        sets_teamA = set_1_teamA + set_2_teamA + match_tie_break_teamA
+        sets_teamB = (1-set_1_teamA) + (1-set_2_teamA) + match_tie_break_teamB
+        games_teamA = score[..., 0] + score[..., 2] + match_tie_break_teamA
+        games_teamB = score[..., 1] + score[..., 3] + match_tie_break_teamB
+
+        return sets_teamA, sets_teamB, games_teamA, games_teamB
     
 
     def _get_result_str_from_score_set (self, a: int, b: int) -> Union[str, None]:
@@ -253,6 +457,7 @@ class Toringo (ScoringSystem):
         list_of_str = [
             f"{self.__class__.__name__} scoring system:",
             f"  n_score_elements: {self.n_score_elements}",
+            f"  backend: {self.backend}",
             f"  Game: {repr(self.game)}",
             f"  TieBreak(Set): {repr(self.set_tie_break)}",
             f"  Set: {repr(self.set)}",
@@ -1,3 +1,8 @@
-from . import base
-from .MrDodo import MrDodo
-from .Toringo import Toringo
+from .. import _lazy
+
+# Lazy (PEP 562): the torch scoring systems are imported on first access, so that numpy_backend can
+# be used without importing torch.
+__getattr__, __dir__ = _lazy.set_lazy_attributes(__name__, ['base', 'numpy_backend'], {
+    'MrDodo': '.MrDodo',
+    'Toringo': '.Toringo',
+})
@@ -1,8 +1,14 @@
-from typing import Optional, Union, Sequence, Tuple
+from typing import Callable, Optional, Union, Sequence, Tuple
+import numpy as np
 import torch
 from scipy.special import binom
-from math import pi
-from ..utils import as_torch_tensor
+from math import pi, log
+from torch.autograd.function import once_differentiable
+from ..utils import as_torch_tensor, CompiledFunction
+from .numpy_backend import horner, get_block_polynomial_coefficients
+
+LOG_EPSILON = log(1e-40)
+"""Floor of the log-probabilities of scores: log(p + 1e-40), as in LogLikelihoodTerm."""
 
 
 def prob_teamA_wins_point (abilities: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
@@ -42,11 +48,78 @@ def prob_teamA_wins_point (abilities: Union[torch.Tensor, Sequence[float]]) -> t
         u = torch.tensor([0.5, 0.5, -0.5, -0.5], device=abilities.device)
     
     # Heuristic formula
-    p_teamA_wins_point = 0.5 + torch.atan(0.1 * abilities @ u) / pi
+    p_teamA_wins_point = prob_teamA_wins_point_from_difference(abilities @ u)
 
     return p_teamA_wins_point
 
 
+def prob_teamA_wins_point_from_difference (abilities_difference: torch.Tensor, derivatives: bool = False) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Heuristic formula of prob_teamA_wins_point, from the ability difference d = abilities @ u:
+    0.5 + atan(0.1 d) / pi.
+
+    Args:
+        abilities_difference : torch.Tensor[torch.float] (n_batches,)
+            Ability difference between team A and team B.
+        derivatives : bool = False
+            Also return the derivative with respect to the ability difference.
+
+    Returns:
+        p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
+            Probability of team A winning a point.
+        derivative : torch.Tensor[torch.float] (n_batches,)
+            Derivative of p_teamA_wins_point with respect to the ability difference. Only if
+            derivatives is True.
+    """
+
+    p_teamA_wins_point = 0.5 + torch.atan(0.1 * abilities_difference) / pi
+    if derivatives:
+        return p_teamA_wins_point, 0.1 / (pi * (1 + (0.1 * abilities_difference)**2))
+
+    return p_teamA_wins_point
+
+
+class BlockWinProbability (torch.autograd.Function):
+    """
+    Probability of team A winning a block, BasicScoreBlock.prob_teamA_wins, with the analytic
+    derivatives of the closed form (see numpy_backend.get_block_polynomial_coefficients) in the
+    backward pass. Only the two derivatives are saved for backward.
+    """
+
+    @staticmethod
+    def forward (ctx, p_teamA_wins_point: torch.Tensor, p_teamA_wins_deciding_point: torch.Tensor, block: 'BasicScoreBlock') -> torch.Tensor:
+        p_teamA_wins, derivative_point, derivative_deciding_point = block.prob_teamA_wins_closed_form(p_teamA_wins_point, p_teamA_wins_deciding_point, derivatives=True)
+        ctx.save_for_backward(derivative_point, derivative_deciding_point)
+        return p_teamA_wins
+
+    @staticmethod
+    @once_differentiable
+    def backward (ctx, grad_output: torch.Tensor):
+        derivative_point, derivative_deciding_point = ctx.saved_tensors
+        return grad_output * derivative_point, grad_output * derivative_deciding_point, None
+
+
+class ScoreLogLikelihood (torch.autograd.Function):
+    """
+    Log-probabilities of the scores of a scoring system from the ability differences,
+    ScoringSystem.log_prob_from_score_coefficients_closed_form, as a single autograd node. The derivative with
+    respect to the ability differences is computed in the same pass as the forward, and it is the
+    only tensor saved for backward.
+    """
+
+    @staticmethod
+    def forward (ctx, abilities_difference: torch.Tensor, score_coefficients: torch.Tensor, scoring_system: 'ScoringSystem') -> torch.Tensor:
+        log_p_this_score, derivative = scoring_system.get_log_prob_closed_form()(score_coefficients, abilities_difference, derivatives=True)
+        ctx.save_for_backward(derivative)
+        return log_p_this_score
+
+    @staticmethod
+    @once_differentiable
+    def backward (ctx, grad_output: torch.Tensor):
+        derivative, = ctx.saved_tensors
+        return grad_output * derivative, None, None
+
+
 class BasicScoreBlock:
     """
     Basic score block representation for probability calculations
@@ -62,7 +135,9 @@ class BasicScoreBlock:
     Methods:
         to(device)
         prob_this_score(score_teamA, score_teamB, p_teamA_wins_point, p_teamA_wins_deciding_point=None)
+        get_score_coefficients(score_teamA, score_teamB)
         prob_teamA_wins(p_teamA_wins_point, p_teamA_wins_deciding_point=None)
+        prob_teamA_wins_closed_form(p_teamA_wins_point, p_teamA_wins_deciding_point, derivatives=False)
         prob_teamA_wins_without_advantages(p_teamA_wins_point)
         prob_teamA_wins_during_advantages_before_deciding_point(p_teamA_wins_point)
         prob_teamA_wins_at_deciding_point(p_teamA_wins_point, p_teamA_wins_deciding_point)
@@ -86,10 +161,12 @@ class BasicScoreBlock:
         self.n_max_advantages = n_max_advantages
         self.device = device
 
-        # Precompute utility binomial coefficients
+        # Precompute utility binomial coefficients, and the polynomial coefficients of the win probability
         self._utils_binom = torch.tensor(
             [binom(score_end - 1 + n, score_end - 1) for n in range(score_end)]
         ).float().to(device)
+        self._coefficients = get_block_polynomial_coefficients(score_end, n_max_advantages)
+        self._binom_e1 = float(binom(2*(score_end-1), score_end-1))  # _utils_binom[e1], as a Python float
 
 
     def to (self, device: torch.device) -> None:
@@ -184,6 +261,58 @@ class BasicScoreBlock:
 
         return p_this_score
 
+
+    def get_score_coefficients (
+            self,
+            score_teamA: Union[torch.Tensor, Sequence[int]],
+            score_teamB: Union[torch.Tensor, Sequence[int]]
+        ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Get the coefficients of the log-probability of given scores, which depend on the scores only.
+
+        Description:
+            With P = p_teamA_wins_point and Q = p_teamA_wins_deciding_point, the log of prob_this_score is
+                log_const + exponent_win log(P) + exponent_loss log(1-P)
+                    + exponent_deciding_win log(Q) + exponent_deciding_loss log(1-Q)
+
+        Args:
+            score_teamA : torch.Tensor[torch.long] (n_batches,)
+                Scores of team A.
+            score_teamB : torch.Tensor[torch.long] (n_batches,)
+                Scores of team B.
+
+        Returns:
+            log_const : torch.Tensor[torch.float64] (n_batches,)
+                Log of the number of ways to reach the scores.
+            exponent_win, exponent_loss : torch.Tensor[torch.float64] (n_batches,)
+                Exponents of P and 1-P.
+            exponent_deciding_win, exponent_deciding_loss : torch.Tensor[torch.float64] (n_batches,)
+                Exponents of Q and 1-Q: 1 if the deciding point was played and won (lost) by team A.
+        """
+
+        # As torch tensor
+        score_teamA = as_torch_tensor(score_teamA, torch.long, device=self.device)
+        score_teamB = as_torch_tensor(score_teamB, torch.long, device=self.device)
+
+        # Same utility quantities as prob_this_score
+        e1 = self.score_end - 1
+        minimum = torch.minimum(score_teamA, score_teamB)
+        minmin = minimum.clamp(max=e1)
+        maxmin = minimum.clamp(min=e1)
+        if self.n_max_advantages is None:
+            deciding_point_was_played = torch.zeros_like(minimum, dtype=torch.bool)
+        else:
+            deciding_point_was_played = (minimum == e1+self.n_max_advantages)
+        has_teamA_won = (score_teamA > score_teamB)
+
+        log_const = torch.log(self._utils_binom[minmin].double()) + (maxmin-e1) * log(2)
+        exponent_win = torch.where(deciding_point_was_played, maxmin, score_teamA).double()
+        exponent_loss = torch.where(deciding_point_was_played, maxmin, score_teamB).double()
+        exponent_deciding_win = (deciding_point_was_played & has_teamA_won).double()
+        exponent_deciding_loss = (deciding_point_was_played & ~has_teamA_won).double()
+
+        return log_const, exponent_win, exponent_loss, exponent_deciding_win, exponent_deciding_loss
+
           
     def prob_teamA_wins (
             self, 
@@ -193,6 +322,10 @@ class BasicScoreBlock:
         """
         Compute the probability of team A winning
 
+        Description:
+            Evaluated in closed form with prob_teamA_wins_closed_form. When autograd is needed, the
+            backward pass uses the analytic derivatives (see BlockWinProbability).
+
         Args:
             p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
                 Probability of team A winning a point.
@@ -219,12 +352,86 @@ class BasicScoreBlock:
         assert p_teamA_wins_point.shape == p_teamA_wins_deciding_point.shape, "p_teamA_wins_point.shape must be equal to p_teamA_wins_deciding_point.shape"
         
         # Compute probability of team A winning
-        p_teamA_wins = \
-            self.prob_teamA_wins_without_advantages(p_teamA_wins_point) + \
-            self.prob_teamA_wins_during_advantages_before_deciding_point(p_teamA_wins_point) + \
-            self.prob_teamA_wins_at_deciding_point(p_teamA_wins_point, p_teamA_wins_deciding_point)
+        if torch.is_grad_enabled() and (p_teamA_wins_point.requires_grad or p_teamA_wins_deciding_point.requires_grad):
+            p_teamA_wins = BlockWinProbability.apply(p_teamA_wins_point, p_teamA_wins_deciding_point, self)
+        else:
+            p_teamA_wins = self.prob_teamA_wins_closed_form(p_teamA_wins_point, p_teamA_wins_deciding_point)
     
         return p_teamA_wins
+
+
+    def prob_teamA_wins_closed_form (
+            self,
+            p_teamA_wins_point: torch.Tensor,
+            p_teamA_wins_deciding_point: torch.Tensor,
+            derivatives: bool = False
+        ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+        """
+        Compute the probability of team A winning, and optionally its derivatives, in closed form.
+
+        Description:
+            The probability is a fixed function of p = p_teamA_wins_point and q = p_teamA_wins_deciding_point,
+            evaluated with the Horner scheme from coefficients precomputed at initialization (see
+            numpy_backend.get_block_polynomial_coefficients), in a single pass without validation.
+            Same value as the sum of prob_teamA_wins_without_advantages,
+            prob_teamA_wins_during_advantages_before_deciding_point and prob_teamA_wins_at_deciding_point.
+
+        Args:
+            p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
+                Probability of team A winning a point.
+            p_teamA_wins_deciding_point : torch.Tensor[torch.float] (n_batches,)
+                Probability of team A winning the deciding point.
+            derivatives : bool = False
+                Also return the derivatives with respect to p and q.
+
+        Returns:
+            p_teamA_wins : torch.Tensor[torch.float] (n_batches,)
+                Probability of team A winning.
+            derivative_point : torch.Tensor[torch.float] (n_batches,)
+                Derivative of p_teamA_wins with respect to p. Only if derivatives is True.
+            derivative_deciding_point : torch.Tensor[torch.float] (n_batches,)
+                Derivative of p_teamA_wins with respect to q. Only if derivatives is True.
+        """
+
+        p, q = p_teamA_wins_point, p_teamA_wins_deciding_point
+        x = 1 - p
+        score_end, e1, n_max_advantages = self.score_end, self.score_end-1, self.n_max_advantages
+        b = self._binom_e1
+
+        # Without advantages: p^score_end A(x)
+        A = horner(self._coefficients['without_advantages'], x)
+        p_teamA_wins = p**score_end * A
+        if derivatives:
+            derivative_point = score_end * p**(score_end-1) * A - p**score_end * horner(self._coefficients['without_advantages_derivative'], x)
+            derivative_deciding_point = torch.zeros_like(q)
+
+        # During advantages, before deciding point: b p^(score_end+1) x^e1 B(g)
+        if n_max_advantages != 0:
+            g = 2*p*x
+            if n_max_advantages is None:
+                B = 1 / (1-g)
+            else:
+                B = horner(self._coefficients['during_advantages'], g)
+            m = b * p**(score_end+1) * x**e1
+            p_teamA_wins = p_teamA_wins + m * B
+            if derivatives:
+                derivative_B = B*B if n_max_advantages is None else horner(self._coefficients['during_advantages_derivative'], g)
+                derivative_m = b * p**score_end * x**(e1-1) * ((score_end+1)*x - e1*p)
+                derivative_point = derivative_point + derivative_m * B + m * derivative_B * 2*(1-2*p)
+
+        # At deciding point: c (p x)^(e1+n) q
+        if n_max_advantages is not None:
+            c = b * 2**n_max_advantages
+            k = e1 + n_max_advantages
+            t = c * (p*x)**k
+            p_teamA_wins = p_teamA_wins + t * q
+            if derivatives:
+                derivative_point = derivative_point + c * k * (p*x)**(k-1) * (1-2*p) * q
+                derivative_deciding_point = t
+
+        if derivatives:
+            return p_teamA_wins, derivative_point, derivative_deciding_point
+        return p_teamA_wins
     
     
     def prob_teamA_wins_without_advantages (self, p_teamA_wins_point: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
@@ -247,12 +454,9 @@ class BasicScoreBlock:
         assert p_teamA_wins_point.ndim == 1, "p_teamA_wins_point.shape must be (n_batches,)"
 
         # Compute probability of team A winning without advantages, summing over all possible scores
-        score_teamA = torch.full_like(p_teamA_wins_point, fill_value=self.score_end, dtype=torch.long)
-        p_teamA_wins_without_advantages = torch.zeros_like(p_teamA_wins_point, dtype=torch.float)
-        for i_score in range(self.score_end-1):
-            score_teamB = torch.full_like(p_teamA_wins_point, fill_value=i_score, dtype=torch.long)
-            p_this_score = self.prob_this_score(score_teamA, score_teamB, p_teamA_wins_point)
-            p_teamA_wins_without_advantages = p_teamA_wins_without_advantages + p_this_score
+        # (score_end, i_score), i_score < score_end - 1, as a polynomial: p^score_end A(1-p)
+        p_teamA_wins_without_advantages = \
+            p_teamA_wins_point**self.score_end * horner(self._coefficients['without_advantages'], 1-p_teamA_wins_point)
 
         return p_teamA_wins_without_advantages
         
@@ -284,7 +488,7 @@ class BasicScoreBlock:
         g = 2*p*(1-p)
         if self.n_max_advantages is not None: 
             p_teamA_wins_during_advantages_before_deciding_point = \
-                self._utils_binom[e1] * p**(e1+2) * (1-p)**e1 * (1-g**self.n_max_advantages) / (1-g)
+                self._utils_binom[e1] * p**(e1+2) * (1-p)**e1 * horner(self._coefficients['during_advantages'], g)
         else: 
             p_teamA_wins_during_advantages_before_deciding_point = \
                 self._utils_binom[e1] * p**(e1+2) * (1-p)**e1 / (1-g)
@@ -331,7 +535,100 @@ class BasicScoreBlock:
             (p_teamA_wins_point*(1-p_teamA_wins_point))**(e1+self.n_max_advantages) * p_teamA_wins_deciding_point
         
         return p_teamA_wins_at_deciding_point
-        
+
+
+    def sample_score (
+            self,
+            p_teamA_wins_point: Union[torch.Tensor, Sequence[float]],
+            p_teamA_wins_deciding_point: Optional[Union[torch.Tensor, Sequence[float]]] = None,
+            n_samples: int = 1,
+            generator: Optional[torch.Generator] = None
+        ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Sample final scores of the block
+
+        Description:
+            The final scores reachable with a bounded number of points are enumerated, and their
+            probabilities are computed once per batch element with prob_this_score. Samples are then
+            drawn from this categorical distribution. With infinite advantages, all the scores
+            reached after the (e1, e1) tie, where e1 = score_end - 1, are grouped in a single outcome:
+            when it is sampled, the number of split rounds of 2 points before the end is drawn from
+            its geometric distribution, and the winner with probability p^2 / (p^2 + (1-p)^2).
+
+        Args:
+            p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
+                Probability of team A winning a point.
+            p_teamA_wins_deciding_point : torch.Tensor[torch.float] (n_batches,) | None = None
+                Probability of team A winning the deciding point. Set to None to use p_teamA_wins_point.
+            n_samples : int = 1
+                Number of scores to sample for each batch element.
+            generator : torch.Generator | None = None
+                Random number generator used for sampling.
+
+        Returns:
+            score_teamA : torch.Tensor[torch.long] (n_samples, n_batches)
+                Sampled scores of team A.
+            score_teamB : torch.Tensor[torch.long] (n_samples, n_batches)
+                Sampled scores of team B.
+        """
+
+        # As torch tensor
+        p_teamA_wins_point = as_torch_tensor(p_teamA_wins_point, torch.float, device=self.device)
+        if p_teamA_wins_deciding_point is not None:
+            p_teamA_wins_deciding_point = as_torch_tensor(p_teamA_wins_deciding_point, torch.float, device=self.device)
+        else:
+            p_teamA_wins_deciding_point = p_teamA_wins_point
+
+        # Checks
+        assert p_teamA_wins_point.ndim == 1, "p_teamA_wins_point.shape must be (n_batches,)"
+        assert p_teamA_wins_point.shape == p_teamA_wins_deciding_point.shape, "p_teamA_wins_point.shape must be equal to p_teamA_wins_deciding_point.shape"
+
+        # Enumerate the final scores reachable with a bounded number of points
+        e1 = self.score_end - 1
+        outcomes = []
+        for i_score in range(e1):
+            outcomes += [(self.score_end, i_score), (i_score, self.score_end)]
+        n_finite_advantages = 0 if self.n_max_advantages is None else self.n_max_advantages
+        for n_advantages in range(n_finite_advantages):
+            outcomes += [(e1+n_advantages+2, e1+n_advantages), (e1+n_advantages, e1+n_advantages+2)]
+        if self.n_max_advantages is not None:
+            outcomes += [(e1+self.n_max_advantages+1, e1+self.n_max_advantages), (e1+self.n_max_advantages, e1+self.n_max_advantages+1)]
+        outcomes = torch.tensor(outcomes, dtype=torch.long, device=self.device)  # (n_outcomes, 2)
+
+        # Probability of each outcome, for each batch element
+        n_batches, n_outcomes = p_teamA_wins_point.shape[0], outcomes.shape[0]
+        p_outcomes = self.prob_this_score(
+            outcomes[:, 0].repeat(n_batches),
+            outcomes[:, 1].repeat(n_batches),
+            p_teamA_wins_point.repeat_interleave(n_outcomes),
+            p_teamA_wins_deciding_point.repeat_interleave(n_outcomes)
+        ).reshape(n_batches, n_outcomes)
+        if self.n_max_advantages is None:  # Extra outcome: the (e1, e1) tie is reached
+            p_tie = self._utils_binom[e1] * (p_teamA_wins_point*(1-p_teamA_wins_point))**e1
+            p_outcomes = torch.cat([p_outcomes, p_tie[:, None]], dim=1)
+
+        # Sample outcomes by inverse transform sampling
+        cdf = torch.cumsum(p_outcomes, dim=1)
+        u = torch.rand((n_samples, n_batches, 1), generator=generator, device=self.device)
+        idx_outcome = (u > cdf).sum(dim=-1).clamp(max=p_outcomes.shape[1]-1)  # (n_samples, n_batches)
+        is_tie = (idx_outcome == n_outcomes)
+        sampled_outcomes = outcomes[idx_outcome.clamp(max=n_outcomes-1)]
+        score_teamA = sampled_outcomes[..., 0]
+        score_teamB = sampled_outcomes[..., 1]
+
+        # Sample the end of the advantages, for the outcomes which reached the (e1, e1) tie
+        if self.n_max_advantages is None:
+            p = p_teamA_wins_point.expand(n_samples, n_batches)
+            g = 2*p*(1-p)
+            u_splits = torch.rand((n_samples, n_batches), generator=generator, device=self.device)
+            n_splits = torch.floor(torch.log(u_splits) / torch.log(g.clamp(min=1e-12))).clamp(min=0, max=10**6).long()
+            u_winner = torch.rand((n_samples, n_batches), generator=generator, device=self.device)
+            has_teamA_won = u_winner < p**2 / (p**2 + (1-p)**2)
+            score_teamA = torch.where(is_tie, e1 + n_splits + 2*has_teamA_won, score_teamA)
+            score_teamB = torch.where(is_tie, e1 + n_splits + 2*(~has_teamA_won), score_teamB)
+
+        return score_teamA, score_teamB
+
 
     def __repr__ (self):
         
@@ -341,7 +638,96 @@ class BasicScoreBlock:
     def __str__ (self):
         
         return repr(self)
-    
+
+
+def get_unit_probability (block: Optional[BasicScoreBlock], p_teamA_wins_point: torch.Tensor, derivatives: bool = False) -> Tuple[torch.Tensor, Union[torch.Tensor, float, None]]:
+    """
+    Probability of team A winning a unit of a scoring system (see ScoringSystem.get_unit_blocks): a
+    block whose points, deciding point included, are won with probability p_teamA_wins_point, or a
+    point if block is None.
+
+    Args:
+        block : BasicScoreBlock | None
+            The block of the unit. None for a point.
+        p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
+            Probability of team A winning a point.
+        derivatives : bool = False
+            Also compute the derivative with respect to p_teamA_wins_point.
+
+    Returns:
+        p_teamA_wins_unit : torch.Tensor[torch.float] (n_batches,)
+            Probability of team A winning the unit.
+        derivative : torch.Tensor[torch.float] (n_batches,) | float | None
+            Its derivative with respect to p_teamA_wins_point. None if derivatives is False.
+    """
+
+    if block is None:
+        return p_teamA_wins_point, (1. if derivatives else None)
+    if not derivatives:
+        return block.prob_teamA_wins_closed_form(p_teamA_wins_point, p_teamA_wins_point), None
+
+    # The deciding point is a point: both derivatives add up
+    p_teamA_wins_unit, derivative_point, derivative_deciding_point = \
+        block.prob_teamA_wins_closed_form(p_teamA_wins_point, p_teamA_wins_point, derivatives=True)
+
+    return p_teamA_wins_unit, derivative_point + derivative_deciding_point
+
+
+def log_prob_from_unit_probabilities (
+        score_coefficients: torch.Tensor,
+        abilities_difference: torch.Tensor,
+        get_unit_probabilities: Callable,
+        derivatives: bool = False
+    ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Compute the log-probabilities of scores from their coefficients and the probabilities of team A
+    winning the units, see ScoringSystem.log_prob_from_score_coefficients_closed_form.
+
+    Args:
+        score_coefficients : torch.Tensor (n_batches, 1 + 2 n_units)
+            The coefficients of the log-probabilities, of any floating dtype.
+        abilities_difference : torch.Tensor[torch.float] (n_batches,)
+            Ability difference between team A and team B.
+        get_unit_probabilities : Callable
+            Function of (p_teamA_wins_point, derivatives) returning the probabilities of the units
+            and their derivatives, see ScoringSystem.get_unit_probabilities.
+        derivatives : bool = False
+            Also return the derivatives.
+
+    Returns:
+        log_p_this_score : torch.Tensor[torch.float] (n_batches,)
+            The log-probabilities of the scores, floored as log(p + 1e-40).
+        derivative : torch.Tensor[torch.float] (n_batches,)
+            Derivative of log_p_this_score with respect to abilities_difference. Only if
+            derivatives is True.
+    """
+
+    if derivatives:
+        p_teamA_wins_point, derivative_point = prob_teamA_wins_point_from_difference(abilities_difference, derivatives=True)
+    else:
+        p_teamA_wins_point = prob_teamA_wins_point_from_difference(abilities_difference)
+
+    # Sum over units: log-probabilities, and derivatives with respect to p_teamA_wins_point
+    score_coefficients = score_coefficients.to(abilities_difference.dtype)
+    tiny = torch.finfo(p_teamA_wins_point.dtype).tiny
+    log_p_this_score = score_coefficients[:, 0]
+    derivative = 0.
+    for i_unit, (p_unit, derivative_unit) in enumerate(get_unit_probabilities(p_teamA_wins_point, derivatives)):
+        exponent_win, exponent_loss = score_coefficients[:, 1+2*i_unit], score_coefficients[:, 2+2*i_unit]
+        log_p_this_score = log_p_this_score + torch.xlogy(exponent_win, p_unit) + torch.xlogy(exponent_loss, 1-p_unit)
+        if derivatives:
+            derivative = derivative + (exponent_win / p_unit.clamp(min=tiny) - exponent_loss / (1-p_unit).clamp(min=tiny)) * derivative_unit
+
+    # Floor: log(p + 1e-40)
+    log_p_this_score_floored = torch.logaddexp(log_p_this_score, torch.tensor(LOG_EPSILON, dtype=log_p_this_score.dtype, device=log_p_this_score.device))
+    if not derivatives:
+        return log_p_this_score_floored
+
+    weight = torch.sigmoid(log_p_this_score - LOG_EPSILON)  # d log(p + 1e-40) / d log(p)
+    derivative = torch.where(weight > 0, weight * derivative * derivative_point, 0.)
+
+    return log_p_this_score_floored, derivative
+
 
 class ScoringSystem:
     """
@@ -350,15 +736,30 @@ class ScoringSystem:
     Attributes:
         device : torch.device
             Device to store tensors on.
+        backend : str
+            Backend of prob_teamA_wins: 'torch' or 'numpy' (see numpy_backend).
         n_score_elements : int
             Number of elements in the score. This should be defined in subclasses.
+        is_compiled : bool
+            Whether the log-probabilities are computed by a compiled function (see compile).
 
     Methods:
+        compile()
         process_score(score)
+        process_scores(scores)
         prob_this_score(score, abilities)
+        log_prob_this_score(score, abilities_difference)
+        get_score_coefficients(score)
+        get_unit_blocks()
+        get_unit_probabilities(p_teamA_wins_point, derivatives=False)
+        log_prob_from_score_coefficients(score_coefficients, abilities_difference)
+        log_prob_from_score_coefficients_closed_form(score_coefficients, abilities_difference, derivatives=False)
+        get_log_prob_closed_form()
         prob_teamA_wins(abilities)
     """
 
+    _compiled_log_prob_closed_form: Optional[CompiledFunction] = None
+
 
     def __init__ (self, device: torch.device = torch.device("cpu")) -> None:
         """
@@ -370,6 +771,7 @@ class ScoringSystem:
         """
 
         self.device = device
+        self.backend = 'torch'
         self.n_score_elements = None  # This should be defined in subclasses
 
 
@@ -388,6 +790,38 @@ class ScoringSystem:
         raise NotImplementedError
 
 
+    @property
+    def is_compiled (self) -> bool:
+
+        return self._compiled_log_prob_closed_form is not None and self._compiled_log_prob_closed_form.compiled_function is not None
+
+
+    def compile (self) -> None:
+        """
+        Compile log_prob_from_score_coefficients_closed_form with torch.compile (inductor backend),
+        with fallback to eager mode (see utils.CompiledFunction). The log-probabilities and their
+        derivatives are then computed by a few fused kernels, instead of dozens of small ones.
+        Compilation happens on the first call.
+        """
+
+        self._compiled_log_prob_closed_form = CompiledFunction(self.log_prob_from_score_coefficients_closed_form)
+
+
+    def get_log_prob_closed_form (self) -> Callable:
+        """
+        Get the function computing the log-probabilities in closed form: the compiled version of
+        log_prob_from_score_coefficients_closed_form after compile, the eager one otherwise.
+
+        Returns:
+            log_prob_closed_form : Callable
+                Same arguments and returns as log_prob_from_score_coefficients_closed_form.
+        """
+
+        if self._compiled_log_prob_closed_form is not None:
+            return self._compiled_log_prob_closed_form
+        return self.log_prob_from_score_coefficients_closed_form
+
+
     def process_score (self, score: list[int]) -> Tuple[bool, Union[list[int], None], str]:
         """
         Check if the score is valid, and get the normalized score and the winner team.
@@ -417,6 +851,42 @@ class ScoringSystem:
         raise NotImplementedError
 
 
+    def process_scores (self, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Check many scores at once. Vectorized version of process_score.
+
+        Description:
+            This generic implementation calls process_score on each score (a score raising an exception
+            is not valid). Subclasses can override it with a vectorized implementation.
+
+        Args:
+            scores : np.ndarray[int] (n_scores, n_elements)
+                The scores to process. See process_score.
+
+        Returns:
+            is_valid : np.ndarray[bool] (n_scores,)
+                True if the score is valid, False otherwise.
+            normalized_scores : np.ndarray[int] (n_scores, n_score_elements)
+                The normalized scores. Rows of invalid scores are 0.
+            winner_teams : np.ndarray[object] (n_scores,)
+                "Team A" or "Team B", or None if the score is not valid.
+        """
+
+        scores = np.asarray(scores, dtype=np.int64)
+        is_valid = np.zeros(len(scores), dtype=bool)
+        normalized_scores = np.zeros((len(scores), self.n_score_elements), dtype=np.int64)
+        winner_teams = np.full(len(scores), None, dtype=object)
+        for i_score, score in enumerate(scores.tolist()):
+            try:
+                is_valid[i_score], normalized_score, winner_teams[i_score] = self.process_score(score)
+            except Exception:
+                is_valid[i_score], winner_teams[i_score] = False, None
+            if is_valid[i_score]:
+                normalized_scores[i_score] = normalized_score
+
+        return is_valid, normalized_scores, winner_teams
+
+
     def prob_this_score (self, score: Union[torch.Tensor, Sequence[int]], abilities: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
         """
         Compute the probability of a given score.
@@ -437,6 +907,146 @@ class ScoringSystem:
         raise NotImplementedError
 
 
+    def log_prob_this_score (self, score: Union[torch.Tensor, Sequence[int]], abilities_difference: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
+        """
+        Compute the log-probability of given scores from the ability differences, as used by the
+        log-likelihood.
+
+        Description:
+            Same as log(prob_this_score(score, abilities) + 1e-40), with abilities_difference =
+            abilities @ u (see prob_teamA_wins_point). The scores are turned into coefficients with
+            get_score_coefficients, then the log-probabilities are computed with
+            log_prob_from_score_coefficients.
+
+        Args:
+            score : torch.Tensor[torch.long] (n_batches, n_score_elements)
+                The normalized scores.
+            abilities_difference : torch.Tensor[torch.float] (n_batches,)
+                Ability difference between team A and team B.
+
+        Returns:
+            log_p_this_score : torch.Tensor[torch.float] (n_batches,)
+                The log-probabilities of the scores.
+        """
+
+        return self.log_prob_from_score_coefficients(self.get_score_coefficients(score), abilities_difference)
+
+
+    def get_score_coefficients (self, score: Union[torch.Tensor, Sequence[int]]) -> torch.Tensor:
+        """
+        Get the coefficients of the log-probabilities of given scores, which depend on the scores only.
+
+        Description:
+            With U_j the unit probabilities of get_unit_probabilities, the log-probability of a score is
+                score_coefficients[0] + sum_j score_coefficients[1+2j] log(U_j) + score_coefficients[2+2j] log(1-U_j)
+
+        Args:
+            score : torch.Tensor[torch.long] (n_batches, n_score_elements)
+                The normalized scores.
+
+        Returns:
+            score_coefficients : torch.Tensor[torch.float64] (n_batches, 1 + 2 n_units)
+                The coefficients of the log-probabilities. They can be stored in a lower precision
+                (see LogLikelihoodTerm): they are cast to the dtype of the ability differences by
+                log_prob_from_score_coefficients_closed_form.
+        """
+
+        raise NotImplementedError
+
+
+    def get_unit_blocks (self) -> list[Optional[BasicScoreBlock]]:
+        """
+        Get the units the log-probabilities of scores are made of (see get_score_coefficients), as
+        score blocks whose points and deciding point are won with the probability of a point (e.g. a
+        game), or None for a point. Scoring systems with units of the same parameters (score_end,
+        n_max_advantages) share their computations in a fused loss (see LogLikelihoodTerm.fuse and
+        FusedScoringSystem).
+
+        Returns:
+            unit_blocks : list[BasicScoreBlock | None]
+                The block of each unit, None for a point.
+        """
+
+        raise NotImplementedError
+
+
+    def get_unit_probabilities (self, p_teamA_wins_point: torch.Tensor, derivatives: bool = False) -> list[Tuple[torch.Tensor, Union[torch.Tensor, float, None]]]:
+        """
+        Get the probabilities of team A winning the units of get_unit_blocks (see get_unit_probability).
+
+        Args:
+            p_teamA_wins_point : torch.Tensor[torch.float] (n_batches,)
+                Probability of team A winning a point.
+            derivatives : bool = False
+                Also compute the derivatives with respect to p_teamA_wins_point.
+
+        Returns:
+            unit_probabilities : list[tuple[torch.Tensor, torch.Tensor | float | None]]
+                For each unit, its probability (n_batches,) and its derivative (None if derivatives
+                is False).
+        """
+
+        return [get_unit_probability(block, p_teamA_wins_point, derivatives) for block in self.get_unit_blocks()]
+
+
+    def log_prob_from_score_coefficients (self, score_coefficients: torch.Tensor, abilities_difference: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
+        """
+        Compute the log-probabilities of scores from their coefficients (see get_score_coefficients).
+
+        Description:
+            Evaluated with log_prob_from_score_coefficients_closed_form (compiled after compile). When autograd is needed, this
+            is a single autograd node with an analytic derivative (see ScoreLogLikelihood), instead of
+            a graph of dozens of nodes through prob_this_score.
+
+        Args:
+            score_coefficients : torch.Tensor[torch.float] (n_batches, 1 + 2 n_units)
+                The coefficients of the log-probabilities.
+            abilities_difference : torch.Tensor[torch.float] (n_batches,)
+                Ability difference between team A and team B.
+
+        Returns:
+            log_p_this_score : torch.Tensor[torch.float] (n_batches,)
+                The log-probabilities of the scores, floored as log(p + 1e-40).
+        """
+
+        if not (isinstance(abilities_difference, torch.Tensor) and abilities_difference.is_floating_point()):
+            abilities_difference = as_torch_tensor(abilities_difference, torch.float, device=self.device)
+
+        if torch.is_grad_enabled() and abilities_difference.requires_grad:
+            return ScoreLogLikelihood.apply(abilities_difference, score_coefficients, self)
+        return self.get_log_prob_closed_form()(score_coefficients, abilities_difference)
+
+
+    def log_prob_from_score_coefficients_closed_form (
+            self,
+            score_coefficients: torch.Tensor,
+            abilities_difference: torch.Tensor,
+            derivatives: bool = False
+        ) -> Union[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Compute the log-probabilities of scores from their coefficients (see get_score_coefficients),
+        and optionally their derivatives with respect to the ability differences, in closed form.
+
+        Args:
+            score_coefficients : torch.Tensor (n_batches, 1 + 2 n_units)
+                The coefficients of the log-probabilities, of any floating dtype. Cast to the dtype
+                of abilities_difference, in which the log-probabilities are computed.
+            abilities_difference : torch.Tensor[torch.float] (n_batches,)
+                Ability difference between team A and team B.
+            derivatives : bool = False
+                Also return the derivatives.
+
+        Returns:
+            log_p_this_score : torch.Tensor[torch.float] (n_batches,)
+                The log-probabilities of the scores, floored as log(p + 1e-40).
+            derivative : torch.Tensor[torch.float] (n_batches,)
+                Derivative of log_p_this_score with respect to abilities_difference. Only if
+                derivatives is True.
+        """
+
+        return log_prob_from_unit_probabilities(score_coefficients, abilities_difference, self.get_unit_probabilities, derivatives)
+
+
     def prob_teamA_wins (self, abilities: Union[torch.Tensor, Sequence[float]]) -> torch.Tensor:
         """
         Compute the probability of team A winning.
@@ -455,6 +1065,50 @@ class ScoringSystem:
         raise NotImplementedError
 
 
+    def sample_score (self, abilities: Union[torch.Tensor, Sequence[float]], n_samples: int = 1, generator: Optional[torch.Generator] = None) -> torch.Tensor:
+        """
+        Sample normalized scores.
+
+        Args:
+            abilities : torch.Tensor[torch.float] (n_batches, 2) or (n_batches, 4)
+                abilities of players. The last dimension must be in [2, 4]:
+                    - 2: match type = single
+                    - 4: match type = double
+            n_samples : int = 1
+                Number of scores to sample for each batch element.
+            generator : torch.Generator | None = None
+                Random number generator used for sampling.
+
+        Returns:
+            score : torch.Tensor[torch.long] (n_samples, n_batches, n_score_elements)
+                The sampled normalized scores.
+        """
+
+        raise NotImplementedError
+
+
+    def count_sets_and_games (self, score: Union[torch.Tensor, Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Count sets and games won by each team, as used by tournament standings.
+
+        Args:
+            score : torch.Tensor[torch.long] (..., n_score_elements)
+                Normalized scores.
+
+        Returns:
+            sets_teamA : torch.Tensor[torch.long] (...,)
+                Sets won by team A.
+            sets_teamB : torch.Tensor[torch.long] (...,)
+                Sets won by team B.
+            games_teamA : torch.Tensor[torch.long] (...,)
+                Games won by team A.
+            games_teamB : torch.Tensor[torch.long] (...,)
+                Games won by team B.
+        """
+
+        raise NotImplementedError
+
+
     def __repr__ (self):
 
         raise "Abstract ScoringSystem"
@@ -0,0 +1,363 @@
+from typing import Optional, Sequence, Union
+from math import comb, pi
+import numpy as np
+
+# NumPy-only inference backend: the formulas of base.py, MrDodo.py and Toringo.py needed to compute
+# win probabilities from fitted abilities, without torch. Computations are in float64.
+# Keep this module free of torch (and of the modules importing it).
+
+
+def horner (coefficients: Sequence[float], x):
+    """
+    Evaluate the polynomial coefficients[0] + coefficients[1] * x + ... with the Horner scheme.
+    Works with floats, NumPy arrays and torch tensors.
+
+    Args:
+        coefficients : Sequence[float]
+            Coefficients of the polynomial, in increasing degree. Empty for the zero polynomial.
+        x : float, np.ndarray or torch.Tensor
+            Where to evaluate the polynomial.
+
+    Returns:
+        value : float, np.ndarray or torch.Tensor
+            The polynomial evaluated at x (0. for the zero polynomial).
+    """
+
+    if len(coefficients) == 0:
+        return 0.
+    value = coefficients[-1]
+    for coefficient in coefficients[-2::-1]:
+        value = value * x + coefficient
+
+    return value
+
+
+def get_block_polynomial_coefficients (score_end: int, n_max_advantages: Optional[int]) -> dict[str, tuple[float, ...]]:
+    """
+    Get the polynomial coefficients of the probability of team A winning a block.
+
+    Description:
+        With p the probability of winning a point, q the probability of winning the deciding point,
+        x = 1 - p, g = 2 p x, e1 = score_end - 1 and n = n_max_advantages, the probability of team
+        A winning the block is
+            p^score_end A(x) + b p^(score_end+1) x^e1 B(g) + c (p x)^(e1+n) q
+        where:
+            - A(x) = sum_{i < e1} binom(e1 + i, e1) x^i: wins without advantages
+            - B(g) = sum_{k < n} g^k, or 1 / (1 - g) for infinite advantages: wins during the
+              advantages, before the deciding point. No such term if n = 0
+            - b = binom(2 e1, e1), c = b 2^n: no deciding point for infinite advantages
+        All the coefficients are non-negative, so that evaluating with the Horner scheme in x and g
+        (in [0, 1] and [0, 0.5]) does not suffer from cancellation, even in float32.
+
+    Args:
+        score_end : int
+            Score threshold to end the block.
+        n_max_advantages : int | None
+            Maximum number of advantages allowed. None represents infinite advantages.
+
+    Returns:
+        coefficients : dict[str, tuple[float, ...]]
+            'without_advantages': coefficients of A, 'during_advantages': coefficients of B (empty
+            for infinite advantages), and their derivatives 'without_advantages_derivative' and
+            'during_advantages_derivative'.
+    """
+
+    e1 = score_end - 1
+    without_advantages = tuple(float(comb(e1 + i, e1)) for i in range(e1))
+    during_advantages = (1.,) * n_max_advantages if n_max_advantages is not None else ()
+
+    return {
+        'without_advantages': without_advantages,
+        'without_advantages_derivative': tuple(i * coefficient for i, coefficient in enumerate(without_advantages) if i > 0),
+        'during_advantages': during_advantages,
+        'during_advantages_derivative': tuple(k * coefficient for k, coefficient in enumerate(during_advantages) if k > 0),
+    }
+
+
+def prob_teamA_wins_point (abilities: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+    """
+    Heuristic formula to estimate the probability of team A winning a point given the abilities of
+    players. NumPy version of base.prob_teamA_wins_point.
+
+    Args:
+        abilities : np.ndarray[float] (2,), (4,), (n_batches, 2) or (n_batches, 4)
+            abilities of players. The last dimension must be in [2, 4]:
+                - 2: match type = single
+                - 4: match type = double
+
+    Returns:
+        p_teamA_wins_point : np.ndarray[float] () or (n_batches,)
+            Probability of team A winning a point, computed using the heuristic formula
+    """
+
+    # As numpy array
+    abilities = np.asarray(abilities, dtype=np.float64)
+
+    # Checks
+    assert abilities.shape[-1] in [2, 4], "abilities.shape[-1] must be 2 (single) or 4 (double)"
+    assert abilities.ndim in [1, 2], "abilities.shape must be (2,), (4,), (n_batches, 2) or (n_batches, 4)"
+
+    # Define the utlity vector u based on match type
+    if abilities.shape[-1] == 2:  # Case: match type = single
+        u = np.array([1., -1.])
+    elif abilities.shape[-1] == 4:  # Case: match type = double
+        u = np.array([0.5, 0.5, -0.5, -0.5])
+
+    # Heuristic formula
+    p_teamA_wins_point = 0.5 + np.arctan(0.1 * abilities @ u) / pi
+
+    return p_teamA_wins_point
+
+
+class BasicScoreBlock:
+    """
+    Basic score block representation for probability calculations. NumPy version of base.BasicScoreBlock,
+    limited to the probability of team A winning.
+
+    Attributes:
+        score_end : int
+            Score threshold to end the game.
+        n_max_advantages : int | None
+            Maximum number of advantages allowed. None represents infinite advantages.
+
+    Methods:
+        prob_teamA_wins(p_teamA_wins_point, p_teamA_wins_deciding_point=None)
+        prob_teamA_wins_without_advantages(p_teamA_wins_point)
+        prob_teamA_wins_during_advantages_before_deciding_point(p_teamA_wins_point)
+        prob_teamA_wins_at_deciding_point(p_teamA_wins_point, p_teamA_wins_deciding_point)
+    """
+
+
+    def __init__ (self, score_end: int, n_max_advantages: Optional[int] = None) -> None:
+        """
+        Basic score block representation for probability calculations
+
+        Args:
+            score_end : int
+                Score threshold to end the game.
+            n_max_advantages : int | None = None
+                Maximum number of advantages allowed. Defaults to None (infinite advantages).
+        """
+
+        self.score_end = score_end
+        self.n_max_advantages = n_max_advantages
+
+        # Precompute utility binomial coefficients, and the polynomial coefficients of the win probability
+        self._utils_binom = np.array([comb(score_end - 1 + n, score_end - 1) for n in range(score_end)], dtype=np.float64)
+        self._coefficients = get_block_polynomial_coefficients(score_end, n_max_advantages)
+
+
+    def prob_teamA_wins (self, p_teamA_wins_point: np.ndarray, p_teamA_wins_deciding_point: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute the probability of team A winning
+
+        Args:
+            p_teamA_wins_point : np.ndarray[float] (n_batches,)
+                Probability of team A winning a point.
+            p_teamA_wins_deciding_point : np.ndarray[float] (n_batches,) | None = None
+                Probability of team A winning the deciding point. Defaults to None, which implies
+                using p_teamA_wins_point as p_teamA_wins_deciding_point
+
+        Returns:
+            p_teamA_wins : np.ndarray[float] (n_batches,)
+                Probability of team A winning.
+        """
+
+        p_teamA_wins_point = np.asarray(p_teamA_wins_point, dtype=np.float64)
+        if p_teamA_wins_deciding_point is None:
+            p_teamA_wins_deciding_point = p_teamA_wins_point
+
+        p_teamA_wins = \
+            self.prob_teamA_wins_without_advantages(p_teamA_wins_point) + \
+            self.prob_teamA_wins_during_advantages_before_deciding_point(p_teamA_wins_point) + \
+            self.prob_teamA_wins_at_deciding_point(p_teamA_wins_point, p_teamA_wins_deciding_point)
+
+        return p_teamA_wins
+
+
+    def prob_teamA_wins_without_advantages (self, p_teamA_wins_point: np.ndarray) -> np.ndarray:
+        """
+        Compute the probability of team A winning without advantages, summing over the scores
+        (score_end, i_score), i_score < score_end - 1, as a polynomial (see get_block_polynomial_coefficients).
+
+        Args:
+            p_teamA_wins_point : np.ndarray[float] (n_batches,)
+                Probability of team A winning a point.
+
+        Returns:
+            p_teamA_wins : np.ndarray[float] (n_batches,)
+                Probability of team A winning without advantages.
+        """
+
+        p = np.asarray(p_teamA_wins_point, dtype=np.float64)
+
+        return p**self.score_end * horner(self._coefficients['without_advantages'], 1-p)
+
+
+    def prob_teamA_wins_during_advantages_before_deciding_point (self, p_teamA_wins_point: np.ndarray) -> np.ndarray:
+        """
+        Compute the probability of team A winning during advantages before deciding point
+
+        Args:
+            p_teamA_wins_point : np.ndarray[float] (n_batches,)
+                Probability of team A winning a point.
+
+        Returns:
+            p_teamA_wins : np.ndarray[float] (n_batches,)
+                Probability of team A winning during advantages before deciding point.
+        """
+
+        if self.n_max_advantages == 0: return 0
+        p = np.asarray(p_teamA_wins_point, dtype=np.float64)
+        e1 = self.score_end-1
+        g = 2*p*(1-p)
+        if self.n_max_advantages is not None:
+            return self._utils_binom[e1] * p**(e1+2) * (1-p)**e1 * horner(self._coefficients['during_advantages'], g)
+        return self._utils_binom[e1] * p**(e1+2) * (1-p)**e1 / (1-g)
+
+
+    def prob_teamA_wins_at_deciding_point (self, p_teamA_wins_point: np.ndarray, p_teamA_wins_deciding_point: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute the probability of team A winning at deciding point
+
+        Args:
+            p_teamA_wins_point : np.ndarray[float] (n_batches,)
+                Probability of team A winning a point.
+            p_teamA_wins_deciding_point : np.ndarray[float] (n_batches,) | None = None
+                Probability of team A winning the deciding point. Defaults to None, which implies using
+                p_teamA_wins_point as p_teamA_wins_deciding_point
+
+        Returns:
+            p_teamA_wins : np.ndarray[float] (n_batches,)
+                Probability of team A winning at deciding point.
+        """
+
+        if self.n_max_advantages is None: return 0
+        p = np.asarray(p_teamA_wins_point, dtype=np.float64)
+        if p_teamA_wins_deciding_point is None:
+            p_teamA_wins_deciding_point = p
+        e1 = self.score_end-1
+
+        return self._utils_binom[e1] * 2**self.n_max_advantages * (p*(1-p))**(e1+self.n_max_advantages) * p_teamA_wins_deciding_point
+
+
+    def __repr__ (self):
+
+        return f"BasicScoreBlock(score_end={self.score_end}, n_max_advantages={self.n_max_advantages}, backend='numpy')"
+
+
+    def __str__ (self):
+
+        return repr(self)
+
+
+class ScoringSystem:
+    """
+    Abstract base class for NumPy scoring systems. NumPy version of base.ScoringSystem, limited to the
+    probability of team A winning.
+
+    Methods:
+        prob_teamA_wins(abilities)
+    """
+
+
+    def prob_teamA_wins (self, abilities: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+        """
+        Compute the probability of team A winning.
+
+        Args:
+            abilities : np.ndarray[float] (n_batches, 2) or (n_batches, 4)
+                abilities of players. The last dimension must be in [2, 4]:
+                    - 2: match type = single
+                    - 4: match type = double
+
+        Returns:
+            p_teamA_wins: np.ndarray[float] (n_batches,)
+                The probability of team A winning.
+        """
+
+        raise NotImplementedError
+
+
+    def __repr__ (self):
+
+        return f"{self.__class__.__name__}(backend='numpy')"
+
+
+    def __str__ (self):
+
+        return repr(self)
+
+
+class MrDodo (ScoringSystem):
+    """
+    MrDodo scoring system, NumPy backend. See MrDodo.MrDodo.
+
+    Methods:
+        prob_teamA_wins(abilities)
+    """
+
+
+    def __init__ (self) -> None:
+
+        self.n_score_elements = 6
+        self.game = BasicScoreBlock(score_end=4, n_max_advantages=1)
+        self.set_tie_break = BasicScoreBlock(score_end=7)
+        self.set = BasicScoreBlock(score_end=6, n_max_advantages=1)
+        self.match_tie_break = BasicScoreBlock(score_end=10)
+        self.match = BasicScoreBlock(score_end=2, n_max_advantages=0)
+
+
+    def prob_teamA_wins (self, abilities: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+
+        # As 2D numpy array
+        abilities = np.atleast_2d(np.asarray(abilities, dtype=np.float64))
+
+        # Compute utility probabilities
+        p_teamA_wins_point = prob_teamA_wins_point(abilities)
+        p_teamA_wins_game = self.game.prob_teamA_wins(p_teamA_wins_point)
+        p_teamA_wins_set_tie_break = self.set_tie_break.prob_teamA_wins(p_teamA_wins_point)
+        p_teamA_wins_set = self.set.prob_teamA_wins(p_teamA_wins_game, p_teamA_wins_set_tie_break)
+        p_teamA_wins_match_tie_break = self.match_tie_break.prob_teamA_wins(p_teamA_wins_point)
+
+        # Compute probability of team A winning the match
+        p_teamA_wins = self.match.prob_teamA_wins(p_teamA_wins_set, p_teamA_wins_match_tie_break)
+
+        return p_teamA_wins
+
+
+class Toringo (ScoringSystem):
+    """
+    Toringo scoring system, NumPy backend. See Toringo.Toringo.
+
+    Methods:
+        prob_teamA_wins(abilities)
+    """
+
+
+    def __init__ (self) -> None:
+
+        self.n_score_elements = 6
+        self.game = BasicScoreBlock(score_end=4)
+        self.set_tie_break = BasicScoreBlock(score_end=7)
+        self.set = BasicScoreBlock(score_end=6, n_max_advantages=1)
+        self.match_tie_break = BasicScoreBlock(score_end=10)
+        self.match = BasicScoreBlock(score_end=2, n_max_advantages=0)
+
+
+    def prob_teamA_wins (self, abilities: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+
+        # As 2D numpy array
+        abilities = np.atleast_2d(np.asarray(abilities, dtype=np.float64))
+
+        # Compute utility probabilities
+        p_teamA_wins_point = prob_teamA_wins_point(abilities)
+        p_teamA_wins_game = self.game.prob_teamA_wins(p_teamA_wins_point)
+        p_teamA_wins_set_tie_break = self.set_tie_break.prob_teamA_wins(p_teamA_wins_point)
+        p_teamA_wins_set = self.set.prob_teamA_wins(p_teamA_wins_game, p_teamA_wins_set_tie_break)
+        p_teamA_wins_match_tie_break = self.match_tie_break.prob_teamA_wins(p_teamA_wins_point)
+
+        # Compute probability of team A winning the match
+        p_teamA_wins = self.match.prob_teamA_wins(p_teamA_wins_set, p_teamA_wins_match_tie_break)
+
+        return p_teamA_wins
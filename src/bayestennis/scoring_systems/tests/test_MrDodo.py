@@ -2,6 +2,8 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
 from bayestennis.scoring_systems import MrDodo
+import numpy as np
+import torch
 
 
 def main ():
@@ -29,6 +31,14 @@ def main ():
     isValid3, score3, winner3 = mrdodo.process_score(score[2])
     isValid4, score4, winner4 = mrdodo.process_score(score[3])
 
+    # Vectorized: same results as process_score
+    score_valid_or_not = [score_i + [0, 0] * (len(score_i) == 4) for score_i in score] + [[6, 3, 6, 7, 12, 10], [7, 7, 6, 1, 0, 0]]
+    is_valid, normalized_scores, winner_teams = mrdodo.process_scores(np.array(score_valid_or_not))
+    for score_i, is_valid_i, normalized_score_i, winner_team_i in zip(score_valid_or_not, is_valid, normalized_scores, winner_teams):
+        isValid_i, normalized_score_ref_i, winner_team_ref_i = mrdodo.process_score(score_i)
+        assert is_valid_i == isValid_i and winner_team_i == winner_team_ref_i
+        assert not isValid_i or normalized_score_i.tolist() == normalized_score_ref_i
+
     abilities_valid = [
         [89, 93],
         [120, 75],
@@ -53,6 +63,20 @@ def main ():
     p_teamA_wins_100_104 = mrdodo.prob_teamA_wins([100, 104])
     p_teamA_wins_100_105 = mrdodo.prob_teamA_wins([100, 105])
 
+    # Fused log-probabilities: same values and gradients as autograd through prob_this_score
+    generator = torch.Generator().manual_seed(0)
+    abilities_sampled = 100 + 8 * torch.randn((500, 2), generator=generator)
+    score_sampled = mrdodo.sample_score(abilities_sampled, generator=generator)[0]
+    abilities_reference = abilities_sampled.clone().requires_grad_(True)
+    log_p_reference = torch.log(mrdodo.prob_this_score(score_sampled, abilities_reference) + 1e-40)
+    log_p_reference.sum().backward()
+    abilities_difference = (abilities_sampled[:, 0] - abilities_sampled[:, 1]).requires_grad_(True)
+    log_p = mrdodo.log_prob_this_score(score_sampled, abilities_difference)
+    log_p.sum().backward()
+    assert torch.allclose(log_p, log_p_reference, atol=1e-4)
+    assert torch.allclose(abilities_difference.grad, abilities_reference.grad[:, 0], rtol=1e-3, atol=1e-5)
+    assert torch.autograd.gradcheck(lambda d: mrdodo.log_prob_this_score(score_sampled[:50], d), (abilities_difference[:50].detach().double().requires_grad_(True),))
+
     BREAKPOINT_ME = 0
 
 
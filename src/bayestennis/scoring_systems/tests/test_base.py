@@ -1,7 +1,8 @@
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
-from bayestennis.scoring_systems.base import prob_teamA_wins_point, BasicScoreBlock
+from bayestennis.scoring_systems.base import prob_teamA_wins_point, BasicScoreBlock, BlockWinProbability
+import torch
 
 
 def main ():
@@ -28,6 +29,21 @@ def main ():
     p_teamA_wins_during_advantages_before_deciding_point = mrdodo_game.prob_teamA_wins_during_advantages_before_deciding_point(p_teamA_wins_point)
     p_teamA_wins_at_deciding_point = mrdodo_game.prob_teamA_wins_at_deciding_point(p_teamA_wins_point)
 
+    # Closed form: same as the sum over the scores, with the analytic derivatives
+    p = torch.linspace(0.01, 0.99, 99, dtype=torch.double)
+    q = torch.linspace(0.99, 0.01, 99, dtype=torch.double)
+    for score_end, n_max_advantages in [(4, 1), (4, None), (7, None), (6, 1), (10, None), (2, 0), (4, 3)]:
+        block = BasicScoreBlock(score_end=score_end, n_max_advantages=n_max_advantages)
+        p_teamA_wins_by_score = sum(
+            block.prob_this_score(torch.full((99,), score_end), torch.full((99,), i_score), p)
+            for i_score in range(score_end-1)
+        ) + block.prob_teamA_wins_during_advantages_before_deciding_point(p) + block.prob_teamA_wins_at_deciding_point(p, q)
+        assert torch.allclose(block.prob_teamA_wins_closed_form(p.double(), q.double()).float(), p_teamA_wins_by_score, atol=1e-6), block
+        assert torch.autograd.gradcheck(lambda p, q: BlockWinProbability.apply(p, q, block), (p.clone().requires_grad_(True), q.clone().requires_grad_(True)))
+        p_grad = p.float().requires_grad_(True)
+        block.prob_teamA_wins(p_grad).sum().backward()  # Same tensor as point and deciding point
+        assert torch.allclose(p_grad.grad.double(), torch.autograd.functional.jacobian(lambda p: block.prob_teamA_wins_closed_form(p, p), p).diagonal(), atol=1e-4), block
+
     BREAKPOINT_ME = 0
 
 
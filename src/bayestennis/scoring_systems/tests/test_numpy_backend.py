@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.scoring_systems import MrDodo, Toringo, numpy_backend
+from bayestennis.scoring_systems.base import BasicScoreBlock, prob_teamA_wins_point
+from bayestennis.io import import_notion_csv
+from bayestennis.TennisUniverse import TennisUniverse
+import numpy as np
+import subprocess
+import tempfile
+import torch
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    generator = np.random.default_rng(0)
+
+    # Parity with the torch backend (float32): point, blocks and scoring systems
+    abilities_single = generator.normal(100, 15, size=(1000, 2))
+    abilities_double = generator.normal(100, 15, size=(1000, 4))
+    for abilities in [abilities_single, abilities_double]:
+        p_torch = prob_teamA_wins_point(torch.tensor(abilities, dtype=torch.float)).numpy()
+        assert np.allclose(numpy_backend.prob_teamA_wins_point(abilities), p_torch, atol=1e-6)
+
+    p_teamA_wins_point = generator.uniform(0.05, 0.95, size=1000)
+    for score_end, n_max_advantages in [(4, 1), (4, None), (6, 1), (7, None), (10, None), (2, 0)]:
+        p_torch = BasicScoreBlock(score_end, n_max_advantages).prob_teamA_wins(torch.tensor(p_teamA_wins_point, dtype=torch.float)).numpy()
+        p_numpy = numpy_backend.BasicScoreBlock(score_end, n_max_advantages).prob_teamA_wins(p_teamA_wins_point)
+        assert np.allclose(p_numpy, p_torch, atol=1e-6)
+
+    for ScoringSystem in [MrDodo, Toringo]:
+        scoringSystem_torch, scoringSystem_numpy = ScoringSystem(), ScoringSystem(backend='numpy')
+        for abilities in [abilities_single, abilities_double]:
+            p_torch = scoringSystem_torch.prob_teamA_wins(torch.tensor(abilities, dtype=torch.float))
+            p_numpy = scoringSystem_numpy.prob_teamA_wins(abilities)
+            assert isinstance(p_torch, torch.Tensor) and isinstance(p_numpy, np.ndarray) and p_numpy.dtype == np.float64
+            assert np.allclose(p_numpy, p_torch.numpy(), atol=1e-5)
+        assert np.allclose(scoringSystem_numpy.prob_teamA_wins([100, 103]), scoringSystem_torch.prob_teamA_wins([100, 103]).numpy(), atol=1e-5)
+
+    try:
+        MrDodo(backend='jax')
+        assert False, "ValueError expected"
+    except ValueError:
+        pass
+
+    # Abilities of a saved TennisUniverse, loaded and used without torch
+    file_path = str(Path(__file__).resolve().parents[2] / "io" / "tests" / "notion_database_example.csv")
+    tennisUniverse = TennisUniverse(import_notion_csv(file_path))
+    tennisUniverse.optimize(n_iter=200, verbose=0)
+    pdf = tennisUniverse.playersDataFrame
+    p_torch = MrDodo().prob_teamA_wins(torch.tensor(pdf['ability'].to_numpy()[[0, 1]], dtype=torch.float)).item()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tennisUniverse.save(tmp_dir)
+        code = (
+            "import sys\n"
+            "class BlockTorch:\n"  # as if torch were not installed
+            "    def find_spec(self, name, path=None, target=None):\n"
+            "        if name == 'torch' or name.startswith('torch.'):\n"
+            "            raise ImportError('torch is not installed')\n"
+            "sys.meta_path.insert(0, BlockTorch())\n"
+            "from bayestennis.service.RankingSnapshot import RankingSnapshot\n"
+            f"snapshot = RankingSnapshot.load({tmp_dir!r})\n"
+            f"print(snapshot.prob_teamA_wins([{int(pdf['id_player'][0])}], [{int(pdf['id_player'][1])}]))\n"
+            "assert 'torch' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=str(Path(__file__).resolve().parents[3]), capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert abs(float(result.stdout) - p_torch) < 1e-4
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
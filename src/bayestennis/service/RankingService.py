@@ -0,0 +1,329 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Sequence, Tuple
+from urllib.parse import urlsplit, parse_qs
+from .RankingSnapshot import RankingSnapshot
+from ..io.import_notion_csv import resolve_file_paths
+
+
+def build_snapshot (file_paths: Sequence[str], version: int, optimize_kwargs: dict, scoring_system_name: str = 'MrDodo') -> RankingSnapshot:
+    """
+    Import files, optimize a TennisUniverse and build its RankingSnapshot.
+    This is the (slow) function run in the background by RankingService.
+
+    Args:
+        file_paths : Sequence[str]
+            Notion CSV files to import. See io.import_notion_csv.
+        version : int
+            Version number of the snapshot.
+        optimize_kwargs : dict
+            Keyword arguments of TennisUniverse.optimize.
+        scoring_system_name : str = 'MrDodo'
+            Name of the scoring system used for head-to-head probabilities.
+
+    Returns:
+        snapshot : RankingSnapshot
+            The new snapshot.
+    """
+
+    from ..io import import_notion_csv
+    from ..TennisUniverse import TennisUniverse
+
+    tennisUniverse = TennisUniverse(import_notion_csv(*file_paths))
+    tennisUniverse.optimize(**{'verbose': 0, **optimize_kwargs})
+
+    return RankingSnapshot.from_tennisUniverse(tennisUniverse, version, file_paths, scoring_system_name)
+
+
+class RankingService:
+    """
+    RankingService is a local HTTP/JSON service answering ranking queries.
+
+    Description:
+        Queries are served from an immutable RankingSnapshot. A background task polls the watched
+        files; when they change, a new snapshot is built by build_snapshot in an executor (a separate
+        process by default), and the service reference is swapped to it in a single assignment.
+        Reads never wait for the optimization: each request uses the snapshot current at its start.
+
+        Endpoints (GET only, JSON responses):
+            - /health
+            - /rankings?k=10
+            - /players/<id_player>
+            - /prob_teamA_wins?teamA=<id>[,<id>]&teamB=<id>[,<id>]
+
+    Attributes:
+        snapshot : RankingSnapshot | None
+            The current snapshot. None until the first one is built.
+        host : str
+            Host to listen on.
+        port : int
+            Port to listen on. 0 picks a free port, available after start().
+
+    Methods:
+        start()
+        stop()
+        serve_forever()
+        refresh()
+    """
+
+    def __init__ (self,
+                  file_paths: Sequence[str] = (),
+                  host: str = '127.0.0.1',
+                  port: int = 8080,
+                  poll_interval: float = 5.,
+                  optimize_kwargs: Optional[dict] = None,
+                  scoring_system_name: str = 'MrDodo',
+                  snapshot: Optional[RankingSnapshot] = None,
+                  executor: str = 'process') -> None:
+        """
+        Initialize the service.
+
+        Args:
+            file_paths : Sequence[str] = ()
+                Notion CSV files to watch. Notation with '*' is supported, so new files matching a
+                pattern are picked up.
+            host : str = '127.0.0.1'
+                Host to listen on.
+            port : int = 8080
+                Port to listen on. 0 picks a free port.
+            poll_interval : float = 5.
+                Seconds between checks of the watched files.
+            optimize_kwargs : dict | None = None
+                Keyword arguments of TennisUniverse.optimize.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system used for head-to-head probabilities.
+            snapshot : RankingSnapshot | None = None
+                Initial snapshot, e.g. loaded from disk. Set to None to build it from the files.
+            executor : str = 'process'
+                Where snapshots are built: 'process' (separate process) or 'thread'.
+        """
+
+        if executor not in ['process', 'thread']:
+            raise ValueError("executor must be 'process' or 'thread'")
+
+        self.file_paths = tuple(file_paths)
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.optimize_kwargs = optimize_kwargs or {}
+        self.scoring_system_name = scoring_system_name
+        self.snapshot = snapshot
+        self._executor_type = executor
+        self._executor: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._files_signature: Optional[Tuple] = None
+
+
+    async def start (self) -> None:
+        """
+        Start listening and watching files.
+        """
+
+        self._executor = self._get_executor()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.file_paths:
+            self._watch_task = asyncio.create_task(self._watch())
+
+
+    def _get_executor (self) -> Executor:
+        """
+        Get a new executor to build snapshots in.
+        """
+
+        if self._executor_type == 'process':
+            return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return ThreadPoolExecutor(max_workers=1)
+
+
+    async def stop (self) -> None:
+        """
+        Stop listening and watching files.
+        """
+
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    async def serve_forever (self) -> None:
+        """
+        Start the service and run it until cancelled.
+        """
+
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+    async def refresh (self) -> bool:
+        """
+        Rebuild the snapshot if the watched files changed, then swap it in.
+
+        Returns:
+            is_refreshed : bool
+                True if a new snapshot was swapped in.
+        """
+
+        file_paths = sorted(resolve_file_paths(self.file_paths))
+        signature = tuple((file_path, os.stat(file_path).st_mtime_ns, os.stat(file_path).st_size) for file_path in file_paths)
+        if not file_paths or signature == self._files_signature:
+            return False
+
+        version = 1 if self.snapshot is None else self.snapshot.version + 1
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(self._executor, build_snapshot, file_paths, version, self.optimize_kwargs, self.scoring_system_name)
+        except BrokenProcessPool:
+            # The worker died (e.g. out of memory): replace it, so that the next refresh can succeed
+            self._executor = self._get_executor()
+            raise
+
+        # Atomic swap: requests already running keep the snapshot they started with
+        self.snapshot = snapshot
+        self._files_signature = signature
+
+        return True
+
+
+    async def _watch (self) -> None:
+        """
+        Poll the watched files, refreshing the snapshot when they change.
+        """
+
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"RankingService: unable to refresh the snapshot: {e!r}", flush=True)
+            await asyncio.sleep(self.poll_interval)
+
+
+    async def _handle_connection (self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve HTTP/1.1 requests on a connection, keeping it alive until the client closes it.
+        """
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    status, body = 400, {'error': 'Malformed request line'}
+                else:
+                    if method != 'GET':
+                        status, body = 405, {'error': 'Only GET is supported'}
+                    else:
+                        status, body = self._route(target)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+    def _route (self, target: str) -> Tuple[int, dict]:
+        """
+        Answer a request target, with the snapshot current at the start of the request.
+
+        Returns:
+            status : int
+                HTTP status code.
+            body : dict
+                JSON body.
+        """
+
+        snapshot = self.snapshot
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip('/')
+
+        if path == '/health':
+            return 200, {'status': 'ok', 'snapshot_version': None if snapshot is None else snapshot.version}
+        if snapshot is None:
+            return 503, {'error': 'Ranking not available yet'}
+
+        try:
+            if path == '/rankings':
+                k = int(query.get('k', ['10'])[0])
+                return 200, {'snapshot_version': snapshot.version, 'players': snapshot.top(k)}
+
+            if path.startswith('/players/'):
+                player = snapshot.player(int(path[len('/players/'):]))
+                if player is None:
+                    return 404, {'error': 'Player not found'}
+                return 200, {'snapshot_version': snapshot.version, 'player': player}
+
+            if path == '/prob_teamA_wins':
+                if 'teamA' not in query or 'teamB' not in query:
+                    return 400, {'error': 'Parameters teamA and teamB are required'}
+                teamA_ids = [int(id_player) for id_player in query['teamA'][0].split(',')]
+                teamB_ids = [int(id_player) for id_player in query['teamB'][0].split(',')]
+                p_teamA_wins = snapshot.prob_teamA_wins(teamA_ids, teamB_ids)
+                return 200, {'snapshot_version': snapshot.version, 'teamA': teamA_ids, 'teamB': teamB_ids, 'prob_teamA_wins': p_teamA_wins}
+        except KeyError as e:
+            return 404, {'error': f"Player not found: {e}"}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        return 404, {'error': f"Unknown endpoint: {url.path}"}
+
+
+    def _write_response (self, writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool) -> None:
+        """
+        Write a JSON HTTP response.
+        """
+
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+        payload = json.dumps(body).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        writer.write(head + payload)
+
+
+    def __repr__ (self):
+
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, snapshot={self.snapshot})"
+
+
+    def __str__ (self):
+
+        return repr(self)
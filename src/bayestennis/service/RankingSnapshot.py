@@ -0,0 +1,314 @@
+import json
+import numpy as np
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Union
+from .._version import SNAPSHOT_FORMAT_VERSION
+from ..scoring_systems import numpy_backend
+
+
+class RankingSnapshot:
+    """
+    RankingSnapshot is an immutable, in-memory view of a fitted ranking, ready to answer queries.
+
+    Description:
+        All the arrays are read-only, and attributes cannot be re-assigned after construction: a
+        snapshot can be shared by concurrent readers without locks. Updates are made by building a
+        new snapshot and swapping the reference to it (see RankingService).
+
+        The win probability depends only on the difference of team abilities, so it is tabulated
+        once per snapshot, on a fine grid covering all the possible matches, and linearly
+        interpolated at query time (absolute error below 1e-5), instead of calling the scoring
+        system on every request. The table is computed with the NumPy backend of the scoring system
+        (see scoring_systems.numpy_backend): building and loading a snapshot do not import torch.
+
+    Attributes:
+        version : int
+            Version number of the snapshot.
+        created_at : float
+            Creation time (seconds since the epoch).
+        source_files : tuple[str]
+            Files the ranking was computed from.
+        n_matches : int
+            Number of valid matches the ranking was computed from.
+        id_player : np.ndarray[int] (n_players,)
+            Player identifiers, sorted by rank.
+        name : tuple[str] (n_players,)
+            Player names, sorted by rank.
+        ability : np.ndarray[float] (n_players,)
+            Player abilities, sorted by rank.
+        rank : np.ndarray[int] (n_players,)
+            Player ranks, sorted.
+
+    Methods:
+        from_tennisUniverse(tennisUniverse, version=0, source_files=(), scoring_system_name='MrDodo')
+        load(path, version=0, scoring_system_name='MrDodo')
+        top(k)
+        player(id_player)
+        prob_teamA_wins(teamA_ids, teamB_ids)
+        prob_teamA_wins_batch(id_teamA_player1, id_teamA_player2, id_teamB_player1, id_teamB_player2)
+    """
+
+    def __init__ (self,
+                  id_player: Sequence[int],
+                  name: Sequence[str],
+                  ability: Sequence[float],
+                  rank: Sequence[int],
+                  version: int = 0,
+                  source_files: Sequence[str] = (),
+                  n_matches: int = 0,
+                  scoring_system_name: str = 'MrDodo') -> None:
+        """
+        Initialize the snapshot. Players are sorted by rank.
+
+        Args:
+            id_player : Sequence[int] (n_players,)
+                Player identifiers.
+            name : Sequence[str] (n_players,)
+                Player names.
+            ability : Sequence[float] (n_players,)
+                Player abilities.
+            rank : Sequence[int] (n_players,)
+                Player ranks.
+            version : int = 0
+                Version number of the snapshot.
+            source_files : Sequence[str] = ()
+                Files the ranking was computed from.
+            n_matches : int = 0
+                Number of valid matches the ranking was computed from.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system used for head-to-head probabilities.
+        """
+
+        order = np.argsort(np.asarray(rank), kind='stable')
+        arrays = {
+            'id_player': np.asarray(id_player, dtype=int)[order],
+            'ability': np.asarray(ability, dtype=float)[order],
+            'rank': np.asarray(rank, dtype=int)[order],
+        }
+        for key, array in arrays.items():
+            array.setflags(write=False)
+            object.__setattr__(self, key, array)
+        object.__setattr__(self, 'name', tuple(np.asarray(name, dtype=object)[order]))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'created_at', time.time())
+        object.__setattr__(self, 'source_files', tuple(source_files))
+        object.__setattr__(self, 'n_matches', n_matches)
+        object.__setattr__(self, 'scoring_system_name', scoring_system_name)
+        object.__setattr__(self, '_row_of_id', {int(id_player): row for row, id_player in enumerate(arrays['id_player'])})
+
+        # Tabulate the win probability on a grid of ability differences covering all the possible matches
+        n_grid = 4097
+        max_difference = float(np.ptp(arrays['ability'])) + 1. if len(arrays['ability']) else 1.
+        grid_difference = np.linspace(-max_difference, max_difference, n_grid)
+        scoring_system = getattr(numpy_backend, scoring_system_name)()
+        grid_prob = scoring_system.prob_teamA_wins(np.stack([grid_difference, np.zeros(n_grid)], axis=-1))
+        for array in [grid_difference, grid_prob]:
+            array.setflags(write=False)
+        object.__setattr__(self, '_grid_difference', grid_difference)
+        object.__setattr__(self, '_grid_prob', grid_prob)
+
+
+    def __setattr__ (self, key, value):
+
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+
+    @classmethod
+    def from_tennisUniverse (cls, tennisUniverse, version: int = 0, source_files: Sequence[str] = (), scoring_system_name: str = 'MrDodo') -> 'RankingSnapshot':
+        """
+        Build a snapshot from an optimized TennisUniverse.
+
+        Args:
+            tennisUniverse : TennisUniverse
+                The optimized TennisUniverse.
+            version : int = 0
+                Version number of the snapshot.
+            source_files : Sequence[str] = ()
+                Files the ranking was computed from.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system used for head-to-head probabilities.
+
+        Returns:
+            snapshot : RankingSnapshot
+                The snapshot.
+        """
+
+        pdf = tennisUniverse.playersDataFrame
+        if pdf['ability'].isna().any():
+            raise ValueError("Abilities are not available: run optimize() first")
+
+        return cls(
+            id_player=pdf['id_player'].to_numpy(),
+            name=pdf['name'].to_numpy(),
+            ability=pdf['ability'].to_numpy(),
+            rank=pdf['rank'].to_numpy(),
+            version=version,
+            source_files=source_files,
+            n_matches=sum(term.n_matches for term in tennisUniverse.loss.logLikelihoodTerms.values()),
+            scoring_system_name=scoring_system_name
+        )
+
+
+    @classmethod
+    def load (cls, path: Union[str, Path], version: int = 0, scoring_system_name: str = 'MrDodo') -> 'RankingSnapshot':
+        """
+        Build a snapshot from a TennisUniverse saved with TennisUniverse.save, without torch: only the
+        manifest and the player table are read.
+
+        Args:
+            path : str or Path
+                Directory the TennisUniverse was saved into.
+            version : int = 0
+                Version number of the snapshot.
+            scoring_system_name : str = 'MrDodo'
+                Name of the scoring system used for head-to-head probabilities.
+
+        Returns:
+            snapshot : RankingSnapshot
+                The snapshot.
+        """
+
+        path = Path(path)
+        with open(path / 'manifest.json') as file:
+            manifest = json.load(file)
+        if manifest['format_version'] > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {manifest['format_version']} (max supported: {SNAPSHOT_FORMAT_VERSION})")
+        players = {column: np.load(path / 'players' / f'{column}.npy', allow_pickle=False) for column in ['id_player', 'name', 'ability', 'rank']}
+        if np.isnan(players['ability'].astype(float)).any():
+            raise ValueError("Abilities are not available: run optimize() before saving")
+
+        return cls(
+            id_player=players['id_player'],
+            name=players['name'].astype(object),
+            ability=players['ability'],
+            rank=players['rank'],
+            version=version,
+            source_files=(str(path),),
+            n_matches=sum(term['n_matches'] for term in manifest['terms'].values()),
+            scoring_system_name=scoring_system_name
+        )
+
+
+    @property
+    def n_players (self) -> int:
+
+        return len(self.id_player)
+
+
+    def top (self, k: int) -> list[dict]:
+        """
+        Get the top-k players.
+
+        Args:
+            k : int
+                Number of players.
+
+        Returns:
+            players : list[dict]
+                The top-k players, as dicts with keys id_player, name, ability, rank.
+        """
+
+        return [self._get_player_dict(row) for row in range(min(max(k, 0), self.n_players))]
+
+
+    def player (self, id_player: int) -> Optional[dict]:
+        """
+        Get a player by identifier.
+
+        Args:
+            id_player : int
+                Player identifier.
+
+        Returns:
+            player : dict | None
+                The player, as a dict with keys id_player, name, ability, rank. None if not found.
+        """
+
+        row = self._row_of_id.get(id_player)
+        return None if row is None else self._get_player_dict(row)
+
+
+    def prob_teamA_wins (self, teamA_ids: Sequence[int], teamB_ids: Sequence[int]) -> float:
+        """
+        Compute the probability of team A winning a head-to-head match.
+
+        Args:
+            teamA_ids : Sequence[int]
+                Identifiers of the players of team A (1 for single, 2 for double).
+            teamB_ids : Sequence[int]
+                Identifiers of the players of team B (1 for single, 2 for double).
+
+        Returns:
+            p_teamA_wins : float
+                Probability of team A winning.
+        """
+
+        if len(teamA_ids) != len(teamB_ids) or len(teamA_ids) not in [1, 2]:
+            raise ValueError("Teams must have the same number of players: 1 (single) or 2 (double)")
+        rows_teamA = [self._row_of_id[id_player] for id_player in teamA_ids]  # KeyError if not found
+        rows_teamB = [self._row_of_id[id_player] for id_player in teamB_ids]
+        ability_difference = self.ability[rows_teamA].mean() - self.ability[rows_teamB].mean()
+
+        return float(np.interp(ability_difference, self._grid_difference, self._grid_prob))
+
+
+    def prob_teamA_wins_batch (self,
+                               id_teamA_player1: Sequence[int],
+                               id_teamA_player2: Sequence[int],
+                               id_teamB_player1: Sequence[int],
+                               id_teamB_player2: Sequence[int]) -> np.ndarray:
+        """
+        Compute the probability of team A winning, for many head-to-head matches at once.
+
+        Args:
+            id_teamA_player1, id_teamA_player2, id_teamB_player1, id_teamB_player2 : Sequence[int] (n_matches,)
+                Identifiers of the players, as in a TennisDataFrame: second players are -1 in single
+                matches.
+
+        Returns:
+            p_teamA_wins : np.ndarray[float] (n_matches,)
+                Probability of team A winning. NaN if a player is not found, or if the teams do not
+                have the same number of players.
+        """
+
+        id_teamA_player2, id_teamB_player2 = np.asarray(id_teamA_player2, dtype=np.int64), np.asarray(id_teamB_player2, dtype=np.int64)
+        if self.n_players == 0:
+            return np.full(len(id_teamA_player2), np.nan)
+
+        # Rows of the players, -1 if not found. Single matches: the second player is the first one
+        order = np.argsort(self.id_player, kind='stable')
+        def get_rows (ids: Sequence[int]) -> np.ndarray:
+            ids = np.asarray(ids, dtype=np.int64)
+            rows = order[np.clip(np.searchsorted(self.id_player, ids, sorter=order), 0, self.n_players-1)]
+            return np.where(self.id_player[rows] == ids, rows, -1)
+
+        is_double = id_teamA_player2 != -1
+        rows_teamA = np.stack([get_rows(id_teamA_player1), get_rows(np.where(is_double, id_teamA_player2, id_teamA_player1))], axis=1)
+        rows_teamB = np.stack([get_rows(id_teamB_player1), get_rows(np.where(is_double, id_teamB_player2, id_teamB_player1))], axis=1)
+        is_valid = (rows_teamA >= 0).all(axis=1) & (rows_teamB >= 0).all(axis=1) & (is_double == (id_teamB_player2 != -1))
+
+        # Team ability: mean of the abilities of its players
+        ability_difference = self.ability[rows_teamA].mean(axis=1) - self.ability[rows_teamB].mean(axis=1)
+
+        return np.where(is_valid, np.interp(ability_difference, self._grid_difference, self._grid_prob), np.nan)
+
+
+    def _get_player_dict (self, row: int) -> dict:
+
+        return {
+            'id_player': int(self.id_player[row]),
+            'name': self.name[row],
+            'ability': float(self.ability[row]),
+            'rank': int(self.rank[row]),
+        }
+
+
+    def __repr__ (self):
+
+        return f"{self.__class__.__name__}(version={self.version}, n_players={self.n_players}, n_matches={self.n_matches})"
+
+
+    def __str__ (self):
+
+        return repr(self)
@@ -0,0 +1,2 @@
+from .RankingSnapshot import RankingSnapshot
+from .RankingService import RankingService, build_snapshot
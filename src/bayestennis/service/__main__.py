@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+from .RankingService import RankingService
+from .RankingSnapshot import RankingSnapshot
+
+
+def main():
+
+    parser = argparse.ArgumentParser(prog='python -m bayestennis.service', description="Serve rankings over HTTP/JSON, re-optimizing when the CSV files change.")
+    parser.add_argument('file_paths', nargs='*', help="Notion CSV files to watch. Notation with '*' is supported (quote it).")
+    parser.add_argument('--snapshot', default=None, help="Directory of a TennisUniverse saved with TennisUniverse.save, served as initial ranking (loaded without torch).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--poll-interval', type=float, default=5., help="Seconds between checks of the watched files.")
+    parser.add_argument('--n-iter', type=int, default=1000, help="Number of optimization iterations.")
+    args = parser.parse_args()
+    if not args.file_paths and args.snapshot is None:
+        parser.error("file_paths or --snapshot is required")
+
+    snapshot = None if args.snapshot is None else RankingSnapshot.load(args.snapshot)
+    service = RankingService(args.file_paths, host=args.host, port=args.port, poll_interval=args.poll_interval, optimize_kwargs={'n_iter': args.n_iter}, snapshot=snapshot)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from typing import Sequence
+
+
+async def run_load_test (host: str, port: int, targets: Sequence[str], n_requests: int = 10000, concurrency: int = 32) -> np.ndarray:
+    """
+    Send GET requests to a RankingService and measure their latencies.
+
+    Description:
+        concurrency clients each open one keep-alive connection, and send requests one after the
+        other, cycling through targets, until n_requests requests are answered.
+
+    Args:
+        host : str
+            Host of the service.
+        port : int
+            Port of the service.
+        targets : Sequence[str]
+            Request targets, e.g. '/rankings?k=10'.
+        n_requests : int = 10000
+            Total number of requests.
+        concurrency : int = 32
+            Number of concurrent clients.
+
+    Returns:
+        latencies : np.ndarray[float] (n_requests,)
+            Latency of each request, in seconds.
+    """
+
+    latencies = []
+    counter = iter(range(n_requests))
+
+    async def client ():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                target = targets[i % len(targets)]
+                t_start = time.perf_counter()
+                writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+                await writer.drain()
+                content_length = 0
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("Connection closed by the service")
+                while (line := await reader.readline()) not in (b'\r\n', b''):
+                    key, _, value = line.decode('latin-1').partition(':')
+                    if key.strip().lower() == 'content-length':
+                        content_length = int(value)
+                await reader.readexactly(content_length)
+                latencies.append(time.perf_counter() - t_start)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+
+    return np.array(latencies)
+
+
+def print_latency_report (latencies: np.ndarray, duration: float) -> None:
+    """
+    Print the throughput and the p50/p99 latencies.
+    """
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+    print(f"{len(latencies)} requests in {duration:.2f} s ({len(latencies)/duration:.0f} req/s)")
+    print(f"latency p50 = {p50:.3f} ms, p99 = {p99:.3f} ms, max = {latencies.max()*1e3:.3f} ms")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(prog='python -m bayestennis.service.load_test', description="Load test a running RankingService, reporting p50/p99 latencies.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--n-requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--player-ids', type=int, nargs=4, default=[0, 1, 2, 3], help="Players used in /players and /prob_teamA_wins requests.")
+    args = parser.parse_args()
+
+    a, b, c, d = args.player_ids
+    targets = ['/rankings?k=10', f'/players/{a}', f'/prob_teamA_wins?teamA={a}&teamB={b}', f'/prob_teamA_wins?teamA={a},{b}&teamB={c},{d}']
+
+    t_start = time.perf_counter()
+    latencies = asyncio.run(run_load_test(args.host, args.port, targets, args.n_requests, args.concurrency))
+    print_latency_report(latencies, time.perf_counter() - t_start)
+
+
+if __name__ == '__main__':
+    main()
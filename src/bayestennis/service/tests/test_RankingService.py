@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.service import RankingService
+from bayestennis.service.load_test import run_load_test, print_latency_report
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+
+
+async def get (port: int, target: str):
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+async def run (watch_dir: Path):
+
+    example_file_path = Path(__file__).resolve().parents[2] / "tests" / "notion_database_example.csv"
+    shutil.copy(example_file_path, watch_dir / "2023.csv")
+
+    service = RankingService([str(watch_dir / "*.csv")], port=0, poll_interval=0.1, optimize_kwargs={'n_iter': 200})
+    await service.start()
+
+    status_health, health = await get(service.port, '/health')
+    while service.snapshot is None:
+        await asyncio.sleep(0.1)
+
+    status_rankings, rankings = await get(service.port, '/rankings?k=5')
+    status_player, player = await get(service.port, '/players/0')
+    status_single, single = await get(service.port, '/prob_teamA_wins?teamA=0&teamB=1')
+    status_double, double = await get(service.port, '/prob_teamA_wins?teamA=0,1&teamB=2,3')
+    status_unknown, unknown = await get(service.port, '/players/100000')
+    status_bad, bad = await get(service.port, '/prob_teamA_wins?teamA=0')
+
+    # A new file lands while the service is under load: reads keep being served during re-optimization
+    targets = ['/rankings?k=10', '/players/0', '/prob_teamA_wins?teamA=0&teamB=1', '/prob_teamA_wins?teamA=0,1&teamB=2,3']
+    shutil.copy(example_file_path, watch_dir / "2024.csv")
+    t_start = time.perf_counter()
+    latencies = await run_load_test('127.0.0.1', service.port, targets, n_requests=5000, concurrency=16)
+    print_latency_report(latencies, time.perf_counter() - t_start)
+    while service.snapshot.version < 2:
+        await asyncio.sleep(0.1)
+    status_after, after = await get(service.port, '/health')
+
+    await service.stop()
+
+    BREAKPOINT_ME = 0
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    with tempfile.TemporaryDirectory() as watch_dir:
+        asyncio.run(run(Path(watch_dir)))
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,133 @@
+import torch
+from typing import Optional, Tuple, Union, Sequence
+from .scoring_systems.base import ScoringSystem
+from .utils import as_torch_tensor
+
+
+def simulate_round_robin (
+        scoring_system: ScoringSystem,
+        abilities: Union[torch.Tensor, Sequence[float]],
+        n_simulations: int = 10000,
+        generator: Optional[torch.Generator] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Simulate a round-robin group, sampling the full score of every match.
+
+    Description:
+        All the pairs of players play each other once. The scores of the n_players*(n_players-1)/2
+        matches are sampled n_simulations times in a single vectorized call of the scoring system,
+        then the group standings are computed in bulk with get_round_robin_standings.
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system used to sample scores.
+        abilities : torch.Tensor[torch.float] (n_players,)
+            Abilities of the players of the group.
+        n_simulations : int = 10000
+            Number of simulations.
+        generator : torch.Generator | None = None
+            Random number generator used for sampling.
+
+    Returns:
+        positions : torch.Tensor[torch.long] (n_simulations, n_players)
+            positions[s, i] is the final position (0 = first) of the i-th player in the s-th simulation.
+        wins : torch.Tensor[torch.long] (n_simulations, n_players)
+            wins[s, i] is the number of matches won by the i-th player in the s-th simulation.
+    """
+
+    # As torch tensor
+    abilities = as_torch_tensor(abilities, torch.float, device=scoring_system.device)
+    assert abilities.ndim == 1, "abilities.shape must be (n_players,)"
+
+    # All the matches of the group: player_i (team A) vs player_j (team B)
+    n_players = abilities.shape[0]
+    idx_teamA, idx_teamB = torch.triu_indices(n_players, n_players, offset=1, device=abilities.device)
+
+    # Sample scores: (n_simulations, n_matches, n_score_elements)
+    match_abilities = torch.stack([abilities[idx_teamA], abilities[idx_teamB]], dim=-1)
+    score = scoring_system.sample_score(match_abilities, n_simulations, generator)
+
+    # Standings
+    positions, wins = get_round_robin_standings(scoring_system, score, idx_teamA, idx_teamB, n_players, generator)
+
+    return positions, wins
+
+
+def get_round_robin_standings (
+        scoring_system: ScoringSystem,
+        score: torch.Tensor,
+        idx_teamA: torch.Tensor,
+        idx_teamB: torch.Tensor,
+        n_players: int,
+        generator: Optional[torch.Generator] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Compute round-robin standings in bulk, for many simulations at once.
+
+    Description:
+        Players are ordered with the usual tie-break rules, in this priority order:
+            1. matches won;
+            2. head-to-head result, only when exactly two players are tied on matches won;
+            3. set difference;
+            4. game difference;
+            5. draw.
+        Each rule is applied as a stable sort, from the least to the most important one.
+
+    Args:
+        scoring_system : ScoringSystem
+            The scoring system of the scores.
+        score : torch.Tensor[torch.long] (n_simulations, n_matches, n_score_elements)
+            Normalized scores of the matches.
+        idx_teamA : torch.Tensor[torch.long] (n_matches,)
+            Index of the player of team A of each match.
+        idx_teamB : torch.Tensor[torch.long] (n_matches,)
+            Index of the player of team B of each match.
+        n_players : int
+            Number of players of the group.
+        generator : torch.Generator | None = None
+            Random number generator used for the draw.
+
+    Returns:
+        positions : torch.Tensor[torch.long] (n_simulations, n_players)
+            positions[s, i] is the final position (0 = first) of the i-th player in the s-th simulation.
+        wins : torch.Tensor[torch.long] (n_simulations, n_players)
+            wins[s, i] is the number of matches won by the i-th player in the s-th simulation.
+    """
+
+    n_simulations = score.shape[0]
+    device = score.device
+
+    # Sets and games of each match
+    sets_teamA, sets_teamB, games_teamA, games_teamB = scoring_system.count_sets_and_games(score)
+    has_teamA_won = (sets_teamA > sets_teamB).long()
+
+    # Accumulate per-player statistics
+    def accumulate (value_teamA: torch.Tensor, value_teamB: torch.Tensor) -> torch.Tensor:
+        total = torch.zeros((n_simulations, n_players), dtype=torch.long, device=device)
+        total.index_add_(1, idx_teamA, value_teamA)
+        total.index_add_(1, idx_teamB, value_teamB)
+        return total
+
+    wins = accumulate(has_teamA_won, 1-has_teamA_won)
+    set_difference = accumulate(sets_teamA - sets_teamB, sets_teamB - sets_teamA)
+    game_difference = accumulate(games_teamA - games_teamB, games_teamB - games_teamA)
+
+    # Head-to-head, only between two players tied on matches won
+    has_beaten = torch.zeros((n_simulations, n_players, n_players), dtype=torch.bool, device=device)
+    has_beaten[:, idx_teamA, idx_teamB] = has_teamA_won.bool()
+    has_beaten[:, idx_teamB, idx_teamA] = ~has_teamA_won.bool()
+    is_tied = (wins[:, :, None] == wins[:, None, :]) & ~torch.eye(n_players, dtype=torch.bool, device=device)
+    is_two_way_tie = (is_tied.sum(dim=-1) == 1)
+    head_to_head = (has_beaten & is_tied).sum(dim=-1) * is_two_way_tie
+
+    # Sort with stable sorts, from the least to the most important rule
+    order = torch.argsort(torch.rand((n_simulations, n_players), generator=generator, device=device), dim=1)
+    for key in [game_difference, set_difference, head_to_head, wins]:
+        idx_sort = torch.sort(torch.gather(key, 1, order), dim=1, descending=True, stable=True).indices
+        order = torch.gather(order, 1, idx_sort)
+
+    # From order (players by position) to positions (position of each player)
+    positions = torch.empty_like(order)
+    positions.scatter_(1, order, torch.arange(n_players, device=device).expand(n_simulations, n_players))
+
+    return positions, wins
@@ -1,9 +1,47 @@
+import numpy as np
 import pandas as pd
 from typing import TypeAlias
 
+MAX_SCORE_ELEMENTS = 6
+"""Maximum number of elements of a normalized score, over all the scoring systems."""
+
+SCORE_COLUMNS = [f'score_{i}' for i in range(MAX_SCORE_ELEMENTS)]
+"""Names of the score columns of a TennisDataFrame."""
+
+
+def as_score_array (scores: np.ndarray) -> np.ndarray:
+    """
+    Cast scores to int8, the dtype of the score columns of a TennisDataFrame, checking their range.
+
+    Args:
+        scores : np.ndarray (n_matches, n_score_elements)
+            Scores, of any integer dtype.
+
+    Returns:
+        scores_int8 : np.ndarray (n_matches, n_score_elements)
+            The scores as int8.
+
+    Raises:
+        ValueError: if a score is out of the range of int8 (instead of silently wrapping around).
+    """
+
+    scores = np.asarray(scores)
+    info = np.iinfo(np.int8)
+    is_out_of_range = (scores < info.min) | (scores > info.max)
+    if is_out_of_range.any():
+        i_row = int(np.argwhere(is_out_of_range)[0][0])
+        raise ValueError(f"Score out of the int8 range [{info.min}, {info.max}] in row {i_row}: {scores[i_row].tolist()}")
+
+    return scores.astype(np.int8)
+
+CATEGORICAL_COLUMNS = ['file_name', 'file_path', 'match_type', 'tournament', 'scoring_system', 'teamA_player1_name', 'teamA_player2_name', 'teamB_player1_name', 'teamB_player2_name', 'winner_team']
+"""Columns of a TennisDataFrame with categorical dtype."""
+
 TennisDataFrame: TypeAlias = pd.DataFrame
 """
-A TennisDataFrame is a pandas DataFrame with the following columns:
+A TennisDataFrame is a pandas DataFrame with a columnar layout: scores are stored in int8 columns,
+player identifiers are int32, and names, tournaments and scoring systems are categorical (see
+CATEGORICAL_COLUMNS). It has the following columns:
     - id_match: Unique identifier for each match.
     - file_name: Name of the source file containing the match data.
     - file_path: Path to the source file containing the match data.
@@ -25,7 +63,9 @@ A TennisDataFrame is a pandas DataFrame with the following columns:
     - id_teamB_player2: Unique identifier for player 2 in team B.
     - teamB_player2_name: Name of player 2 in team B.
     - score_AvsB_str: String representation of the score between team A and team B.
-    - normalized_score_AvsB: Score of the match in the normalized format, ready to be processed.
+    - score_0, ..., score_{MAX_SCORE_ELEMENTS-1}: Score of the match in the normalized format of its
+      scoring system, ready to be processed. One int8 column per score element; the columns beyond the
+      n_score_elements of the scoring system are 0.
     - winner_team: Name of the team that won the match ('team A' or 'team B').
 """
 
@@ -48,4 +88,67 @@ OptimizationInfo: TypeAlias = pd.DataFrame
 An OptimizationInfo is a pandas DataFrame with the following columns:
     - idx_iteration : iteration index
     - loss : loss value
+    - batch_size : number of matches the loss was evaluated on (all the matches, or a mini-batch)
+"""
+
+RoundRobinDataFrame: TypeAlias = pd.DataFrame
+"""
+A RoundRobinDataFrame is a pandas DataFrame with the following columns:
+    - id_player : unique player identifier
+    - name : player name
+    - ability : player ability
+    - expected_wins : expected number of matches won in the group
+    - expected_position : expected final position in the group (1 = first)
+    - prob_first : probability of finishing first in the group
+    - prob_qualification : probability of finishing within the qualified positions
+"""
+
+DoublesDataFrame: TypeAlias = pd.DataFrame
+"""
+A DoublesDataFrame is a pandas DataFrame with one row per court and the following columns:
+    - court : court index
+    - id_teamA_player1 : unique identifier for player 1 in team A
+    - teamA_player1_name : name of player 1 in team A
+    - id_teamA_player2 : unique identifier for player 2 in team A
+    - teamA_player2_name : name of player 2 in team A
+    - id_teamB_player1 : unique identifier for player 1 in team B
+    - teamB_player1_name : name of player 1 in team B
+    - id_teamB_player2 : unique identifier for player 2 in team B
+    - teamB_player2_name : name of player 2 in team B
+    - prob_teamA_wins : probability of team A winning the match
+"""
+
+MatchmakingDataFrame: TypeAlias = pd.DataFrame
+"""
+A MatchmakingDataFrame is a pandas DataFrame with one row per opponent and the following columns:
+    - id_player : unique opponent identifier
+    - name : opponent name
+    - ability : opponent ability
+    - ability_difference : ability of the player minus ability of the opponent
+    - prob_teamA_wins : probability of the player (team A) winning a single match against the opponent
+"""
+
+SwissRoundDataFrame: TypeAlias = pd.DataFrame
+"""
+A SwissRoundDataFrame is a pandas DataFrame with one row per match of a Swiss round and the following columns:
+    - board : match index, from the highest to the lowest standing
+    - id_teamA_player1 : unique identifier of the higher-standing player
+    - teamA_player1_name : name of the higher-standing player
+    - teamA_points : current points of the higher-standing player
+    - id_teamB_player1 : unique identifier of the opponent, or -1 for a bye
+    - teamB_player1_name : name of the opponent, or None for a bye
+    - teamB_points : current points of the opponent
+    - prob_teamA_wins : probability of the higher-standing player winning the match (1 for a bye)
+"""
+
+SwissSimulationDataFrame: TypeAlias = pd.DataFrame
+"""
+A SwissSimulationDataFrame is a pandas DataFrame with the following columns:
+    - id_player : unique player identifier
+    - name : player name
+    - ability : player ability
+    - expected_points : expected final number of points
+    - expected_position : expected final position (1 = first)
+    - prob_first : probability of finishing first
+    - prob_top : probability of finishing within the top positions
 """
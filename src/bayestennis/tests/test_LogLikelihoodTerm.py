@@ -23,6 +23,81 @@ def main():
 
     value = mrdodo_logLikelihoodTerm(abilities_tensor)
 
+    # The tensors added are copied: in-place changes by the caller do not change the term
+    player_indices_tensor, weights_tensor = torch.tensor([[0, 0, 1, 1]]), torch.tensor([1.0])
+    logLikelihoodTerm = LogLikelihoodTerm(mrdodo)
+    logLikelihoodTerm.add(torch.tensor(score), player_indices_tensor, weights_tensor)
+    player_indices_tensor[0, 0], weights_tensor[0] = 1, 5.0
+    assert torch.equal(logLikelihoodTerm(abilities_tensor), value)
+
+    # Sparse incidence matrix representation: same value and gradient as the dense one
+    generator = torch.Generator().manual_seed(0)
+    n_players, n_matches = 50, 2000
+    player_indices = torch.stack([torch.randperm(n_players, generator=generator)[:4] for _ in range(n_matches)])
+    is_single = torch.rand(n_matches, generator=generator) < 0.5
+    player_indices[is_single] = player_indices[is_single][:, [0, 0, 2, 2]]
+    abilities = 100 + 5 * torch.randn(n_players, generator=generator)
+    score = torch.cat([mrdodo.sample_score(abilities[player_indices[is_single]][:, [0, 2]], generator=generator)[0],
+                       mrdodo.sample_score(abilities[player_indices[~is_single]], generator=generator)[0]])
+    player_indices = torch.cat([player_indices[is_single], player_indices[~is_single]])
+    weight = torch.rand(n_matches, generator=generator)
+
+    values, gradients = {}, {}
+    for representation in ['dense', 'sparse']:
+        logLikelihoodTerm = LogLikelihoodTerm(MrDodo(), representation=representation)
+        logLikelihoodTerm.add(score[:1000], player_indices[:1000], weight[:1000])
+        logLikelihoodTerm.add(score[1000:], player_indices[1000:], weight[1000:])  # The incidence matrices are rebuilt
+        abilities_tensor = abilities.clone().requires_grad_(True)
+        values[representation] = logLikelihoodTerm(abilities_tensor)
+        values[representation].backward()
+        gradients[representation] = abilities_tensor.grad
+    assert torch.allclose(values['dense'], values['sparse'], rtol=1e-5), values
+    assert torch.allclose(gradients['dense'], gradients['sparse'], rtol=1e-4, atol=1e-4)
+
+    # Singles are stored with 2 non-zeros, doubles with 4
+    incidence_matrix, incidence_matrix_T = logLikelihoodTerm.get_incidence_matrices(n_players)
+    assert incidence_matrix.layout == torch.sparse_csr and incidence_matrix_T.shape == (n_players, n_matches)
+    assert incidence_matrix._nnz() == 2 * int(is_single.sum()) + 4 * int((~is_single).sum())
+    assert logLikelihoodTerm.get_incidence_matrices(n_players)[0] is incidence_matrix  # Cached
+
+    # Score coefficients computed in add: the scores can be dropped
+    logLikelihoodTerm = LogLikelihoodTerm(MrDodo(), keep_scores=False)
+    logLikelihoodTerm.add(score[:1000], player_indices[:1000], weight[:1000])
+    logLikelihoodTerm.add(score[1000:], player_indices[1000:], weight[1000:])
+    assert logLikelihoodTerm.score_tensor is None and logLikelihoodTerm.score_coefficients_tensor.shape == (n_matches, 7)
+    assert torch.allclose(logLikelihoodTerm(abilities), values['dense'], rtol=1e-6)
+
+    # Precision modes: float64 reference, compact storage upcast inside the computations
+    values, gradients = {}, {}
+    for precision in ['float64', 'float32', 'compact']:
+        for representation in ['dense', 'sparse']:
+            logLikelihoodTerm = LogLikelihoodTerm(MrDodo(), representation=representation, precision=precision)
+            logLikelihoodTerm.add(score, player_indices, weight)
+            abilities_tensor = abilities.to(logLikelihoodTerm.dtype, copy=True).requires_grad_(True)
+            values[precision, representation] = logLikelihoodTerm(abilities_tensor)
+            values[precision, representation].backward()
+            gradients[precision, representation] = abilities_tensor.grad.double()
+            assert values[precision, representation].dtype == (torch.float64 if precision == 'float64' else torch.float32)
+        if precision == 'compact':
+            assert logLikelihoodTerm.score_tensor.dtype == torch.int8 and logLikelihoodTerm.player_indices_tensor.dtype == torch.int32
+            assert logLikelihoodTerm.get_n_bytes() == n_matches * (6 + 7*2 + 4*4 + 2)
+    for key, value in values.items():
+        rtol = 1e-4 if key[0] == 'compact' else 1e-6
+        assert torch.allclose(value.double(), values['float64', 'dense'], rtol=rtol), (key, value)
+        assert torch.allclose(gradients[key], gradients['float64', 'dense'], rtol=10*rtol, atol=10*rtol), key
+
+    try:
+        LogLikelihoodTerm(mrdodo, precision='float16')
+        raise AssertionError("precision='float16' should raise ValueError")
+    except ValueError:
+        pass
+
+    try:
+        LogLikelihoodTerm(mrdodo, representation='csr')
+        raise AssertionError("representation='csr' should raise ValueError")
+    except ValueError:
+        pass
+
     BREAKPOINT_ME = 0
 
 
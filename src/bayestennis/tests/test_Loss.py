@@ -3,6 +3,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
 import torch
 from bayestennis.Loss import Loss
+from bayestennis.scoring_systems import MrDodo
 
 
 def main():
@@ -28,6 +29,82 @@ def main():
 
     loss_value = loss(abilities)
 
+    # Fused evaluation of the scoring systems: same value and gradient
+    generator = torch.Generator().manual_seed(0)
+    n_players, n_matches = 40, 1000
+    player_indices = torch.stack([torch.randperm(n_players, generator=generator)[:4] for _ in range(n_matches)])
+    abilities = 100 + 5 * torch.randn(n_players, generator=generator)
+    score = MrDodo().sample_score(abilities[player_indices], generator=generator)[0]
+    weight = torch.rand(n_matches, generator=generator)
+    for representation in ['dense', 'sparse']:
+        values, gradients = {}, {}
+        for fused in [False, True]:
+            loss = Loss(representation=representation, precision='float64', fused=fused)
+            loss.add('MrDodo', score[:600], player_indices[:600], weight[:600])
+            loss.add('Toringo', score[600:800], player_indices[600:800], weight[600:800])
+            abilities_tensor = abilities.double().requires_grad_(True)
+            loss(abilities_tensor)
+            loss.add('MrDodo', score[800:], player_indices[800:], weight[800:])  # The fused term is rebuilt
+            values[fused] = loss(abilities_tensor)
+            values[fused].backward()
+            gradients[fused] = abilities_tensor.grad
+        assert torch.allclose(values[True], values[False], rtol=1e-12), values
+        assert torch.allclose(gradients[True], gradients[False], rtol=1e-10, atol=1e-10)
+
+    # The set tie-break and the point are computed once over all the matches, the games of MrDodo and Toringo separately
+    fused_logLikelihoodTerm, = loss.get_evaluated_terms()
+    units = fused_logLikelihoodTerm.scoring_system.units
+    assert [[(start, stop) for _, start, stop in runs] for runs in units] == [[(0, 800), (800, 1000)], [(0, 1000)], [(0, 1000)]]
+    assert fused_logLikelihoodTerm.n_matches == n_matches
+
+    # Evaluation on a thread pool, chunk by chunk: same value and gradient, reproducible
+    loss_reference = Loss(precision='float64')
+    loss_reference.add('MrDodo', score[:800], player_indices[:800], weight[:800])
+    loss_reference.add('Toringo', score[800:], player_indices[800:], weight[800:])
+    for loss in [Loss(precision='float64', n_workers=3, chunk_size=150), Loss(precision='float64', n_workers=2, fused=True, chunk_size=300)]:
+        loss.add('MrDodo', score[:800], player_indices[:800], weight[:800])
+        loss.add('Toringo', score[800:], player_indices[800:], weight[800:])
+        values, gradients = [], []
+        for _ in range(2):
+            abilities_tensor = abilities.double().requires_grad_(True)
+            values.append(loss(abilities_tensor))
+            values[-1].backward()
+            gradients.append(abilities_tensor.grad)
+        assert values[0] == values[1] and torch.equal(gradients[0], gradients[1])
+        abilities_tensor = abilities.double().requires_grad_(True)
+        value_reference = loss_reference(abilities_tensor)
+        value_reference.backward()
+        assert torch.allclose(values[0], value_reference, rtol=1e-12)
+        assert torch.allclose(gradients[0], abilities_tensor.grad, rtol=1e-10, atol=1e-10)
+        with torch.no_grad():
+            assert torch.allclose(loss(abilities), loss_reference(abilities), rtol=1e-6)
+    assert len(loss.get_evaluated_terms()) == 4  # 1000 matches, chunks of 300 spanning MrDodo and Toringo
+
+    # Mini-batches share the thread pool of the loss, which only the loss shuts down
+    minibatch = loss.get_minibatch(200, generator=torch.Generator().manual_seed(0))
+    minibatch(abilities.double())
+    minibatch.close()
+    assert loss._executor is not None
+    loss.close()
+    assert loss._executor is None
+    assert torch.allclose(loss(abilities.double()), values[0], rtol=1e-12)  # A new thread pool
+    with loss:
+        loss(abilities.double())
+    assert loss._executor is None
+
+    # Fused and compiled chunks: one compiled function for all the chunks, no recompilation per chunk
+    with Loss(precision='float64', n_workers=2, fused=True, compile=True, chunk_size=100) as loss:
+        loss.add('MrDodo', score[:800], player_indices[:800], weight[:800])
+        loss.add('Toringo', score[800:], player_indices[800:], weight[800:])
+        n_frames = torch._dynamo.utils.counters['frames']['ok']
+        abilities_tensor = abilities.double().requires_grad_(True)
+        value = loss(abilities_tensor)
+        value.backward()
+        assert len(loss.get_evaluated_terms()) == 10 and all(term.scoring_system.is_compiled for term in loss.get_evaluated_terms())
+        assert torch._dynamo.utils.counters['frames']['ok'] - n_frames < 10
+        assert torch.allclose(value, value_reference, rtol=1e-12)
+        assert torch.allclose(abilities_tensor.grad, gradients[0], rtol=1e-10, atol=1e-10)
+
     BREAKPOINT_ME = 0
 
 
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.MatchmakingIndex import MatchmakingIndex
+from bayestennis.io import import_notion_csv
+from datetime import datetime
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parent / "notion_database_example.csv")
+    tdf = import_notion_csv(file_path)
+
+    tu = TennisUniverse(tdf)
+    tu.optimize(verbose=0)
+
+    index = MatchmakingIndex(tu.playersDataFrame)
+
+    opponents = index.query(0, k=10)
+    opponents_singles = index.query(0, k=10, min_singles=2)
+    opponents_active = index.query(0, k=10, active_since=datetime(2023, 9, 1))
+
+    index.update(0, 105.0)
+    opponents_after_update = index.query(0, k=10)
+
+    index.update(1000, 100.0, name="New Player")
+    opponents_new_player = index.query(1000, k=5)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
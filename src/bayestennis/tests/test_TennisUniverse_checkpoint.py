@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.io import import_notion_csv
+import tempfile
+import torch
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parent / "notion_database_example.csv")
+    tdf = import_notion_csv(file_path)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        checkpoint_path = Path(directory) / "checkpoint.pt"
+
+        # Uninterrupted optimization, checkpointing every 70 iterations: the last checkpoint is at iteration 140
+        tu = TennisUniverse(tdf)
+        optimization_info = tu.optimize(n_iter=200, verbose=0, checkpoint_path=checkpoint_path, checkpoint_every_iter=70)
+
+        # Resume from the checkpoint in a new TennisUniverse, as after a crash
+        tu_resumed = TennisUniverse(tdf)
+        optimization_info_resumed = tu_resumed.optimize(n_iter=200, verbose=0, resume_from=checkpoint_path)
+
+        assert torch.equal(tu_resumed.abilities_tensor, tu.abilities_tensor)
+        assert optimization_info_resumed.equals(optimization_info)
+
+        # Checkpoints written before mini-batches (without their settings, generator and batch_size column) are resumed
+        checkpoint = torch.load(checkpoint_path, weights_only=False)
+        for key in ['batch_size', 'batch_growth', 'weighted_sampling', 'generator']:
+            del checkpoint[key]
+        del checkpoint['optimization_info']['batch_size']
+        torch.save(checkpoint, checkpoint_path)
+        optimization_info_resumed = TennisUniverse(tdf).optimize(n_iter=200, verbose=0, resume_from=checkpoint_path)
+        assert optimization_info_resumed.equals(optimization_info)
+
+        # Resuming with different settings is refused
+        try:
+            tu_resumed.optimize(n_iter=300, verbose=0, resume_from=checkpoint_path)
+            raise AssertionError("ValueError expected")
+        except ValueError:
+            pass
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.LogLikelihoodTerm import LogLikelihoodTerm
+from bayestennis.benchmark import get_synthetic_tennisDataFrame
+from bayestennis.utils import CompiledFunction
+import torch
+import warnings
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    tdf = get_synthetic_tennisDataFrame(n_players=50, n_matches=2000)
+
+    # Compiled loss: same value and gradient as in eager mode
+    tu = TennisUniverse(tdf)
+    tu_compiled = TennisUniverse(tdf, compile=True)
+    abilities = 100 + 5 * torch.randn(len(tu.playersDataFrame), generator=torch.Generator().manual_seed(0))
+    values, gradients = [], []
+    for tennisUniverse in [tu, tu_compiled]:
+        abilities_tensor = abilities.clone().requires_grad_(True)
+        values.append(tennisUniverse.loss(abilities_tensor))
+        values[-1].backward()
+        gradients.append(abilities_tensor.grad)
+    assert all(term.scoring_system.is_compiled for term in tu_compiled.loss.logLikelihoodTerms.values())
+    assert torch.allclose(values[0], values[1], rtol=1e-5), values
+    assert torch.allclose(gradients[0], gradients[1], rtol=1e-4, atol=1e-4)
+
+    # Dynamic match dimension: more matches do not recompile
+    n_frames = torch._dynamo.utils.counters['frames']['ok']
+    term = next(iter(tu_compiled.loss.logLikelihoodTerms.values()))
+    term.add(term.score_tensor[:100], term.player_indices_tensor[:100], term.weights_tensor[:100])
+    tu_compiled.loss(abilities.clone().requires_grad_(True)).backward()
+    assert torch._dynamo.utils.counters['frames']['ok'] == n_frames
+
+    tu_compiled.optimize(n_iter=10, verbose=0)
+
+    # Fused terms: one compiled function shared by the fused scoring systems with the same units,
+    # new fused terms of other sizes do not recompile
+    tdf['scoring_system'] = tdf['scoring_system'].astype(object)
+    tdf.loc[tdf.index % 4 == 0, 'scoring_system'] = 'Toringo'
+    tu = TennisUniverse(tdf, precision='float64')
+    terms = list(tu.loss.logLikelihoodTerms.values())
+    abilities = abilities.double()
+    for n_matches in [300, 200, 100]:
+        fused_term = LogLikelihoodTerm.fuse([term.get_chunk(0, n_matches) for term in terms], compile=True)
+        fused_term_eager = LogLikelihoodTerm.fuse([term.get_chunk(0, n_matches) for term in terms])
+        values, gradients = [], []
+        for logLikelihoodTerm in [fused_term_eager, fused_term]:
+            abilities_tensor = abilities.clone().requires_grad_(True)
+            values.append(logLikelihoodTerm(abilities_tensor))
+            values[-1].backward()
+            gradients.append(abilities_tensor.grad)
+        assert fused_term.scoring_system.is_compiled
+        assert torch.allclose(values[0], values[1], rtol=1e-12) and torch.allclose(gradients[0], gradients[1], rtol=1e-10, atol=1e-10)
+        if n_matches == 300:
+            n_frames = torch._dynamo.utils.counters['frames']['ok']
+    assert torch._dynamo.utils.counters['frames']['ok'] == n_frames
+
+    # Fallback to eager mode
+    compiled_function = CompiledFunction(lambda x: 2 * x)
+    def fail (x):
+        raise RuntimeError("compilation failed")
+    compiled_function.compiled_function = fail
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter('always')
+        assert torch.equal(compiled_function(torch.ones(3)), 2 * torch.ones(3))
+    assert compiled_function.compiled_function is None and len(caught_warnings) == 1
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+import tempfile
+import torch
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.benchmark import get_synthetic_tennisDataFrame
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    tdf = get_synthetic_tennisDataFrame(n_players=50, n_matches=5000)
+    tdf['scoring_system'] = tdf['scoring_system'].astype(object)
+    tdf.loc[tdf.index % 4 == 0, 'scoring_system'] = 'Toringo'
+    tu = TennisUniverse(tdf, precision='float64')
+    n_matches = len(tdf)
+
+    # Mini-batch losses are unbiased estimates of the loss, uniform or weight-proportional sampling
+    generator = torch.Generator().manual_seed(0)
+    abilities = 100 + 5 * torch.randn(len(tu.playersDataFrame), generator=generator, dtype=torch.float64)
+    with torch.no_grad():
+        loss_value = tu.loss(abilities).item()
+        regularization = tu.loss.regularizationTerm(abilities).item()
+        for weighted in [False, True]:
+            minibatch_values = torch.tensor([tu.loss.get_minibatch(500, weighted=weighted, generator=generator)(abilities).item() for _ in range(400)], dtype=torch.float64)
+            assert abs(minibatch_values.mean().item() - loss_value) < 4 * minibatch_values.std().item() / 20  # 4 standard errors
+            assert abs(minibatch_values.mean().item() - loss_value) < 1e-2 * (loss_value - regularization)
+
+    # Reference optimum
+    tu.optimize(n_iter=3000, lr_end=1e-4, verbose=0)
+    abilities_optimum = tu.abilities_tensor.clone()
+
+    # Stochastic optimization: growing mini-batches, full batch at the end, close to the optimum with fewer passes
+    optimization_info_full = tu.optimize(n_iter=1000, verbose=0)
+    error_full = (tu.abilities_tensor - abilities_optimum).abs().max().item()
+    for weighted_sampling in [False, True]:
+        optimization_info = tu.optimize(n_iter=2000, verbose=0, batch_size=100, weighted_sampling=weighted_sampling, seed=0)
+        assert optimization_info['batch_size'].iloc[0] == 100 and optimization_info['batch_size'].iloc[-1] == n_matches
+        assert optimization_info['batch_size'].is_monotonic_increasing
+        assert optimization_info['batch_size'].sum() < 0.75 * optimization_info_full['batch_size'].sum()
+        assert (tu.abilities_tensor - abilities_optimum).abs().max().item() < error_full
+
+    # Reproducible with a seed, and resumed with identical results
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint_path = Path(directory) / "checkpoint.pt"
+        optimization_info = tu.optimize(n_iter=200, verbose=0, batch_size=100, batch_growth=1.01, seed=1, checkpoint_path=checkpoint_path, checkpoint_every_iter=70)
+        abilities_tensor = tu.abilities_tensor.clone()
+        assert tu.optimize(n_iter=200, verbose=0, batch_size=100, batch_growth=1.01, seed=1).equals(optimization_info)
+        assert torch.equal(tu.abilities_tensor, abilities_tensor)
+        optimization_info_resumed = tu.optimize(n_iter=200, verbose=0, batch_size=100, batch_growth=1.01, seed=1, resume_from=checkpoint_path)
+        assert optimization_info_resumed.equals(optimization_info)
+        assert torch.equal(tu.abilities_tensor, abilities_tensor)
+
+    # Fused and compiled: the mini-batches share one compiled function, no recompilation per mini-batch
+    tu_fused = TennisUniverse(tdf, precision='float64', fused=True)
+    optimization_info_fused = tu_fused.optimize(n_iter=20, verbose=0, batch_size=100, batch_growth=1.2, seed=2)
+    tu_compiled = TennisUniverse(tdf, precision='float64', fused=True, compile=True)
+    tu_compiled.optimize(n_iter=1, verbose=0, batch_size=100, seed=2)  # Compilation
+    n_frames = torch._dynamo.utils.counters['frames']['ok']
+    optimization_info_compiled = tu_compiled.optimize(n_iter=20, verbose=0, batch_size=100, batch_growth=1.2, seed=2)
+    assert torch._dynamo.utils.counters['frames']['ok'] == n_frames
+    assert optimization_info_compiled['batch_size'].nunique() > 10
+    assert (optimization_info_compiled['loss'] - optimization_info_fused['loss']).abs().max() < 1e-8 * optimization_info_fused['loss'].abs().max()
+    assert torch.allclose(tu_compiled.abilities_tensor, tu_fused.abilities_tensor, rtol=0, atol=1e-8)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.io import import_notion_csv
+from bayestennis.utils import TicToc
+import tempfile
+import torch
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parent / "notion_database_example.csv")
+    tdf = import_notion_csv(file_path)
+
+    tu = TennisUniverse(tdf)
+    tu.optimize(n_iter=200, verbose=0)
+
+    with tempfile.TemporaryDirectory() as path:
+
+        tu.save(path)
+
+        timer = TicToc()
+        timer.tic()
+        tu_loaded = TennisUniverse.load(path, mmap=True)
+        timer.toc()
+
+        assert tu_loaded.playersDataFrame.equals(tu.playersDataFrame)
+        assert torch.equal(tu_loaded.abilities_tensor, tu.abilities_tensor)
+        for scoring_system_name, logLikelihoodTerm in tu.loss.logLikelihoodTerms.items():
+            logLikelihoodTerm_loaded = tu_loaded.loss.logLikelihoodTerms[scoring_system_name]
+            assert torch.equal(logLikelihoodTerm_loaded.score_tensor, logLikelihoodTerm.score_tensor)
+            assert torch.equal(logLikelihoodTerm_loaded.player_indices_tensor, logLikelihoodTerm.player_indices_tensor)
+            assert torch.equal(logLikelihoodTerm_loaded.weights_tensor, logLikelihoodTerm.weights_tensor)
+        assert tu_loaded.loss(tu.abilities_tensor) == tu.loss(tu.abilities_tensor)
+        assert tu_loaded.representation == 'dense'
+
+        # Loaded with the sparse representation
+        tu_sparse = TennisUniverse.load(path, mmap=True, representation='sparse')
+        assert all(term.representation == 'sparse' for term in tu_sparse.loss.logLikelihoodTerms.values())
+        assert torch.isclose(tu_sparse.loss(tu.abilities_tensor), tu.loss(tu.abilities_tensor), rtol=1e-5)
+
+        # Optimizer state
+        for key, value in tu.optimizer_state_dict['state'][0].items():
+            assert torch.equal(tu_loaded.optimizer_state_dict['state'][0][key], value)
+
+        # Loaded universes can be optimized again
+        tu_loaded.optimize(n_iter=10, verbose=0)
+
+    # Precision modes: optimized in float64, saved and loaded in compact storage
+    tu_float64 = TennisUniverse(tdf, precision='float64')
+    tu_float64.optimize(n_iter=200, verbose=0)
+    assert tu_float64.abilities_tensor.dtype == torch.float64
+    assert torch.allclose(tu_float64.abilities_tensor.float(), tu.abilities_tensor, atol=1e-3)
+    tu_compact = TennisUniverse(tdf, precision='compact')
+    with tempfile.TemporaryDirectory() as path:
+        tu_compact.save(path)
+        tu_compact_loaded = TennisUniverse.load(path, mmap=True)
+        assert tu_compact_loaded.precision == 'compact'
+        assert all(term.score_tensor.dtype == torch.int8 for term in tu_compact_loaded.loss.logLikelihoodTerms.values())
+        assert tu_compact_loaded.loss(tu.abilities_tensor) == tu_compact.loss(tu.abilities_tensor)
+        assert torch.isclose(tu_compact_loaded.loss(tu.abilities_tensor), tu.loss(tu.abilities_tensor), rtol=1e-4)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+from bayestennis.cli import main as cli_main, EXIT_OK, EXIT_ERROR, EXIT_USAGE, EXIT_NO_DATA
+from bayestennis.service.RankingSnapshot import RankingSnapshot
+import json
+import numpy as np
+import pandas as pd
+import tempfile
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    file_path = str(Path(__file__).resolve().parents[1] / "io" / "tests" / "notion_database_example.csv")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        # rank: ranking sorted by rank, snapshot and timings
+        exit_code = cli_main(['rank', file_path, '-o', str(tmp_dir / 'ranking.csv'), '--n-iter', '50', '--save-snapshot', str(tmp_dir / 'snapshot'), '--timings', str(tmp_dir / 'timings.json'), '--threads', '1'])
+        assert exit_code == EXIT_OK
+        ranking = pd.read_csv(tmp_dir / 'ranking.csv')
+        assert ranking['rank'].is_monotonic_increasing and len(ranking) > 0
+        timings = json.loads((tmp_dir / 'timings.json').read_text())
+        assert timings['command'] == 'rank' and timings['exit_code'] == EXIT_OK
+        assert set(timings['seconds']) == {'import', 'optimize', 'write', 'total'}
+
+        # predict: same probabilities as the snapshot, empty for unknown players
+        id_players = ranking['id_player'].tolist()
+        matches = pd.DataFrame({
+            'id_teamA_player1': [id_players[0], id_players[0], id_players[0]],
+            'id_teamA_player2': [None, id_players[1], id_players[1]],
+            'id_teamB_player1': [id_players[2], id_players[2], -5],
+            'id_teamB_player2': [None, id_players[3], id_players[3]],
+        }).astype('Int64')
+        matches.to_csv(tmp_dir / 'matches.csv', index=False)
+        exit_code = cli_main(['predict', str(tmp_dir / 'snapshot'), str(tmp_dir / 'matches.csv'), '-o', str(tmp_dir / 'predictions.parquet')])
+        assert exit_code == EXIT_OK
+        predictions = pd.read_parquet(tmp_dir / 'predictions.parquet')
+        snapshot = RankingSnapshot.load(tmp_dir / 'snapshot')
+        assert np.isclose(predictions['prob_teamA_wins'][0], snapshot.prob_teamA_wins([id_players[0]], [id_players[2]]))
+        assert np.isclose(predictions['prob_teamA_wins'][1], snapshot.prob_teamA_wins(id_players[:2], id_players[2:4]))
+        assert np.isnan(predictions['prob_teamA_wins'][2])
+
+        # Exit codes
+        assert cli_main(['rank', str(tmp_dir / 'missing_*.csv'), '-o', str(tmp_dir / 'ranking.csv')]) == EXIT_NO_DATA
+        assert cli_main(['rank', file_path, '-o', str(tmp_dir / 'ranking.txt')]) == EXIT_ERROR
+        assert cli_main(['predict', str(tmp_dir / 'missing'), str(tmp_dir / 'matches.csv'), '-o', str(tmp_dir / 'predictions.csv')]) == EXIT_ERROR
+        assert cli_main(['rank']) == EXIT_USAGE
+        assert cli_main(['unknown-command']) == EXIT_USAGE
+
+        # bench: results as JSON
+        exit_code = cli_main(['bench', '-o', str(tmp_dir / 'bench.json'), '--n-players', '50', '--n-matches', '500', '--n-iter', '5', '--n-repeat', '1'])
+        assert exit_code == EXIT_OK
+        results = json.loads((tmp_dir / 'bench.json').read_text())
+        assert results['n_matches'] == 500 and results['seconds']['optimize'] > 0
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+import torch
+from bayestennis.TennisUniverse import TennisUniverse
+from bayestennis.benchmark import get_synthetic_tennisDataFrame
+from bayestennis.distributed import get_shards, get_shard_options, get_shard_loss, optimize_data_parallel
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    tdf = get_synthetic_tennisDataFrame(n_players=50, n_matches=1000)
+    tdf['scoring_system'] = tdf['scoring_system'].astype(object)
+    tdf.loc[tdf.index % 4 == 0, 'scoring_system'] = 'Toringo'
+    tu = TennisUniverse(tdf, precision='float64')
+
+    # The losses of the shards sum to the loss: log-likelihood split, regularization counted once
+    n_processes = 3
+    abilities = 100 + 5 * torch.randn(len(tu.playersDataFrame), generator=torch.Generator().manual_seed(0), dtype=torch.float64)
+    shards = get_shards(tu.loss, n_processes)
+    assert sum(shard[1].shape[0] for shard_matches in shards for shard in shard_matches) == 1000
+    shard_losses = [get_shard_loss(get_shard_options(tu.loss, n_processes), shard) for shard in shards]
+    assert torch.allclose(sum(shard_loss(abilities) for shard_loss in shard_losses), tu.loss(abilities), rtol=1e-12)
+
+    # Data-parallel optimization on 3 local processes: same results as in this process
+    optimization_info = tu.optimize(n_iter=100, verbose=0)
+    abilities_tensor, playersDataFrame = tu.abilities_tensor.clone(), tu.playersDataFrame.copy()
+    optimization_info_parallel = tu.optimize(n_iter=100, verbose=0, n_processes=n_processes)
+    assert torch.allclose(tu.abilities_tensor, abilities_tensor, rtol=0, atol=1e-10)
+    assert (optimization_info_parallel['loss'] - optimization_info['loss']).abs().max() < 1e-8
+    assert list(optimization_info_parallel.columns) == list(optimization_info.columns)  # Same schema, batch_size included
+    assert optimization_info_parallel['batch_size'].equals(optimization_info['batch_size'])
+    assert tu.playersDataFrame['rank'].equals(playersDataFrame['rank'])
+
+    # Scaling efficiency with respect to a single process
+    seconds = {n: optimize_data_parallel(tu.loss, len(tu.playersDataFrame), n, n_iter=100, verbose=0)['seconds'] for n in [1, 2]}
+    print(f"Data-parallel scaling efficiency, 2 processes: {seconds[1] / seconds[2] / 2:.2f}")
+
+    # Checkpointing is not supported
+    try:
+        tu.optimize(n_iter=100, verbose=0, n_processes=2, checkpoint_path="checkpoint.pt", checkpoint_every_iter=10)
+        assert False, "checkpointing with n_processes > 1 should raise"
+    except ValueError:
+        pass
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+import subprocess
+
+IMPORT_TIME_BUDGET_SECONDS = 0.25
+"""Budget of `import bayestennis`, without the interpreter startup. Heavy dependencies are lazy."""
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    # Fresh interpreter, so that nothing is imported yet. Best of 3 runs, to be robust to a busy machine
+    code = (
+        "import sys, time\n"
+        "tic = time.perf_counter()\n"
+        "import bayestennis\n"
+        "print(time.perf_counter() - tic)\n"
+        "print(','.join(name for name in ['torch', 'pandas', 'scipy', 'bayestennis.io'] if name in sys.modules))\n"
+    )
+    import_times = []
+    for _ in range(3):
+        result = subprocess.run([sys.executable, "-c", code], cwd=str(Path(__file__).resolve().parents[2]), capture_output=True, text=True, check=True)
+        import_time, eagerly_imported = result.stdout.splitlines()
+        import_times.append(float(import_time))
+        assert eagerly_imported == "", f"`import bayestennis` imports {eagerly_imported}"
+
+    assert min(import_times) < IMPORT_TIME_BUDGET_SECONDS, f"`import bayestennis` takes {min(import_times):.3f} s, budget {IMPORT_TIME_BUDGET_SECONDS} s"
+
+    # Lazy attributes are the same objects as the eager ones
+    code = (
+        "import bayestennis\n"
+        "from bayestennis.TennisUniverse import TennisUniverse\n"
+        "from bayestennis.io import import_notion_csv\n"
+        "assert bayestennis.TennisUniverse is TennisUniverse\n"
+        "assert bayestennis.io.import_notion_csv is import_notion_csv\n"
+        "assert bayestennis.scoring_systems.MrDodo.__name__ == 'MrDodo'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=str(Path(__file__).resolve().parents[2]), check=True)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
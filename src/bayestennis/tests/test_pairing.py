@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+import torch
+from bayestennis.pairing import enumerate_doubles_assignments, balanced_doubles_exact, balanced_doubles_local_search, get_doubles_unbalance_function
+from bayestennis.pairing import min_weight_perfect_matching, get_swiss_standings, swiss_pairings, simulate_swiss
+from bayestennis.scoring_systems import MrDodo
+from bayestennis.utils import TicToc
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    mrdodo = MrDodo()
+    unbalance = get_doubles_unbalance_function(mrdodo)
+    timer = TicToc()
+
+    # Exact enumeration, small number of players
+    assignments = enumerate_doubles_assignments(8)  # (315, 2, 4)
+    abilities = torch.tensor([104, 102, 101, 100, 100, 99, 97, 95, 93, 103, 100, 98], dtype=torch.float)
+    timer.tic()
+    assignment_exact = balanced_doubles_exact(mrdodo, abilities)
+    timer.toc()
+    assignment_local_search = balanced_doubles_local_search(mrdodo, abilities)
+
+    ability_difference_exact = (abilities[assignment_exact[:, :2]].sum(dim=1) - abilities[assignment_exact[:, 2:]].sum(dim=1)) / 2
+    ability_difference_local_search = (abilities[assignment_local_search[:, :2]].sum(dim=1) - abilities[assignment_local_search[:, 2:]].sum(dim=1)) / 2
+    total_unbalance_exact = unbalance(ability_difference_exact).sum()
+    total_unbalance_local_search = unbalance(ability_difference_local_search).sum()
+
+    # Local search, hundreds of players
+    abilities = 100 + 3 * torch.randn(400)
+    timer.tic()
+    assignment_local_search = balanced_doubles_local_search(mrdodo, abilities)
+    timer.toc()
+
+    # Swiss pairings, hundreds of players: first and second round
+    abilities = 100 + 3 * torch.randn(301)
+    points, buchholz, has_played = get_swiss_standings(301, torch.empty((0, 2), dtype=torch.long).numpy())
+    timer.tic()
+    pairs, idx_bye = swiss_pairings(points, abilities.numpy(), has_played)
+    timer.toc()
+    results = torch.cat([torch.tensor(pairs), torch.tensor([[idx_bye, -1]])]).numpy()
+    points, buchholz, has_played = get_swiss_standings(301, results)
+    pairs, idx_bye = swiss_pairings(points, abilities.numpy(), has_played)
+    n_rematches = has_played[pairs[:, 0], pairs[:, 1]].sum()
+
+    # Swiss event pre-simulation
+    abilities = 100 + 3 * torch.randn(32)
+    timer.tic()
+    positions, final_points = simulate_swiss(mrdodo, abilities, n_rounds=5, n_simulations=100)
+    timer.toc()
+    prob_first = (positions == 0).mean(axis=0)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # add path/to/bayestennis/../ to sys.path
+import torch
+from bayestennis.simulation import simulate_round_robin
+from bayestennis.scoring_systems import MrDodo
+from bayestennis.utils import TicToc
+
+
+def main():
+
+    BREAKPOINT_ME = 0
+
+    abilities = [104, 102, 101, 100, 100, 99, 97, 95]
+    n_simulations = 10000
+
+    mrdodo = MrDodo()
+    generator = torch.Generator().manual_seed(0)
+
+    timer = TicToc()
+    timer.tic()
+    positions, wins = simulate_round_robin(mrdodo, abilities, n_simulations, generator)
+    timer.toc()
+
+    prob_first = (positions == 0).float().mean(dim=0)
+    prob_qualification = (positions < 2).float().mean(dim=0)
+    expected_wins = wins.float().mean(dim=0)
+
+    BREAKPOINT_ME = 0
+
+
+if __name__ == "__main__":
+
+    main()
@@ -1,6 +1,7 @@
-from typing import Any
+from typing import Any, Callable
 import torch
 import time
+import warnings
 
 
 def as_torch_tensor (x: Any, torch_dtype: torch.dtype, device: torch.device = torch.device("cpu")) -> torch.Tensor:
@@ -32,6 +33,29 @@ def as_torch_tensor (x: Any, torch_dtype: torch.dtype, device: torch.device = to
         return torch.tensor(x, dtype=torch_dtype, device=device)
 
 
+def as_float_tensor (x: Any, device: torch.device = torch.device("cpu")) -> torch.Tensor:
+    """
+    Transform x into a floating point torch tensor: floating point tensors keep their dtype (e.g.
+    float64), anything else is converted to torch.float
+
+    Usage example:
+        x = as_float_tensor(torch.zeros(3, dtype=torch.float64))
+
+    Args:
+        x : any
+            The object to transform into a torch tensor
+        device : torch.device = torch.device("cpu")
+            The device to store the tensor
+
+    Returns:
+        x_as_float_tensor : torch.Tensor
+            The object transformed into a floating point torch tensor
+    """
+
+    torch_dtype = x.dtype if isinstance(x, torch.Tensor) and x.is_floating_point() else torch.float
+    return as_torch_tensor(x, torch_dtype, device=device)
+
+
 def as_2dim_tensor (x: torch.Tensor) -> torch.Tensor:
     """
     Transform x into a 2-dimensional torch tensor
@@ -121,4 +145,68 @@ class TicToc:
             return "{:.2f} min".format(seconds/60)
         else:
             return "{:.2f} h".format(seconds/3600)
-        
\ No newline at end of file
+        
+
+
+class CompiledFunction:
+    """
+    A function compiled with torch.compile (inductor backend), with fallback to eager mode.
+
+    Description:
+        The first dimension of the tensor arguments (e.g. the match dimension) is marked as dynamic,
+        so that adding matches does not trigger a recompilation. If compiling or running the compiled
+        function fails (e.g. no C++ compiler), a warning is emitted and the function is run in eager
+        mode from then on. Compiled artifacts are cached across processes by the inductor FX graph
+        cache, in the directory given by the TORCHINDUCTOR_CACHE_DIR environment variable (a
+        temporary directory by default).
+
+    Usage example:
+        compiled_function = CompiledFunction(function)
+        y = compiled_function(x)
+
+    Attributes:
+        function : Callable
+            The eager function.
+        compiled_function : Callable | None
+            The compiled function. None after falling back to eager mode.
+        dynamic : bool
+            Whether the first dimension of the tensor arguments is marked as dynamic.
+    """
+
+    def __init__ (self, function: Callable, dynamic: bool = True) -> None:
+        """
+        Compile a function.
+
+        Args:
+            function : Callable
+                The function to compile. Compilation is lazy: it happens on the first call.
+            dynamic : bool = True
+                Mark the first dimension of the tensor arguments as dynamic. Set to False for
+                functions whose code depends on the sizes (e.g. slicing at fixed rows): the function
+                is then recompiled for new sizes.
+        """
+
+        self.function = function
+        self.dynamic = dynamic
+        try:
+            import torch._inductor.config
+            torch._inductor.config.fx_graph_cache = True
+            self.compiled_function = torch.compile(function, backend='inductor', dynamic=None if dynamic else False)
+        except Exception as exception:
+            warnings.warn(f"torch.compile is not available, running in eager mode: {exception}")
+            self.compiled_function = None
+
+
+    def __call__ (self, *args: Any, **kwargs: Any) -> Any:
+
+        if self.compiled_function is not None:
+            for arg in (args if self.dynamic else ()):
+                if isinstance(arg, torch.Tensor) and arg.ndim > 0 and arg.shape[0] > 1:
+                    torch._dynamo.mark_dynamic(arg, 0)
+            try:
+                return self.compiled_function(*args, **kwargs)
+            except Exception as exception:
+                warnings.warn(f"torch.compile failed, running in eager mode: {exception}")
+                self.compiled_function = None
+
+        return self.function(*args, **kwargs)